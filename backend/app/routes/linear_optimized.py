@@ -1,8 +1,13 @@
 """Linear API endpoints - ROI MAXIMIZED for paid subscription."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
+from backend.modules.linear_automation import (
+    LINEAR_WEBHOOK_SECRET,
+    get_linear_automation,
+    verify_webhook_signature,
+)
 from shared_core.modules.linear.client_optimized import (
     LinearClientOptimized,
     get_linear_client_optimized,
@@ -228,11 +233,26 @@ async def get_team_analytics(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Webhooks: keep cached teams/labels/users/states in sync
+@router.post("/webhook")
+async def linear_webhook(request: Request):
+    """Handle Linear webhook events."""
+    body = await request.body()
+    if not LINEAR_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="LINEAR_WEBHOOK_SECRET not configured")
+    if not verify_webhook_signature(body, request.headers.get("Linear-Signature")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    automation = get_linear_automation()
+    return await automation.handle_webhook(await request.json())
+
+
 @router.get("/health")
 async def health_check(linear: LinearClientOptimized = Depends(get_linear_client_optimized)):
     """Check Linear connection health."""
     try:
-        await linear.get_teams()
-        return {"status": "healthy", "service": "linear"}
+        # Uncached probe; get_teams may be served from the metadata cache
+        await linear.query("query Health { viewer { id } }")
+        return {"status": "healthy", "service": "linear", "rate_limit": linear.budget.snapshot()}
     except Exception as e:
         return {"status": "unhealthy", "service": "linear", "error": str(e)}
@@ -18,18 +18,30 @@ from backend.app.routes.leads import router as leads_router
 from backend.app.routes.metrics import router as metrics_router
 from backend.app.routes.beta import router as beta_router
 from backend.config import get_settings
+from backend.modules.email.outbound_queue import get_outbound_email_queue
 from backend.modules.email.router import router as email_router
+from backend.modules.email.transport import close_resend_transport
 from backend.routes.csp import router as csp_router
 from shared_core.middleware.auth import dev_auth
 from shared_core.middleware.supabase_auth import supabase_auth
+from shared_core.modules.agent_orchestrator.distributed import (
+    WORKFLOW_DISTRIBUTED,
+    WORKFLOW_WORKER_CONCURRENCY,
+    WorkflowStepWorker,
+)
+from shared_core.modules.agent_orchestrator.router import get_orchestrator
 from shared_core.modules.agent_orchestrator.router import router as agent_orchestrator_router
+from shared_core.modules.ai.clients import close_provider_clients
 from shared_core.modules.ai.router import router as ai_router
 from shared_core.modules.clients.router import router as clients_router
 from shared_core.modules.finance_agent.router import router as finance_agent_router
+from shared_core.modules.linear.client_optimized import close_linear_client_optimized
 from shared_core.modules.linear.router import router as linear_router
 from shared_core.modules.notion.router import router as notion_router
+from shared_core.modules.ocr.executor import shutdown_pool as shutdown_ocr_pool
 from shared_core.modules.ocr.router import router as ocr_router
 from shared_core.modules.receipts.router import router as receipts_router
+from shared_core.modules.receipts.tiered import receipt_extractor
 from shared_core.modules.supabase.router import router as supabase_router
 from shared_core.utils.db import Base, engine
 
@@ -86,7 +98,30 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     logger.info("Ensuring database schema is up to date")
     Base.metadata.create_all(bind=engine)
     logger.info("Database schema ready")
+    if os.getenv("OCR_PREMIUM_ESCALATION", "false").lower() in ("true", "1", "yes"):
+        # Dual-model premium OCR as the last tier for low-confidence receipts
+        from backend.modules.ocr.premium_ocr import process_receipt_premium
+
+        receipt_extractor.premium = process_receipt_premium
+        logger.info("Premium OCR escalation enabled for receipts")
+    email_queue = get_outbound_email_queue()
+    await email_queue.start()
+    step_worker = None
+    if WORKFLOW_DISTRIBUTED and WORKFLOW_WORKER_CONCURRENCY > 0:
+        # This process also executes steps queued by any coordinator
+        step_worker = WorkflowStepWorker(get_orchestrator().workflow_engine)
+        await step_worker.start()
+    workflow_engine = get_orchestrator().workflow_engine
+    await workflow_engine.start()
     yield
+    await workflow_engine.shutdown()
+    if step_worker is not None:
+        await step_worker.stop()
+    await email_queue.stop()
+    shutdown_ocr_pool()
+    await close_provider_clients()
+    await close_resend_transport()
+    await close_linear_client_optimized()
 
 
 def create_app() -> FastAPI:
@@ -4,10 +4,10 @@ import os
 import base64
 from pathlib import Path
 from typing import Optional
-import httpx
+
+from .transport import get_resend_transport
 
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
-RESEND_API_BASE = "https://api.resend.com"
 
 
 async def send_email_with_attachment(
@@ -42,11 +42,6 @@ async def send_email_with_attachment(
 
     attachment_name = attachment_name or Path(attachment_path).name
 
-    headers = {
-        "Authorization": f"Bearer {RESEND_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "from": from_email,
         "to": to if isinstance(to, list) else [to],
@@ -60,12 +55,7 @@ async def send_email_with_attachment(
         ],
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{RESEND_API_BASE}/emails",
-            headers=headers,
-            json=payload,
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_resend_transport().post("/emails", api_key=RESEND_API_KEY, json=payload)
+    response.raise_for_status()
+    return response.json()
 
@@ -2,15 +2,144 @@
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 
-import httpx
 from backend.config import get_settings
+from shared_core.utils.redis import get_redis_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Usage snapshot is reused for this long on the hot path (seconds)
+USAGE_CACHE_SECONDS = float(os.getenv("EMAIL_USAGE_CACHE_SECONDS", "1.0"))
+
+
+class UsageCounters:
+    """Per-day, per-month and per-route email counters.
+
+    Counters live in Redis (``INCRBY`` in one pipelined round-trip per send,
+    one ``MGET`` per read) so every app instance sees the same totals. Without
+    Redis they are kept in-process. Reads are cached for
+    ``USAGE_CACHE_SECONDS`` so ``should_allow_email`` usually costs a dict
+    lookup. Async code uses ``record`` and ``read``, which run the Redis
+    round-trips in a worker thread instead of on the event loop.
+    """
+
+    def __init__(self, redis_client: Any | None = None):
+        self.redis = redis_client or get_redis_client()
+        self._local: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_at = 0.0
+
+    @staticmethod
+    def _keys(route: Optional[str], routes: List[str]) -> tuple:
+        now = datetime.now(timezone.utc)
+        day = f"email:usage:day:{now:%Y-%m-%d}"
+        month = f"email:usage:month:{now:%Y-%m}"
+        route_keys = {r: f"email:usage:route:{r}:{now:%Y-%m}" for r in routes}
+        route_key = f"email:usage:route:{route}:{now:%Y-%m}" if route else None
+        return day, month, route_key, route_keys
+
+    def increment(self, route: Optional[str], count: int = 1) -> None:
+        """Count ``count`` sent emails for today, this month and ``route``."""
+        day, month, route_key, _ = self._keys(route, [])
+        expiries = [(day, 2 * 86400), (month, 35 * 86400)]
+        if route_key:
+            expiries.append((route_key, 35 * 86400))
+
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, ttl in expiries:
+                    pipe.incrby(key, count)
+                    pipe.expire(key, ttl)
+                pipe.execute()
+                self._bump_snapshot(day, month, route, count)
+                return
+            except Exception as e:
+                logger.error(f"Usage counter update failed, counting locally: {e}")
+
+        with self._lock:
+            for key, _ in expiries:
+                self._local[key] = self._local.get(key, 0) + count
+        self._bump_snapshot(day, month, route, count)
+
+    def _bump_snapshot(self, day: str, month: str, route: Optional[str], count: int) -> None:
+        # Keep the cached snapshot in step with this process's own sends
+        snapshot = self._snapshot
+        if snapshot is None or snapshot["day_key"] != day:
+            return
+        snapshot["today"] += count
+        snapshot["month"] += count
+        if route in snapshot["routes"]:
+            snapshot["routes"][route] += count
+
+    async def record(self, route: Optional[str], count: int = 1) -> None:
+        """``increment`` off the event loop."""
+        await asyncio.to_thread(self.increment, route, count)
+
+    async def read(self, routes: List[str]) -> Dict[str, Any]:
+        """``snapshot`` off the event loop; a fresh cached snapshot is returned directly."""
+        cached = self._cached(routes)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.snapshot, routes)
+
+    def _cached(self, routes: List[str]) -> Optional[Dict[str, Any]]:
+        cached = self._snapshot
+        if (
+            cached is not None
+            and cached["day_key"] == self._keys(None, [])[0]
+            and set(cached["routes"]) >= set(routes)
+            and time.monotonic() - self._snapshot_at < USAGE_CACHE_SECONDS
+        ):
+            return cached
+        return None
+
+    def snapshot(self, routes: List[str]) -> Dict[str, Any]:
+        """Today's, this month's and per-route counts (cached briefly)."""
+        cached = self._cached(routes)
+        if cached is not None:
+            return cached
+
+        day, month, _, route_keys = self._keys(None, routes)
+        keys = [day, month, *route_keys.values()]
+        values: List[Any] = []
+        if self.redis is not None:
+            try:
+                values = self.redis.mget(keys)
+            except Exception as e:
+                logger.error(f"Usage counter read failed, using local counts: {e}")
+        if not values:
+            with self._lock:
+                values = [self._local.get(key, 0) for key in keys]
+
+        counts = [int(v or 0) for v in values]
+        self._snapshot = {
+            "day_key": day,
+            "today": counts[0],
+            "month": counts[1],
+            "routes": dict(zip(route_keys, counts[2:], strict=True)),
+        }
+        self._snapshot_at = time.monotonic()
+        return self._snapshot
+
+
+_usage_counters: Optional[UsageCounters] = None
+
+
+def get_usage_counters() -> UsageCounters:
+    """Get the process-wide usage counters."""
+    global _usage_counters
+    if _usage_counters is None:
+        _usage_counters = UsageCounters()
+    return _usage_counters
+
 
 class CostGuard:
     """Monitor and control email costs to prevent budget overruns."""
@@ -36,35 +165,47 @@ class CostGuard:
         self.cost_per_email = 0.40 / 1000  # $0.40 per 1,000 emails
         self.free_tier_limit = 100  # 100 emails/day free
         
+        self.counters = get_usage_counters()
+    
+    async def record_email_sent(self, route: Optional[str] = None, count: int = 1) -> None:
+        """Count sent emails towards the daily, monthly and route totals."""
+        await self.counters.record(route, count)
+    
+    async def _usage(self) -> Dict[str, Any]:
+        return await self.counters.read(list(self.per_route_limits))
+        
     async def get_usage_stats(self) -> Dict[str, Any]:
         """Get current usage statistics from Resend API."""
         # Note: Resend API doesn't provide usage stats directly
         # This would need to be tracked internally or estimated
         
-        # For now, return estimated usage based on our tracking
+        # Usage is tracked internally with counters incremented on send
+        usage = await self._usage()
         return {
-            "emails_sent_today": await self._get_emails_sent_today(),
-            "emails_sent_this_month": await self._get_emails_sent_this_month(),
-            "estimated_daily_cost": await self._calculate_daily_cost(),
-            "estimated_monthly_cost": await self._calculate_monthly_cost()
+            "emails_sent_today": usage["today"],
+            "emails_sent_this_month": usage["month"],
+            "estimated_daily_cost": self._daily_cost(usage["today"]),
+            "estimated_monthly_cost": self._monthly_cost(usage["month"])
         }
     
     async def _get_emails_sent_today(self) -> int:
-        """Get emails sent today (mock implementation)."""
-        # In real implementation, this would query your database
-        # For now, return a mock value
-        return 50
+        """Get emails sent today."""
+        return (await self._usage())["today"]
     
     async def _get_emails_sent_this_month(self) -> int:
-        """Get emails sent this month (mock implementation)."""
-        # In real implementation, this would query your database
-        # For now, return a mock value
-        return 1500
+        """Get emails sent this month."""
+        return (await self._usage())["month"]
     
     async def _calculate_daily_cost(self) -> float:
         """Calculate daily cost based on usage."""
-        emails_sent = await self._get_emails_sent_today()
-        
+        return self._daily_cost(await self._get_emails_sent_today())
+    
+    async def _calculate_monthly_cost(self) -> float:
+        """Calculate monthly cost based on usage."""
+        return self._monthly_cost(await self._get_emails_sent_this_month())
+    
+    def _daily_cost(self, emails_sent: int) -> float:
+        """Cost of ``emails_sent`` emails in one day."""
         # Apply free tier
         if emails_sent <= self.free_tier_limit:
             return 0.0
@@ -73,10 +214,8 @@ class CostGuard:
         paid_emails = emails_sent - self.free_tier_limit
         return paid_emails * self.cost_per_email
     
-    async def _calculate_monthly_cost(self) -> float:
-        """Calculate monthly cost based on usage."""
-        emails_sent = await self._get_emails_sent_this_month()
-        
+    def _monthly_cost(self, emails_sent: int) -> float:
+        """Cost of ``emails_sent`` emails in one month."""
         # Apply free tier (100 emails/day * 30 days = 3000 emails/month)
         free_tier_monthly = self.free_tier_limit * 30
         
@@ -129,8 +268,9 @@ class CostGuard:
             })
         
         # Check per-route limits
+        route_counts = (await self._usage())["routes"]
         for route, limit in self.per_route_limits.items():
-            route_usage = await self._get_route_usage(route)
+            route_usage = route_counts.get(route, 0)
             route_cost = route_usage * self.cost_per_email
             
             if route_cost > limit:
@@ -158,15 +298,10 @@ class CostGuard:
         }
     
     async def _get_route_usage(self, route: str) -> int:
-        """Get usage for specific route (mock implementation)."""
-        # In real implementation, this would query your database
-        # For now, return mock values
-        route_usage = {
-            "pilot_onboarding": 1000,
-            "deployment_notification": 200,
-            "error_alert": 50
-        }
-        return route_usage.get(route, 0)
+        """Get this month's usage for specific route."""
+        if route in self.per_route_limits:
+            return (await self._usage())["routes"].get(route, 0)
+        return (await self.counters.read([route]))["routes"].get(route, 0)
     
     async def should_allow_email(self, template: str, recipient: str) -> Dict[str, Any]:
         """Check if email should be allowed based on cost limits."""
@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 
 import httpx
 from backend.config import get_settings
+from backend.modules.email.transport import get_resend_transport
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -16,54 +17,41 @@ class DomainVerification:
     
     def __init__(self):
         self.api_key = settings.resend_api_key
-        self.base_url = "https://api.resend.com"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        self.transport = get_resend_transport()
     
     async def verify_domain(self, domain: str) -> Dict:
         """Verify domain ownership and DNS records."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/domains",
-                    headers=self.headers,
-                    json={"name": domain}
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Domain verification failed: {e}")
-                raise
+        try:
+            response = await self.transport.post(
+                "/domains", api_key=self.api_key, json={"name": domain}
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Domain verification failed: {e}")
+            raise
     
     async def get_domain_status(self, domain: str) -> Dict:
         """Get domain verification status."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/domains/{domain}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Failed to get domain status: {e}")
-                raise
+        try:
+            response = await self.transport.get(f"/domains/{domain}", api_key=self.api_key)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get domain status: {e}")
+            raise
     
     async def get_dns_records(self, domain: str) -> List[Dict]:
         """Get required DNS records for domain verification."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/domains/{domain}/records",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Failed to get DNS records: {e}")
-                raise
+        try:
+            response = await self.transport.get(
+                f"/domains/{domain}/records", api_key=self.api_key
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get DNS records: {e}")
+            raise
     
     def generate_dns_instructions(self, domain: str) -> Dict[str, str]:
         """Generate DNS setup instructions for domain."""
@@ -0,0 +1,264 @@
+# 📬 Outbound Email Queue - durable sends with worker pool and rate shaping
+
+"""Durable outbound email queue on top of ``shared_core.utils.redis.QueueManager``.
+
+API handlers enqueue a job and return immediately. A pool of workers started
+in the app lifespan delivers the jobs:
+
+- jobs are *reserved* (kept in a processing list until acked) with a lease of
+  ``EMAIL_QUEUE_LEASE_SECONDS``; a timer in every process requeues jobs whose
+  lease ran out, so a crashed worker's jobs are resent without touching jobs
+  that other workers are still sending,
+- sends are shaped by a token bucket in Redis to ``RESEND_RATE_LIMIT``
+  requests per second across all processes (Resend's limit is per account),
+- failed attempts are rescheduled with exponential backoff on a delayed set,
+- jobs that exhaust ``EMAIL_QUEUE_MAX_ATTEMPTS`` or fail permanently are
+  moved to the dead-letter list,
+- a job is acked in the same transaction that reschedules or dead-letters
+  it; if that fails it stays reserved and is retried once its lease expires.
+
+Job handlers are registered per job ``kind`` and return the usual
+``{"success": ...}`` dict; ``"retryable": False`` skips further attempts.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from shared_core.utils.redis import QueueManager, RateLimiter
+from shared_core.utils.redis import queue_manager as default_queue_manager
+from shared_core.utils.redis import rate_limiter as default_rate_limiter
+
+logger = logging.getLogger("converto.email.queue")
+
+EMAIL_QUEUE = "email:outbound"
+EMAIL_QUEUE_WORKERS = int(os.getenv("EMAIL_QUEUE_WORKERS", "4"))
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv("EMAIL_QUEUE_MAX_ATTEMPTS", "5"))
+EMAIL_QUEUE_RETRY_BASE = float(os.getenv("EMAIL_QUEUE_RETRY_BASE", "2.0"))
+# Must exceed the longest single send; expired jobs are requeued by any process
+EMAIL_QUEUE_LEASE_SECONDS = float(os.getenv("EMAIL_QUEUE_LEASE_SECONDS", "300"))
+EMAIL_QUEUE_RECOVERY_INTERVAL = float(os.getenv("EMAIL_QUEUE_RECOVERY_INTERVAL", "30"))
+# Worker backoff while Redis is unreachable
+EMAIL_QUEUE_ERROR_BACKOFF_MAX = 30.0
+EMAIL_QUEUE_ENABLED = os.getenv("EMAIL_QUEUE_ENABLED", "true").lower() in ("true", "1", "yes")
+# Resend default account limit is 2 requests/second
+RESEND_RATE_LIMIT = float(os.getenv("RESEND_RATE_LIMIT", "2"))
+RESEND_RATE_BURST = int(os.getenv("RESEND_RATE_BURST", "2"))
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, up to ``capacity`` stored.
+
+    With a ``key`` the bucket is kept in Redis and shared by every process;
+    while Redis is unavailable each process falls back to its own bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        key: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.key = key
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        while self.key:
+            wait = await asyncio.to_thread(
+                self.rate_limiter.take_token, self.key, self.rate, self.capacity
+            )
+            if wait is None:
+                break  # Redis unavailable -> local bucket
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OutboundEmailQueue:
+    """Redis-backed outbound email queue with a worker pool."""
+
+    def __init__(
+        self,
+        queue_manager: QueueManager | None = None,
+        workers: int = EMAIL_QUEUE_WORKERS,
+        max_attempts: int = EMAIL_QUEUE_MAX_ATTEMPTS,
+        rate_limit: float = RESEND_RATE_LIMIT,
+        burst: int = RESEND_RATE_BURST,
+    ):
+        self.queue_manager = queue_manager or default_queue_manager
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.bucket = TokenBucket(rate_limit, burst, "resend")
+        self.handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        return EMAIL_QUEUE_ENABLED and self.queue_manager.enabled
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that delivers jobs of ``kind``."""
+        self.handlers[kind] = handler
+
+    async def enqueue(self, kind: str, payload: dict[str, Any]) -> str | None:
+        """Queue a job; returns the job id, or None if the queue is unavailable."""
+        if not self.enabled:
+            return None
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "payload": payload,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        queued = await asyncio.to_thread(self.queue_manager.enqueue, EMAIL_QUEUE, job)
+        return job["id"] if queued else None
+
+    async def start(self) -> None:
+        """Start the workers and the retry/lease scheduler."""
+        if not self.enabled or self.running:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._scheduler()))
+        logger.info(f"Outbound email queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Stop workers; reserved jobs stay in Redis and are requeued when their lease expires."""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Outbound email queue stopped")
+
+    async def stats(self) -> dict[str, Any]:
+        counts = await asyncio.to_thread(self.queue_manager.queue_stats, EMAIL_QUEUE)
+        return {"enabled": self.enabled, "running": self.running, **counts}
+
+    async def _scheduler(self) -> None:
+        next_recovery = 0.0
+        while True:
+            try:
+                now = time.time()
+                await asyncio.to_thread(self.queue_manager.promote_due, EMAIL_QUEUE, now)
+                if now >= next_recovery:
+                    next_recovery = now + EMAIL_QUEUE_RECOVERY_INTERVAL
+                    requeued = await asyncio.to_thread(
+                        self.queue_manager.requeue_expired,
+                        EMAIL_QUEUE,
+                        EMAIL_QUEUE_LEASE_SECONDS,
+                        now,
+                    )
+                    if requeued:
+                        logger.warning(f"Requeued {requeued} email jobs with expired leases")
+            except Exception as e:
+                logger.error(f"Email retry scheduler error: {e}")
+            await asyncio.sleep(1.0)
+
+    async def _worker(self, worker_id: int) -> None:
+        failures = 0
+        while True:
+            try:
+                reserved = await asyncio.to_thread(
+                    self.queue_manager.reserve,
+                    EMAIL_QUEUE,
+                    1,
+                    EMAIL_QUEUE_LEASE_SECONDS,
+                    True,
+                )
+            except Exception as e:
+                # Redis down: back off instead of spinning on an instant failure
+                failures += 1
+                delay = min(EMAIL_QUEUE_ERROR_BACKOFF_MAX, 0.5 * 2 ** (failures - 1))
+                if failures == 1 or delay == EMAIL_QUEUE_ERROR_BACKOFF_MAX:
+                    logger.error(f"Email worker {worker_id} cannot reserve jobs: {e}")
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                continue
+            failures = 0
+            if reserved is None:
+                continue
+            raw, job = reserved
+            # Cancelled mid-send -> no ack, the job is requeued when its lease expires
+            await self._process(raw, job)
+
+    async def _process(self, raw: str, job: dict[str, Any]) -> None:
+        """Deliver a reserved job, then ack, reschedule or dead-letter it."""
+        handler = self.handlers.get(job.get("kind"))
+        job["attempts"] = job.get("attempts", 0) + 1
+        if handler is None:
+            result = {"success": False, "error": "no_handler", "retryable": False}
+        else:
+            await self.bucket.acquire()
+            try:
+                result = await handler(job["payload"])
+            except Exception as e:
+                logger.error(f"Email job {job['id']} failed: {e}")
+                result = {"success": False, "error": str(e)}
+
+        if result.get("success"):
+            await asyncio.to_thread(self.queue_manager.ack, EMAIL_QUEUE, raw)
+            return
+
+        job["last_error"] = result.get("error")
+        if result.get("retryable", True) and job["attempts"] < self.max_attempts:
+            delay = EMAIL_QUEUE_RETRY_BASE * 2 ** (job["attempts"] - 1)
+            delay *= random.uniform(0.8, 1.2)
+            moved = await asyncio.to_thread(
+                self.queue_manager.schedule, EMAIL_QUEUE, job, time.time() + delay, raw
+            )
+            if moved:
+                logger.warning(
+                    f"Email job {job['id']} failed (attempt {job['attempts']}), "
+                    f"retrying in {delay:.1f}s: {job['last_error']}"
+                )
+        else:
+            moved = await asyncio.to_thread(self.queue_manager.dead_letter, EMAIL_QUEUE, job, raw)
+            if moved:
+                logger.error(
+                    f"Email job {job['id']} dead-lettered after {job['attempts']} attempts: "
+                    f"{job['last_error']}"
+                )
+        if not moved:
+            # Still reserved: requeue_expired redelivers it once the lease runs out
+            logger.error(
+                f"Email job {job['id']} failed and could not be rescheduled; "
+                "it is retried after its lease expires"
+            )
+
+
+_outbound_queue: OutboundEmailQueue | None = None
+
+
+def get_outbound_email_queue() -> OutboundEmailQueue:
+    """Get the app-wide outbound email queue."""
+    global _outbound_queue
+    if _outbound_queue is None:
+        _outbound_queue = OutboundEmailQueue()
+    return _outbound_queue
@@ -2,9 +2,10 @@
 Email Inbox Processor for Converto Business OS
 
 Processes incoming emails to receipts@converto.fi inbox:
-- Extracts receipt attachments (PDF, images)
-- Processes OCR on receipt images
-- Stores receipt data in database
+- Extracts receipt attachments (PDF, images); PDFs are split into pages
+- Processes OCR on receipt images concurrently, sharing the extraction slots
+  of the receipts batch pipeline (RECEIPT_BATCH_CONCURRENCY)
+- Stores receipt data in database in one transaction
 - Sends confirmation email to sender
 
 Usage:
@@ -14,16 +15,29 @@ Usage:
         from_email="user@example.com",
         subject="Receipt",
         attachments=[...],
-        body_text="..."
+        body_text="...",
+        tenant_id="tenant-123",
     )
 """
 
+import asyncio
 import base64
 import logging
 import os
 from datetime import datetime
 from typing import Any
 
+from shared_core.modules.ocr.executor import run_cpu
+from shared_core.modules.ocr.normalize import is_pdf, pdf_page_count, render_pdf_page
+from shared_core.modules.receipts.dedup import receipt_dedup
+from shared_core.modules.receipts.extraction import (
+    add_receipt_rows,
+    extract_receipt,
+    extraction_slot,
+)
+from shared_core.utils.db import SessionLocal
+from shared_core.utils.storage import sha256
+
 logger = logging.getLogger("converto.email.processor")
 
 # Email configuration
@@ -42,16 +56,25 @@ async def process_receipt_email(
     attachments: list[dict[str, Any]],
     body_text: str | None = None,
     body_html: str | None = None,
+    *,
+    tenant_id: str,
 ) -> dict[str, Any]:
     """
     Process incoming email with receipt attachments.
 
+    All attachments (and every page of a PDF) are extracted concurrently, so
+    an email with 40 receipts takes roughly as long as the slowest one, and
+    the results are stored in a single transaction. The same image attached
+    twice is extracted once.
+
     Args:
         from_email: Sender email address
         subject: Email subject
         attachments: List of attachment dicts with 'name', 'content_type', 'data'
         body_text: Plain text email body
         body_html: HTML email body
+        tenant_id: Tenant the receipts are stored for (required: receipts and
+            their dedup lookups are scoped per tenant)
 
     Returns:
         Dict with processing results:
@@ -82,26 +105,60 @@ async def process_receipt_email(
 
         logger.info(f"Found {len(receipt_attachments)} receipt attachments")
 
-        # Process each attachment
+        # One work item per image / PDF page; pages are rendered only when processed
+        work_items: list[tuple[dict[str, Any], bytes, int | None]] = []
         for attachment in receipt_attachments:
             try:
-                receipt_data = await _process_receipt_attachment(
+                data = _decode_attachment(attachment)
+                if is_pdf(data):
+                    page_count = await asyncio.to_thread(pdf_page_count, data)
+                    work_items.extend((attachment, data, page) for page in range(page_count))
+                else:
+                    work_items.append((attachment, data, None))
+            except Exception as e:
+                error_msg = (
+                    f"Error processing attachment {attachment.get('name', 'unknown')}: {str(e)}"
+                )
+                logger.error(error_msg)
+                results["errors"].append(error_msg)
+
+        outcomes = await asyncio.gather(
+            *(
+                _process_receipt_attachment(
                     attachment=attachment,
+                    data=data,
                     from_email=from_email,
                     subject=subject,
+                    page=page,
+                    tenant_id=tenant_id,
                 )
+                for attachment, data, page in work_items
+            ),
+            return_exceptions=True,
+        )
+
+        extracted: list[dict[str, Any]] = []
+        for (attachment, _, page), outcome in zip(work_items, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                name = attachment.get("name", "unknown")
+                if page is not None:
+                    name = f"{name} (page {page + 1})"
+                error = getattr(outcome, "detail", None) or str(outcome)
+                error_msg = f"Error processing attachment {name}: {error}"
+                logger.error(error_msg)
+                results["errors"].append(error_msg)
+            elif outcome:
+                extracted.append(outcome)
 
-                if receipt_data:
-                    # Store receipt in database (TODO: implement database storage)
-                    # await store_receipt(receipt_data)
-
-                    results["receipts"].append(receipt_data)
-                    results["processed_count"] += 1
-
+        # Store all receipts in one transaction
+        if extracted:
+            try:
+                await asyncio.to_thread(_store_receipts, extracted, tenant_id, from_email)
+                for item in extracted:
+                    results["receipts"].append(item["receipt"])
+                results["processed_count"] = len(extracted)
             except Exception as e:
-                error_msg = (
-                    f"Error processing attachment {attachment.get('name', 'unknown')}: {str(e)}"
-                )
+                error_msg = f"Error storing receipts: {str(e)}"
                 logger.error(error_msg)
                 results["errors"].append(error_msg)
 
@@ -152,60 +209,129 @@ def _filter_receipt_attachments(attachments: list[dict[str, Any]]) -> list[dict[
     return receipt_attachments
 
 
+def _decode_attachment(attachment: dict[str, Any]) -> bytes:
+    """Attachment bytes; webhook payloads carry them base64 encoded."""
+    attachment_data = attachment.get("data")
+    if isinstance(attachment_data, str):
+        return base64.b64decode(attachment_data)
+    if isinstance(attachment_data, bytes | bytearray):
+        return bytes(attachment_data)
+    raise ValueError("Attachment has no data")
+
+
 async def _process_receipt_attachment(
     attachment: dict[str, Any],
+    data: bytes,
     from_email: str,
     subject: str,
+    page: int | None = None,
+    *,
+    tenant_id: str,
 ) -> dict[str, Any] | None:
     """
-    Process single receipt attachment with OCR.
+    Process single receipt attachment (or one PDF page) with OCR.
+
+    An image that is already stored for the tenant (e.g. a forwarded
+    duplicate) is looked up by hash first and not extracted again, and
+    concurrent copies of the same image share one extraction.
 
     Args:
         attachment: Attachment dict with 'name', 'content_type', 'data'
+        data: Decoded attachment bytes
         from_email: Sender email address
         subject: Email subject
+        page: PDF page index, None for images
+        tenant_id: Tenant the receipt is stored for
 
     Returns:
-        Receipt data dict or None if processing failed
+        Dict with the extraction result, image hash and receipt data;
+        raises if extraction failed
     """
+    if page is not None:
+        async with extraction_slot():
+            data = await run_cpu("pdf_render", render_pdf_page, data, page)
+    digest = sha256(data)
+
+    async def _lookup_or_extract() -> dict[str, Any]:
+        async with extraction_slot():
+            stored = await asyncio.to_thread(_find_stored_receipt, tenant_id, digest)
+            return stored or await extract_receipt(data)
+
+    # Own namespace: upload-path tasks with the same key resolve to a stored receipt
+    result, _ = await receipt_dedup.run_once(
+        f"email:{receipt_dedup.key(tenant_id, digest)}", _lookup_or_extract
+    )
+    stored = result if "receipt_id" in result else None
+
+    receipt_data = {
+        "receipt_id": stored["receipt_id"] if stored else None,
+        "duplicate": stored is not None,
+        "merchant": result.get("vendor"),
+        "date": result.get("receipt_date"),
+        "total": result.get("total_amount"),
+        "vat_amount": result.get("vat_amount"),
+        "vat_rate": result.get("vat_rate"),
+        "items": result.get("items", []),
+        "payment_method": result.get("payment_method"),
+        "receipt_number": result.get("invoice_number"),
+        "category": result.get("category"),
+        "confidence": result.get("confidence"),
+        "file_name": attachment.get("name", "unknown"),
+        "file_type": attachment.get("content_type", "unknown"),
+        "page": None if page is None else page + 1,
+        "processed_at": datetime.now().isoformat(),
+        "source": "email",
+        "sender_email": from_email,
+        "email_subject": subject,
+        "ocr_status": "processed",  # pending, processed, failed
+    }
+    return {"result": result, "sha256": digest, "receipt": receipt_data}
+
+
+def _find_stored_receipt(tenant_id: str, digest: str) -> dict[str, Any] | None:
+    """Stored receipt for this image as an extraction-shaped dict, or None."""
+    db = SessionLocal()
     try:
-        # Decode attachment data
-        attachment_data = attachment.get("data")
-        if isinstance(attachment_data, str):
-            # Base64 encoded
-            base64.b64decode(attachment_data)
-        else:
-            pass
-
-        # Call OCR API (TODO: integrate with OCR service)
-        # For now, return mock data structure
-        receipt_data = {
-            "merchant": None,
-            "date": datetime.now().isoformat(),
-            "total": None,
-            "vat_amount": None,
-            "vat_rate": None,
-            "items": [],
-            "payment_method": None,
-            "receipt_number": None,
-            "file_name": attachment.get("name", "unknown"),
-            "file_type": attachment.get("content_type", "unknown"),
-            "processed_at": datetime.now().isoformat(),
-            "source": "email",
-            "sender_email": from_email,
-            "email_subject": subject,
-            "ocr_status": "pending",  # pending, processed, failed
+        receipt = receipt_dedup.find_existing(db, tenant_id, digest)
+        if receipt is None:
+            return None
+        return {
+            "receipt_id": str(receipt.id),
+            "vendor": receipt.vendor,
+            "receipt_date": receipt.receipt_date.isoformat() if receipt.receipt_date else None,
+            "total_amount": receipt.total_amount,
+            "vat_amount": receipt.vat_amount,
+            "vat_rate": receipt.vat_rate,
+            "items": receipt.items or [],
+            "payment_method": receipt.payment_method,
+            "invoice_number": receipt.invoice_number,
+            "category": receipt.category,
+            "confidence": receipt.confidence,
         }
+    finally:
+        db.close()
 
-        # TODO: Call OCR API endpoint
-        # ocr_result = await call_ocr_api(attachment_bytes, attachment.get("content_type"))
-        # receipt_data.update(ocr_result)
 
-        return receipt_data
-
-    except Exception as e:
-        logger.error(f"Error processing receipt attachment: {str(e)}")
-        return None
+def _store_receipts(extracted: list[dict[str, Any]], tenant_id: str, user_id: str | None) -> None:
+    """Store extracted receipts in one transaction; known images are not stored twice."""
+    db = SessionLocal()
+    try:
+        for item in extracted:
+            if item["receipt"]["duplicate"]:
+                continue
+            # Same image twice in one email, or stored meanwhile by another request
+            existing = receipt_dedup.find_existing(db, tenant_id, item["sha256"])
+            if existing is not None:
+                item["receipt"].update(receipt_id=str(existing.id), duplicate=True)
+                continue
+            receipt = add_receipt_rows(db, item["result"], item["sha256"], tenant_id, user_id)
+            item["receipt"]["receipt_id"] = str(receipt.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
 
 async def send_confirmation_email(to_email: str, processed_count: int) -> bool:
@@ -235,18 +361,3 @@ async def send_confirmation_email(to_email: str, processed_count: int) -> bool:
     except Exception as e:
         logger.error(f"Error sending confirmation email: {str(e)}")
         return False
-
-
-# Future: Database storage function
-# async def store_receipt(receipt_data: Dict[str, Any]) -> str:
-#     """
-#     Store processed receipt in database.
-#
-#     Args:
-#         receipt_data: Receipt data dict
-#
-#     Returns:
-#         Receipt ID
-#     """
-#     # TODO: Implement Supabase storage
-#     pass
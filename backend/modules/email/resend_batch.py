@@ -2,10 +2,10 @@
 
 import os
 from typing import List, Dict, Any
-import httpx
+
+from .transport import get_resend_transport
 
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
-RESEND_API_BASE = "https://api.resend.com"
 
 
 async def send_batch_emails(emails: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -26,11 +26,6 @@ async def send_batch_emails(emails: List[Dict[str, Any]]) -> Dict[str, Any]:
     if not RESEND_API_KEY:
         raise ValueError("RESEND_API_KEY not configured")
 
-    headers = {
-        "Authorization": f"Bearer {RESEND_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     # Format emails for batch API
     batch_data = []
     for email in emails:
@@ -44,12 +39,9 @@ async def send_batch_emails(emails: List[Dict[str, Any]]) -> Dict[str, Any]:
             batch_email["scheduled_at"] = email["scheduled_at"]
         batch_data.append(batch_email)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{RESEND_API_BASE}/batch",
-            headers=headers,
-            json={"emails": batch_data},
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_resend_transport().post(
+        "/batch", api_key=RESEND_API_KEY, json={"emails": batch_data}
+    )
+    response.raise_for_status()
+    return response.json()
 
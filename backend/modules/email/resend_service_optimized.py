@@ -3,11 +3,11 @@
 import os
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-import httpx
 from pathlib import Path
 
+from .transport import get_resend_transport
+
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
-RESEND_API_BASE = "https://api.resend.com"
 
 
 class ResendServiceOptimized:
@@ -15,7 +15,7 @@ class ResendServiceOptimized:
 
     def __init__(self):
         self.api_key = RESEND_API_KEY
-        self.base_url = RESEND_API_BASE
+        self.transport = get_resend_transport()
         if not self.api_key:
             raise ValueError("RESEND_API_KEY not configured")
 
@@ -26,23 +26,15 @@ class ResendServiceOptimized:
         data: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Make API request."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        async with httpx.AsyncClient() as client:
-            if method == "GET":
-                response = await client.get(f"{self.base_url}{endpoint}", headers=headers)
-            elif method == "POST":
-                response = await client.post(
-                    f"{self.base_url}{endpoint}", headers=headers, json=data
-                )
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-
-            response.raise_for_status()
-            return response.json()
+        if method == "GET":
+            response = await self.transport.get(endpoint, api_key=self.api_key)
+        elif method == "POST":
+            response = await self.transport.post(endpoint, api_key=self.api_key, json=data)
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+
+        response.raise_for_status()
+        return response.json()
 
     async def send_batch(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Send batch emails (10x faster)."""
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 
 from .cost_guard import get_cost_guard
 from .monitoring import get_email_monitoring
+from .outbound_queue import get_outbound_email_queue
 from .service import EmailData, EmailService
 from .templates import EmailTemplates
 from .workflows import EmailWorkflows
@@ -255,6 +256,16 @@ async def get_cost_report():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/queue")
+async def get_queue_stats() -> dict[str, Any]:
+    """Get outbound queue depth (queued, processing, delayed, dead-lettered)."""
+    try:
+        return await get_outbound_email_queue().stats()
+    except Exception as e:
+        logger.error(f"Failed to get queue stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/health")
 async def email_health() -> dict[str, str]:
     """Email service health check."""
@@ -3,10 +3,10 @@
 import os
 from datetime import datetime, timedelta
 from typing import Optional
-import httpx
+
+from .transport import get_resend_transport
 
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
-RESEND_API_BASE = "https://api.resend.com"
 
 
 async def schedule_email(
@@ -34,11 +34,6 @@ async def schedule_email(
     if not RESEND_API_KEY:
         raise ValueError("RESEND_API_KEY not configured")
 
-    headers = {
-        "Authorization": f"Bearer {RESEND_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "from": from_email,
         "to": to if isinstance(to, list) else [to],
@@ -50,14 +45,9 @@ async def schedule_email(
     if reply_to:
         payload["reply_to"] = reply_to
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{RESEND_API_BASE}/emails",
-            headers=headers,
-            json=payload,
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_resend_transport().post("/emails", api_key=RESEND_API_KEY, json=payload)
+    response.raise_for_status()
+    return response.json()
 
 
 async def schedule_welcome_sequence(
@@ -1,5 +1,9 @@
 """Email service for Converto Business OS using Resend API."""
 
+import asyncio
+import contextlib
+import hashlib
+import json
 import logging
 import os
 from typing import Any
@@ -7,11 +11,20 @@ from typing import Any
 import httpx
 from pydantic import BaseModel
 
+from .cost_guard import get_usage_counters
+from .transport import get_resend_transport
+
 logger = logging.getLogger("converto.email")
 
 # Default from email from environment variable
 DEFAULT_FROM_EMAIL = os.getenv("RESEND_FROM_EMAIL", "info@converto.fi")
 
+# Resend /batch accepts at most 100 emails per call
+RESEND_BATCH_SIZE = int(os.getenv("RESEND_BATCH_SIZE", "100"))
+RESEND_BATCH_CONCURRENCY = int(os.getenv("RESEND_BATCH_CONCURRENCY", "4"))
+RESEND_BATCH_RETRIES = int(os.getenv("RESEND_BATCH_RETRIES", "3"))
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
 
 class EmailData(BaseModel):
     """Email data model."""
@@ -29,36 +42,44 @@ class EmailService:
 
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "https://api.resend.com"
-        self.client = httpx.AsyncClient(
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
-        )
+        self.transport = get_resend_transport()
+
+    @staticmethod
+    def _payload(email_data: EmailData) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "from": email_data.from_email,
+            "to": [email_data.to],
+            "subject": email_data.subject,
+            "html": email_data.html,
+        }
+
+        if email_data.reply_to:
+            payload["reply_to"] = email_data.reply_to
+
+        if email_data.tags:
+            payload["tags"] = email_data.tags
+
+        return payload
+
+    @staticmethod
+    def _route(email_data: EmailData) -> str | None:
+        """Cost route from a ``{"name": "route", ...}`` tag, if the caller set one."""
+        for tag in email_data.tags or []:
+            if tag.get("name") == "route":
+                return tag.get("value")
+        return None
 
     async def send_email(self, email_data: EmailData) -> dict[str, Any]:
         """Send email via Resend API."""
         try:
-            payload = {
-                "from": email_data.from_email,
-                "to": [email_data.to],
-                "subject": email_data.subject,
-                "html": email_data.html,
-            }
+            payload = self._payload(email_data)
 
-            if email_data.reply_to:
-                payload["reply_to"] = email_data.reply_to
-
-            if email_data.tags:
-                payload["tags"] = email_data.tags
-
-            response = await self.client.post(f"{self.base_url}/emails", json=payload)
+            response = await self.transport.post("/emails", api_key=self.api_key, json=payload)
 
             if response.status_code == 200:
                 result = response.json()
                 logger.info(f"Email sent successfully: {result.get('id')}")
+                await get_usage_counters().record(self._route(email_data))
                 return {"success": True, "id": result.get("id")}
             else:
                 error = response.text
@@ -70,20 +91,105 @@ class EmailService:
             return {"success": False, "error": str(e)}
 
     async def send_bulk_emails(self, emails: list[EmailData]) -> dict[str, Any]:
-        """Send multiple emails efficiently."""
-        results = []
-        for email in emails:
-            result = await self.send_email(email)
-            results.append(result)
-
-        success_count = sum(1 for r in results if r.get("success"))
+        """Send multiple emails efficiently via the Resend batch API.
+
+        Emails are chunked to ``RESEND_BATCH_SIZE`` and the chunks are sent
+        with at most ``RESEND_BATCH_CONCURRENCY`` requests in flight.
+        ``results[i]`` is the outcome of ``emails[i]``. Members that fail
+        transiently (rate limit, 5xx, network) are retried on their own;
+        members that succeeded are never resent.
+        """
+        results: list[dict[str, Any] | None] = [None] * len(emails)
+        payloads = [self._payload(email) for email in emails]
+        semaphore = asyncio.Semaphore(RESEND_BATCH_CONCURRENCY)
+
+        async def run_chunk(indexes: list[int]) -> None:
+            async with semaphore:
+                await self._send_batch_chunk(payloads, indexes, results)
+
+        chunks = [
+            list(range(start, min(start + RESEND_BATCH_SIZE, len(emails))))
+            for start in range(0, len(emails), RESEND_BATCH_SIZE)
+        ]
+        await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+
+        success_count = 0
+        sent_by_route: dict[str | None, int] = {}
+        for email, result in zip(emails, results, strict=True):
+            if result and result.get("success"):
+                success_count += 1
+                route = self._route(email)
+                sent_by_route[route] = sent_by_route.get(route, 0) + 1
+        for route, count in sent_by_route.items():
+            await get_usage_counters().record(route, count)
+        logger.info(
+            f"Bulk send finished: {success_count}/{len(emails)} sent in {len(chunks)} batches"
+        )
         return {
             "total": len(emails),
             "success": success_count,
             "failed": len(emails) - success_count,
+            "batches": len(chunks),
             "results": results,
         }
 
+    async def _send_batch_chunk(
+        self,
+        payloads: list[dict[str, Any]],
+        indexes: list[int],
+        results: list[dict[str, Any] | None],
+    ) -> None:
+        """Send one chunk, retrying only the members that failed transiently."""
+        pending = indexes
+        for attempt in range(RESEND_BATCH_RETRIES):
+            batch = [payloads[i] for i in pending]
+            retry: list[int] = []
+            retry_after = 2**attempt
+            try:
+                response = await self.transport.post(
+                    "/batch",
+                    api_key=self.api_key,
+                    headers={
+                        # Per-member validation: one bad address doesn't reject the batch
+                        "x-batch-validation": "permissive",
+                        # Same members on retry -> same key, so a timed-out call isn't sent twice
+                        "Idempotency-Key": self._batch_key(batch),
+                    },
+                    json=batch,
+                )
+            except httpx.HTTPError as e:
+                logger.warning(f"Resend batch request failed (attempt {attempt + 1}): {e}")
+                retry, error = pending, str(e)
+            else:
+                if response.status_code == 200:
+                    body = response.json()
+                    errors = body.get("errors") or []
+                    failed = {err.get("index"): err.get("message") for err in errors}
+                    sent = iter(body.get("data") or [])
+                    for position, index in enumerate(pending):
+                        if position in failed:
+                            results[index] = {"success": False, "error": failed[position]}
+                        else:
+                            results[index] = {"success": True, "id": next(sent, {}).get("id")}
+                    return
+
+                error = response.text
+                logger.error(f"Resend batch API error: {response.status_code} - {error}")
+                if response.status_code in RETRYABLE_STATUS:
+                    retry = pending
+                    with contextlib.suppress(ValueError):
+                        retry_after = float(response.headers.get("retry-after", retry_after))
+
+            for index in pending:
+                results[index] = {"success": False, "error": error}
+            if not retry or attempt == RESEND_BATCH_RETRIES - 1:
+                return
+            pending = retry
+            await asyncio.sleep(retry_after)
+
+    @staticmethod
+    def _batch_key(batch: list[dict[str, Any]]) -> str:
+        return hashlib.sha256(json.dumps(batch, sort_keys=True).encode()).hexdigest()
+
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Kept for callers; the shared transport is closed in the app lifespan."""
@@ -2,14 +2,160 @@
 
 import json
 import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from string import Formatter
+from typing import Dict, List, Optional, Any, Tuple
 
 from backend.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+PARTIALS = ("legal_footer", "unsubscribe_footer", "social_links")
+# How often cached templates re-check source file mtimes (seconds)
+TEMPLATE_CHECK_INTERVAL = float(os.getenv("EMAIL_TEMPLATE_CHECK_INTERVAL", "2.0"))
+
+SUBJECTS = {
+    "pilot_onboarding": {
+        "fi": "Tervetuloa Converto Business OS:een! 🚀",
+        "en": "Welcome to Converto Business OS! 🚀",
+        "sv": "Välkommen till Converto Business OS! 🚀",
+        "ru": "Добро пожаловать в Converto Business OS! 🚀",
+        "et": "Tere tulemast Converto Business OS:esse! 🚀"
+    },
+    "deployment_notification": {
+        "fi": "Deployment {status} - {service_name}",
+        "en": "Deployment {status} - {service_name}",
+        "sv": "Deployment {status} - {service_name}",
+        "ru": "Deployment {status} - {service_name}",
+        "et": "Deployment {status} - {service_name}"
+    },
+    "error_alert": {
+        "fi": "🚨 {severity} Alert - {service_name}",
+        "en": "🚨 {severity} Alert - {service_name}",
+        "sv": "🚨 {severity} Alert - {service_name}",
+        "ru": "🚨 {severity} Alert - {service_name}",
+        "et": "🚨 {severity} Alert - {service_name}"
+    }
+}
+
+PREHEADERS = {
+    "pilot_onboarding": {
+        "fi": "Aloita automaatio 5 minuutissa",
+        "en": "Start automation in 5 minutes",
+        "sv": "Starta automatisering på 5 minuter",
+        "ru": "Начните автоматизацию за 5 минут",
+        "et": "Alusta automatiseerimine 5 minuti jooksul"
+    },
+    "deployment_notification": {
+        "fi": "Tarkista palvelun tila",
+        "en": "Check service status",
+        "sv": "Kontrollera tjänstestatus",
+        "ru": "Проверьте статус сервиса",
+        "et": "Kontrolli teenuse staatust"
+    },
+    "error_alert": {
+        "fi": "Tarkista palvelun tila välittömästi",
+        "en": "Check service status immediately",
+        "sv": "Kontrollera tjänstestatus omedelbart",
+        "ru": "Проверьте статус сервиса немедленно",
+        "et": "Kontrolli teenuse staatust kohe"
+    }
+}
+
+FROM_ADDRESSES = {
+    "pilot_onboarding": "no-reply@converto.fi",
+    "deployment_notification": "no-reply@converto.fi",
+    "error_alert": "no-reply@converto.fi"
+}
+
+REPLY_TO_ADDRESSES = {
+    "pilot_onboarding": "support@converto.fi",
+    "deployment_notification": "support@converto.fi",
+    "error_alert": "support@converto.fi"
+}
+
+
+def _escape(text: str) -> str:
+    """Make literal text safe to embed in a format string."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _field(name: str, spec: str, conversion: Optional[str]) -> str:
+    conv = f"!{conversion}" if conversion else ""
+    fmt = f":{spec}" if spec else ""
+    return "{" + name + conv + fmt + "}"
+
+
+def _inline(source: str, literals: Dict[str, str]) -> str:
+    """Replace plain ``{name}`` fields with already-escaped format text."""
+    parts = []
+    for literal, name, spec, conversion in Formatter().parse(source):
+        parts.append(_escape(literal))
+        if name is None:
+            continue
+        if name in literals and not spec and not conversion:
+            parts.append(literals[name])
+        else:
+            parts.append(_field(name, spec, conversion))
+    return "".join(parts)
+
+
+def _compose(layout: str, template: str, partials: Dict[str, str]) -> str:
+    """Precompose layout + template + partials into one format string.
+
+    Partials are inlined as literal text in both the template and the layout,
+    and the template replaces the layout's ``{content}`` field, so rendering
+    is a single ``format_map`` over the recipient's values.
+    """
+    escaped = {name: _escape(text) for name, text in partials.items()}
+    body = _inline(template, escaped)
+    return _inline(layout, {**escaped, "content": body})
+
+
+@dataclass
+class CompiledTemplate:
+    """Precomposed template with the source mtimes it was built from."""
+
+    name: str
+    locale: str
+    layout: str
+    body: str
+    subject: str
+    preheader: str
+    sources: Tuple[Tuple[Path, Optional[float]], ...]
+    checked_at: float
+
+    def render(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        subject = self.subject.format_map(values)
+        # Layout may reference the rendered subject and the locale
+        layout_values = {"subject": subject, "locale": self.locale, **values}
+        return {
+            "subject": subject,
+            "preheader": self.preheader.format_map(values),
+            "from": FROM_ADDRESSES.get(self.name, "no-reply@converto.fi"),
+            "reply_to": REPLY_TO_ADDRESSES.get(self.name, "support@converto.fi"),
+            "content": self.body.format_map(layout_values),
+            "locale": self.locale,
+            "layout": self.layout
+        }
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+# Shared by all TemplateManager instances: (template, locale, layout) -> compiled
+_compiled_cache: Dict[Tuple[str, str, str], CompiledTemplate] = {}
+_compiled_lock = threading.Lock()
+
 
 class TemplateManager:
     """Manage email templates and their validation."""
@@ -63,115 +209,81 @@ class TemplateManager:
     def render_template(self, template_name: str, locale: str = "fi", 
                       layout: str = "base_layout", **kwargs) -> Dict[str, Any]:
         """Render complete email template."""
-        # Load template content
-        template = self.load_template(template_name, locale)
-        template_content = template["content"]
+        return self.get_compiled(template_name, locale, layout).render(kwargs)
+    
+    def render_bulk(self, template_name: str, recipients: List[Dict[str, Any]],
+                    locale: str = "fi", layout: str = "base_layout",
+                    **common) -> List[Dict[str, Any]]:
+        """Render one template for many recipients.
         
-        # Load layout
-        layout_content = self.load_layout(layout)
+        The template is compiled (and its mtimes checked) once; each entry in
+        ``recipients`` supplies per-recipient values on top of ``common``.
+        """
+        compiled = self.get_compiled(template_name, locale, layout)
+        return [compiled.render({**common, **values}) for values in recipients]
+    
+    def get_compiled(self, template_name: str, locale: str = "fi",
+                     layout: str = "base_layout") -> CompiledTemplate:
+        """Get the compiled template, rebuilding it if a source file changed."""
+        key = (template_name, locale, layout)
+        compiled = _compiled_cache.get(key)
+        now = time.monotonic()
+        if compiled is not None:
+            if now - compiled.checked_at < TEMPLATE_CHECK_INTERVAL:
+                return compiled
+            if all(_mtime(path) == mtime for path, mtime in compiled.sources):
+                compiled.checked_at = now
+                return compiled
+            logger.info(f"Template changed on disk, recompiling: {key}")
         
-        # Load partials
-        legal_footer = self.load_partial("legal_footer")
-        unsubscribe_footer = self.load_partial("unsubscribe_footer")
-        social_links = self.load_partial("social_links")
+        with _compiled_lock:
+            compiled = self._compile(template_name, locale, layout)
+            _compiled_cache[key] = compiled
+        return compiled
+    
+    def clear_cache(self) -> None:
+        """Drop all compiled templates."""
+        with _compiled_lock:
+            _compiled_cache.clear()
+    
+    def _compile(self, template_name: str, locale: str, layout: str) -> CompiledTemplate:
+        paths = [
+            self.templates_dir / "locales" / locale / f"{template_name}.html",
+            self.templates_dir / "layouts" / f"{layout}.html",
+        ] + [self.templates_dir / "partials" / f"{name}.html" for name in PARTIALS]
+        # Read mtimes before content so an edit during compile triggers a rebuild
+        sources = tuple((path, _mtime(path)) for path in paths)
         
-        # Replace placeholders
-        rendered_content = template_content.format(
-            legal_footer=legal_footer,
-            unsubscribe_footer=unsubscribe_footer,
-            social_links=social_links,
-            **kwargs
-        )
+        template = self.load_template(template_name, locale)
+        partials = {name: self.load_partial(name) for name in PARTIALS}
+        body = _compose(self.load_layout(layout), template["content"], partials)
         
-        # Wrap in layout
-        final_content = layout_content.format(
-            content=rendered_content,
-            **kwargs
+        return CompiledTemplate(
+            name=template_name,
+            locale=locale,
+            layout=layout,
+            body=body,
+            subject=SUBJECTS.get(template_name, {}).get(locale, "Converto Business OS"),
+            preheader=PREHEADERS.get(template_name, {}).get(locale, "Converto Business OS"),
+            sources=sources,
+            checked_at=time.monotonic()
         )
-        
-        return {
-            "subject": self._get_subject(template_name, locale, **kwargs),
-            "preheader": self._get_preheader(template_name, locale, **kwargs),
-            "from": self._get_from_address(template_name),
-            "reply_to": self._get_reply_to_address(template_name),
-            "content": final_content,
-            "locale": locale,
-            "layout": layout
-        }
     
     def _get_subject(self, template_name: str, locale: str, **kwargs) -> str:
         """Get email subject based on template and locale."""
-        subjects = {
-            "pilot_onboarding": {
-                "fi": "Tervetuloa Converto Business OS:een! 🚀",
-                "en": "Welcome to Converto Business OS! 🚀",
-                "sv": "Välkommen till Converto Business OS! 🚀",
-                "ru": "Добро пожаловать в Converto Business OS! 🚀",
-                "et": "Tere tulemast Converto Business OS:esse! 🚀"
-            },
-            "deployment_notification": {
-                "fi": "Deployment {status} - {service_name}",
-                "en": "Deployment {status} - {service_name}",
-                "sv": "Deployment {status} - {service_name}",
-                "ru": "Deployment {status} - {service_name}",
-                "et": "Deployment {status} - {service_name}"
-            },
-            "error_alert": {
-                "fi": "🚨 {severity} Alert - {service_name}",
-                "en": "🚨 {severity} Alert - {service_name}",
-                "sv": "🚨 {severity} Alert - {service_name}",
-                "ru": "🚨 {severity} Alert - {service_name}",
-                "et": "🚨 {severity} Alert - {service_name}"
-            }
-        }
-        
-        return subjects.get(template_name, {}).get(locale, "Converto Business OS").format(**kwargs)
+        return SUBJECTS.get(template_name, {}).get(locale, "Converto Business OS").format(**kwargs)
     
     def _get_preheader(self, template_name: str, locale: str, **kwargs) -> str:
         """Get email preheader based on template and locale."""
-        preheaders = {
-            "pilot_onboarding": {
-                "fi": "Aloita automaatio 5 minuutissa",
-                "en": "Start automation in 5 minutes",
-                "sv": "Starta automatisering på 5 minuter",
-                "ru": "Начните автоматизацию за 5 минут",
-                "et": "Alusta automatiseerimine 5 minuti jooksul"
-            },
-            "deployment_notification": {
-                "fi": "Tarkista palvelun tila",
-                "en": "Check service status",
-                "sv": "Kontrollera tjänstestatus",
-                "ru": "Проверьте статус сервиса",
-                "et": "Kontrolli teenuse staatust"
-            },
-            "error_alert": {
-                "fi": "Tarkista palvelun tila välittömästi",
-                "en": "Check service status immediately",
-                "sv": "Kontrollera tjänstestatus omedelbart",
-                "ru": "Проверьте статус сервиса немедленно",
-                "et": "Kontrolli teenuse staatust kohe"
-            }
-        }
-        
-        return preheaders.get(template_name, {}).get(locale, "Converto Business OS").format(**kwargs)
+        return PREHEADERS.get(template_name, {}).get(locale, "Converto Business OS").format(**kwargs)
     
     def _get_from_address(self, template_name: str) -> str:
         """Get from address based on template type."""
-        from_addresses = {
-            "pilot_onboarding": "no-reply@converto.fi",
-            "deployment_notification": "no-reply@converto.fi",
-            "error_alert": "no-reply@converto.fi"
-        }
-        return from_addresses.get(template_name, "no-reply@converto.fi")
+        return FROM_ADDRESSES.get(template_name, "no-reply@converto.fi")
     
     def _get_reply_to_address(self, template_name: str) -> str:
         """Get reply-to address based on template type."""
-        reply_to_addresses = {
-            "pilot_onboarding": "support@converto.fi",
-            "deployment_notification": "support@converto.fi",
-            "error_alert": "support@converto.fi"
-        }
-        return reply_to_addresses.get(template_name, "support@converto.fi")
+        return REPLY_TO_ADDRESSES.get(template_name, "support@converto.fi")
     
     def _get_fallback_template(self, template_name: str, locale: str) -> Dict[str, Any]:
         """Get fallback template when original not found."""
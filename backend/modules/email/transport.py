@@ -0,0 +1,132 @@
+"""Shared Resend HTTP transport.
+
+All Resend calls (workflows, EmailService, batch, scheduled, attachments,
+domain verification) go through one app-lifetime ``httpx.AsyncClient``. It
+keeps connections alive (HTTP/2 when the ``h2`` package is installed), so a
+burst of onboarding emails reuses the same TLS connections instead of paying a
+handshake per message. Concurrent requests per host are capped by
+``RESEND_MAX_CONCURRENCY``. The client is closed in the app lifespan.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+import httpx
+
+from backend.config import get_settings
+
+logger = logging.getLogger("converto.email.transport")
+
+try:
+    import h2  # type: ignore  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RESEND_API_BASE = os.getenv("RESEND_API_BASE", "https://api.resend.com")
+RESEND_MAX_CONCURRENCY = int(os.getenv("RESEND_MAX_CONCURRENCY", "10"))
+RESEND_MAX_CONNECTIONS = int(os.getenv("RESEND_MAX_CONNECTIONS", "20"))
+RESEND_KEEPALIVE_EXPIRY = float(os.getenv("RESEND_KEEPALIVE_EXPIRY", "60"))
+
+
+class ResendTransport:
+    """Pooled Resend API client with a per-host concurrency limit."""
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str = RESEND_API_BASE,
+        max_concurrency: int = RESEND_MAX_CONCURRENCY,
+        timeout: float = 30.0,
+    ):
+        self.api_key = api_key or get_settings().resend_api_key or os.getenv("RESEND_API_KEY", "")
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=RESEND_MAX_CONNECTIONS,
+                    max_keepalive_connections=RESEND_MAX_CONNECTIONS,
+                    keepalive_expiry=RESEND_KEEPALIVE_EXPIRY,
+                ),
+                timeout=self.timeout,
+            )
+        return self._client
+
+    def _host_limit(self, path: str) -> asyncio.Semaphore:
+        host = httpx.URL(path).host or httpx.URL(self.base_url).host
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._host_limits[host] = semaphore
+        return semaphore
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        api_key: str | None = None,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request; ``path`` is relative to the Resend API base URL.
+
+        ``api_key`` overrides the default key (e.g. an ``EmailService`` created
+        with its own key). Extra keyword arguments go to ``httpx`` (``json``,
+        ``params``, ``data``, ``files``).
+        """
+        request_headers = {"Authorization": f"Bearer {api_key or self.api_key}"}
+        if headers:
+            request_headers.update(headers)
+        async with self._host_limit(path):
+            return await self.client.request(method, path, headers=request_headers, **kwargs)
+
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            logger.info("Resend transport closed")
+        self._client = None
+        self._host_limits.clear()
+
+
+_transport: ResendTransport | None = None
+
+
+def get_resend_transport() -> ResendTransport:
+    """Get the app-wide Resend transport (created lazily)."""
+    global _transport
+    if _transport is None:
+        _transport = ResendTransport()
+    return _transport
+
+
+async def close_resend_transport() -> None:
+    """Close pooled Resend connections (called from the app lifespan)."""
+    global _transport
+    if _transport is not None:
+        await _transport.aclose()
+    _transport = None
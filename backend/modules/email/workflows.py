@@ -12,7 +12,10 @@ import httpx
 from backend.config import get_settings
 from backend.modules.email.cost_guard import get_cost_guard
 from backend.modules.email.monitoring import get_email_monitoring
+from backend.modules.email.outbound_queue import get_outbound_email_queue
 from backend.modules.email.template_manager import get_template_manager
+from backend.modules.email.transport import get_resend_transport
+from shared_core.utils.redis import idempotency_store
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -21,8 +24,12 @@ settings = get_settings()
 class EmailWorkflow:
     """Base class for email workflows."""
 
+    # Workflows by name, used to dispatch queued jobs
+    registry: dict[str, "EmailWorkflow"] = {}
+
     def __init__(self, name: str):
         self.name = name
+        EmailWorkflow.registry[name] = self
         self.template_manager = get_template_manager()
         self.monitoring = get_email_monitoring()
         self.cost_guard = get_cost_guard()
@@ -35,7 +42,50 @@ class EmailWorkflow:
     async def send_email(
         self, template: str, recipient: str, locale: str = "fi", **kwargs
     ) -> dict[str, Any]:
-        """Send email with monitoring and cost control."""
+        """Send email with monitoring and cost control.
+
+        When the outbound queue is running the email is queued and its workers
+        deliver it (rate shaping and retries included), so the caller returns
+        immediately. Without Redis the email is sent inline as before.
+        """
+        job = {"action": "template", "template": template, "recipient": recipient}
+        queued = await self._enqueue({**job, "locale": locale, "kwargs": kwargs})
+        if queued:
+            return queued
+        return await self.deliver_email(template, recipient, locale, kwargs, self.max_retries)
+
+    async def _enqueue(self, job: dict[str, Any]) -> dict[str, Any] | None:
+        queue = get_outbound_email_queue()
+        if not queue.running:
+            return None
+        job_id = await queue.enqueue("workflow", {"workflow": self.name, **job})
+        if job_id is None:
+            return None
+        logger.info(f"Email queued: {job['action']} for {self.name} ({job_id})")
+        return {"success": True, "queued": True, "job_id": job_id}
+
+    async def handle_job(self, job: dict[str, Any]) -> dict[str, Any]:
+        """Deliver a queued job with a single attempt; the queue schedules retries."""
+        if job.get("action") == "template":
+            return await self.deliver_email(
+                job["template"],
+                job["recipient"],
+                job.get("locale", "fi"),
+                job.get("kwargs", {}),
+                max_attempts=1,
+            )
+        error = f"unknown_action:{job.get('action')}"
+        return {"success": False, "error": error, "retryable": False}
+
+    async def deliver_email(
+        self,
+        template: str,
+        recipient: str,
+        locale: str,
+        kwargs: dict[str, Any],
+        max_attempts: int,
+    ) -> dict[str, Any]:
+        """Cost check, render and send with up to ``max_attempts`` attempts."""
         start_time = time.time()
 
         # Check if email is allowed
@@ -46,37 +96,46 @@ class EmailWorkflow:
                 "success": False,
                 "error": cost_check["reason"],
                 "message": cost_check["message"],
+                "retryable": False,
             }
 
         # Generate idempotency key
         idempotency_key = self._generate_idempotency_key(template, recipient, kwargs)
 
-        # Check if we've already sent this email recently
-        if await self._is_duplicate(idempotency_key):
+        # Claim the key; a concurrent or recent duplicate short-circuits here
+        claimed, existing = await self._claim_idempotency_key(idempotency_key)
+        if not claimed:
             logger.info(f"Duplicate email prevented: {template} to {recipient}")
-            return {"success": True, "duplicate": True, "message": "Email already sent recently"}
+            return self._duplicate_result(existing)
 
         # Render template
         try:
             email_data = self.template_manager.render_template(template, locale, **kwargs)
         except Exception as e:
             logger.error(f"Template rendering failed: {e}")
-            return {"success": False, "error": "template_render_failed", "message": str(e)}
+            await self._release_idempotency_key(idempotency_key)
+            return {
+                "success": False,
+                "error": "template_render_failed",
+                "message": str(e),
+                "retryable": False,
+            }
 
         # Send email with retries
-        for attempt in range(self.max_retries):
+        for attempt in range(max_attempts):
             try:
                 result = await self._send_via_resend(email_data, recipient, idempotency_key)
 
                 if result["success"]:
+                    # Store outcome for the idempotency window
+                    await self._store_idempotency_key(idempotency_key, result)
+                    await self.cost_guard.record_email_sent(self.name)
+
                     # Record success metrics
                     latency = time.time() - start_time
                     await self.monitoring.record_email_sent(template, locale, "sent")
                     await self.monitoring.record_email_delivered(template, locale, latency)
 
-                    # Store idempotency key
-                    await self._store_idempotency_key(idempotency_key)
-
                     logger.info(f"Email sent successfully: {template} to {recipient}")
                     return result
                 else:
@@ -88,13 +147,12 @@ class EmailWorkflow:
                 logger.error(f"Email send error (attempt {attempt + 1}): {e}")
 
             # Wait before retry
-            if attempt < self.max_retries - 1:
+            if attempt < max_attempts - 1:
                 await asyncio.sleep(self.retry_delay * (2**attempt))  # Exponential backoff
 
-        # All retries failed
-        logger.error(
-            f"Email send failed after {self.max_retries} attempts: {template} to {recipient}"
-        )
+        # All retries failed - release the claim so a later retry can send
+        await self._release_idempotency_key(idempotency_key)
+        logger.error(f"Email send failed after {max_attempts} attempts: {template} to {recipient}")
         return {
             "success": False,
             "error": "max_retries_exceeded",
@@ -105,32 +163,28 @@ class EmailWorkflow:
         self, email_data: dict[str, Any], recipient: str, idempotency_key: str
     ) -> dict[str, Any]:
         """Send email via Resend API."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    "https://api.resend.com/emails",
-                    headers={
-                        "Authorization": f"Bearer {settings.resend_api_key}",
-                        "Content-Type": "application/json",
-                        "Idempotency-Key": idempotency_key,
-                    },
-                    json={
-                        "from": email_data["from"],
-                        "to": [recipient],
-                        "subject": email_data["subject"],
-                        "html": email_data["content"],
-                        "reply_to": email_data["reply_to"],
-                    },
-                )
-
-                response.raise_for_status()
-                result = response.json()
-
-                return {"success": True, "message_id": result.get("id"), "status": "sent"}
-
-            except httpx.HTTPError as e:
-                logger.error(f"Resend API error: {e}")
-                return {"success": False, "error": "resend_api_error", "message": str(e)}
+        try:
+            response = await get_resend_transport().post(
+                "/emails",
+                api_key=settings.resend_api_key,
+                headers={"Idempotency-Key": idempotency_key},
+                json={
+                    "from": email_data["from"],
+                    "to": [recipient],
+                    "subject": email_data["subject"],
+                    "html": email_data["content"],
+                    "reply_to": email_data["reply_to"],
+                },
+            )
+
+            response.raise_for_status()
+            result = response.json()
+
+            return {"success": True, "message_id": result.get("id"), "status": "sent"}
+
+        except httpx.HTTPError as e:
+            logger.error(f"Resend API error: {e}")
+            return {"success": False, "error": "resend_api_error", "message": str(e)}
 
     def _generate_idempotency_key(
         self, template: str, recipient: str, kwargs: dict[str, Any]
@@ -139,17 +193,35 @@ class EmailWorkflow:
         content = f"{template}:{recipient}:{sorted(kwargs.items())}"
         return hashlib.sha256(content.encode()).hexdigest()
 
-    async def _is_duplicate(self, idempotency_key: str) -> bool:
-        """Check if email was already sent recently."""
-        # In real implementation, this would check a database
-        # For now, return False (no duplicates)
-        return False
+    async def _claim_idempotency_key(
+        self, idempotency_key: str
+    ) -> tuple[bool, dict[str, Any] | None]:
+        """Atomically claim the key (SET NX) before sending."""
+        return await asyncio.to_thread(idempotency_store.claim, idempotency_key)
+
+    async def _store_idempotency_key(self, idempotency_key: str, result: dict[str, Any]):
+        """Store the send outcome so duplicates within the window are skipped."""
+        await asyncio.to_thread(
+            idempotency_store.complete,
+            idempotency_key,
+            {"message_id": result.get("message_id")},
+            self.idempotency_window,
+        )
 
-    async def _store_idempotency_key(self, idempotency_key: str):
-        """Store idempotency key to prevent duplicates."""
-        # In real implementation, this would store in database with TTL
-        # For now, just log
-        logger.info(f"Stored idempotency key: {idempotency_key}")
+    async def _release_idempotency_key(self, idempotency_key: str):
+        """Release the claim after a failed send."""
+        await asyncio.to_thread(idempotency_store.release, idempotency_key)
+
+    @staticmethod
+    def _duplicate_result(existing: dict[str, Any] | None) -> dict[str, Any]:
+        existing = existing or {}
+        return {
+            "success": True,
+            "duplicate": True,
+            "in_progress": existing.get("status") == "pending",
+            "message_id": existing.get("message_id"),
+            "message": "Email already sent recently",
+        }
 
 
 class PilotOnboardingWorkflow(EmailWorkflow):
@@ -165,6 +237,40 @@ class PilotOnboardingWorkflow(EmailWorkflow):
         """Start pilot onboarding workflow."""
         logger.info(f"Starting pilot onboarding for {user_name} ({user_email})")
 
+        queued = await self._enqueue(
+            {
+                "action": "welcome",
+                "user_name": user_name,
+                "user_email": user_email,
+                "locale": locale,
+                "company": company,
+                "document_types": document_types,
+            }
+        )
+        if queued:
+            return queued
+        return await self._send_welcome(user_name, user_email, locale, company, document_types)
+
+    async def handle_job(self, job: dict[str, Any]) -> dict[str, Any]:
+        if job.get("action") == "welcome":
+            return await self._send_welcome(
+                job["user_name"],
+                job["user_email"],
+                job.get("locale", "fi"),
+                job.get("company", "Converto Business OS"),
+                job.get("document_types"),
+            )
+        return await super().handle_job(job)
+
+    async def _send_welcome(
+        self,
+        user_name: str,
+        user_email: str,
+        locale: str,
+        company: str,
+        document_types: list[str] | None,
+    ) -> dict[str, Any]:
+        """Render and send the pilot welcome email, then schedule follow-ups."""
         # Send welcome email using pilot_signup_welcome template
         from backend.modules.email.templates import EmailTemplates
 
@@ -179,7 +285,18 @@ class PilotOnboardingWorkflow(EmailWorkflow):
         api_key = os.getenv("RESEND_API_KEY")
         if not api_key:
             logger.error("RESEND_API_KEY not configured")
-            return {"success": False, "error": "RESEND_API_KEY not configured"}
+            return {"success": False, "error": "RESEND_API_KEY not configured", "retryable": False}
+
+        # Queued jobs can be redelivered (expired lease), so claim the send like deliver_email
+        idempotency_key = self._generate_idempotency_key(
+            "pilot_signup_welcome",
+            user_email,
+            {"user_name": user_name, "company": company, "document_types": document_types},
+        )
+        claimed, existing = await self._claim_idempotency_key(idempotency_key)
+        if not claimed:
+            logger.info(f"Duplicate pilot welcome email prevented: {user_email}")
+            return self._duplicate_result(existing)
 
         email_service = EmailService(api_key)
         email_data = EmailData(
@@ -188,9 +305,14 @@ class PilotOnboardingWorkflow(EmailWorkflow):
             html=html_content,
             from_email=os.getenv("RESEND_FROM_EMAIL", "info@converto.fi"),
             reply_to="info@converto.fi",
+            tags=[{"name": "route", "value": self.name}],
         )
 
         result = await email_service.send_email(email_data)
+        if result.get("success"):
+            await self._store_idempotency_key(idempotency_key, {"message_id": result.get("id")})
+        else:
+            await self._release_idempotency_key(idempotency_key)
 
         # Also record metrics
         if result.get("success"):
@@ -328,6 +450,18 @@ deployment_notification = DeploymentNotificationWorkflow()
 error_alert = ErrorAlertWorkflow()
 
 
+async def handle_queued_workflow_job(job: dict[str, Any]) -> dict[str, Any]:
+    """Outbound queue handler: dispatch a job to the workflow that queued it."""
+    workflow = EmailWorkflow.registry.get(job.get("workflow"))
+    if workflow is None:
+        error = f"unknown_workflow:{job.get('workflow')}"
+        return {"success": False, "error": error, "retryable": False}
+    return await workflow.handle_job(job)
+
+
+get_outbound_email_queue().register("workflow", handle_queued_workflow_job)
+
+
 class EmailWorkflows:
     """Container class for all email workflows."""
 
@@ -5,17 +5,47 @@ Auto-creates Linear issues from:
 - Deployment failures
 - Customer feedback
 - Critical alerts
+
+Also handles Linear webhooks: changes to teams, labels, users and workflow
+states invalidate the cached metadata lists.
 """
 
 from __future__ import annotations
 
+import hashlib
+import hmac
 import logging
+import os
+import time
 from typing import Any
 
+from shared_core.modules.linear.cache import get_linear_metadata_cache
 from shared_core.modules.linear.client_optimized import get_linear_client_optimized
 
 logger = logging.getLogger("converto.linear.automation")
 
+LINEAR_WEBHOOK_SECRET = os.getenv("LINEAR_WEBHOOK_SECRET", "")
+# Linear recommends rejecting webhooks older than a minute (replay protection)
+LINEAR_WEBHOOK_MAX_AGE = int(os.getenv("LINEAR_WEBHOOK_MAX_AGE", "60"))
+
+# Webhook resource type -> cached metadata lists it affects
+WEBHOOK_INVALIDATIONS: dict[str, tuple[str, ...]] = {
+    "Team": ("teams", "labels", "states"),
+    "TeamMembership": ("teams", "users"),
+    "User": ("users", "teams"),
+    "IssueLabel": ("labels",),
+    "WorkflowState": ("states",),
+}
+
+
+def verify_webhook_signature(body: bytes, signature: str | None, secret: str | None = None) -> bool:
+    """Check the ``Linear-Signature`` header (hex HMAC-SHA256 of the raw body)."""
+    secret = secret or LINEAR_WEBHOOK_SECRET
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
 
 class LinearAutomation:
     """Automation for Linear issue creation."""
@@ -173,6 +203,22 @@ class LinearAutomation:
             logger.error(f"Failed to create Linear issue from feedback: {e}")
             return None
 
+    async def handle_webhook(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Handle a verified Linear webhook; invalidates affected metadata caches."""
+        timestamp = payload.get("webhookTimestamp")
+        if timestamp and abs(time.time() * 1000 - timestamp) > LINEAR_WEBHOOK_MAX_AGE * 1000:
+            logger.warning(f"Ignoring stale Linear webhook: {payload.get('type')}")
+            return {"handled": False, "reason": "stale"}
+
+        resource = payload.get("type", "")
+        kinds = WEBHOOK_INVALIDATIONS.get(resource, ())
+        cache = get_linear_metadata_cache()
+        for kind in kinds:
+            await cache.invalidate(kind)
+
+        logger.info(f"Linear webhook {resource}.{payload.get('action')}: invalidated {kinds}")
+        return {"handled": True, "type": resource, "invalidated": list(kinds)}
+
     async def _get_label_id(self, team_id: str, label_name: str) -> str | None:
         """Get label ID by name."""
         try:
@@ -11,12 +11,23 @@ import os
 from datetime import datetime
 from typing import Any
 
-import anthropic
-from openai import OpenAI
+from prometheus_client import Counter
 
-# Initialize AI clients
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-claude_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+from shared_core.modules.ai.clients import ProviderClients, get_provider_clients
+
+# "race": hyväksy ensimmäinen tarkistukset läpäisevä tulos, "consensus": odota aina molempia
+PREMIUM_OCR_MODE = os.getenv("PREMIUM_OCR_MODE", "race").lower()
+PREMIUM_OCR_ACCEPT_CONFIDENCE = float(os.getenv("PREMIUM_OCR_ACCEPT_CONFIDENCE", "0.85"))
+# Race-tilassa Claude käynnistetään vasta kun GPT epäonnistuu, palauttaa kelpaamattoman
+# tuloksen tai ei vastaa tässä ajassa (~GPT-4o-mini Vision p50). 0 = molemmat heti.
+PREMIUM_OCR_HEDGE_DELAY = float(os.getenv("PREMIUM_OCR_HEDGE_DELAY", "4.0"))
+AMOUNT_TOLERANCE = 0.02
+
+PREMIUM_OCR_EXTRACTIONS = Counter(
+    "premium_ocr_extractions_total",
+    "Premium OCR extractions by number of models needed",
+    ["models"],
+)
 
 
 class EuropeanVATEngine:
@@ -195,9 +206,25 @@ class OCRAuditTrail:
 class PremiumOCRProcessor:
     """Premium OCR processor with dual AI validation"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        clients: ProviderClients | None = None,
+        mode: str = PREMIUM_OCR_MODE,
+        accept_confidence: float = PREMIUM_OCR_ACCEPT_CONFIDENCE,
+        hedge_delay: float = PREMIUM_OCR_HEDGE_DELAY,
+    ):
         self.vat_engine = EuropeanVATEngine()
         self.audit_trail = OCRAuditTrail()
+        self._clients = clients
+        self.mode = mode
+        self.accept_confidence = accept_confidence
+        self.hedge_delay = hedge_delay
+        self.extraction_stats = {"documents": 0, "second_model_needed": 0}
+
+    @property
+    def clients(self) -> ProviderClients:
+        # Resolved per call so a swapped app-wide instance is picked up
+        return self._clients or get_provider_clients()
 
     async def process_document(
         self, image_bytes: bytes, country: str = "FI", user_id: str = "system"
@@ -209,6 +236,7 @@ class PremiumOCRProcessor:
 
         # 2. Dual AI OCR extraction
         ocr_result = await self._dual_ai_extraction(image_bytes)
+        ai_models = ocr_result.pop("ai_models_used")
 
         # 3. Älykäs ALV-laskenta
         vat_result = self.vat_engine.calculate_vat_intelligently(
@@ -226,7 +254,9 @@ class PremiumOCRProcessor:
             **ocr_result,
             "vat_calculation": vat_result,
             "processing_metadata": {
-                "ai_models": ["gpt-4o", "claude-3.5"],
+                "ai_models": ai_models,
+                "second_model_needed": len(ai_models) > 1,
+                "second_model_rate": self.second_model_rate(),
                 "processing_time": datetime.utcnow().isoformat(),
                 "country": country,
                 "confidence_score": self._calculate_overall_confidence(ocr_result, vat_result),
@@ -235,7 +265,7 @@ class PremiumOCRProcessor:
 
         # 5. Audit trail
         audit_id = self.audit_trail.create_audit_entry(
-            image_hash, final_result, user_id, ["gpt-4o", "claude-3.5"]
+            image_hash, final_result, user_id, ai_models
         )
 
         final_result["audit_id"] = audit_id
@@ -243,16 +273,126 @@ class PremiumOCRProcessor:
         return final_result
 
     async def _dual_ai_extraction(self, image_bytes: bytes) -> dict[str, Any]:
-        """Dual AI extraction with consensus"""
+        """Dual AI extraction with consensus
 
-        # Parallel processing
-        gpt_task = self._openai_vision_extract(image_bytes)
-        claude_task = self._claude_vision_extract(image_bytes)
+        In race mode GPT runs first and Claude is only started (hedged) when
+        GPT fails, returns a result that does not pass the confidence and
+        consistency checks, or takes longer than ``hedge_delay`` seconds. The
+        first acceptable result wins and the other call is cancelled;
+        otherwise both results are merged as in consensus mode.
+        """
 
-        gpt_result, claude_result = await asyncio.gather(gpt_task, claude_task)
+        if self.mode != "race":
+            gpt_result, claude_result = await asyncio.gather(
+                self._openai_vision_extract(image_bytes),
+                self._claude_vision_extract(image_bytes),
+            )
+            return self._merged(gpt_result, claude_result)
 
+        gpt_task = asyncio.create_task(self._openai_vision_extract(image_bytes))
+        tasks = [gpt_task]
+        try:
+            if self.hedge_delay > 0:
+                await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if gpt_task.done() and self._is_acceptable(gpt_task.result()):
+                return self._single(gpt_task.result())
+
+            # GPT hidas tai kelpaamaton -> hedge-pyyntö Claudelle
+            tasks.append(asyncio.create_task(self._claude_vision_extract(image_bytes)))
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            if pending:
+                first = next(iter(done)).result()
+                if self._is_acceptable(first):
+                    return self._single(first, second_model_needed=True)
+            gpt_result, claude_result = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if self._is_acceptable(claude_result) and not self._is_acceptable(gpt_result):
+            # GPT:n kelpaamaton tulos ei saa laimentaa Clauden tulosta
+            return self._single(claude_result, second_model_needed=True)
         # AI consensus merge
-        return self._ai_consensus_merge(gpt_result, claude_result)
+        return self._merged(gpt_result, claude_result)
+
+    def _single(self, result: dict, second_model_needed: bool = False) -> dict[str, Any]:
+        self._record_extraction(second_model_needed=second_model_needed)
+        return {**result, "ai_consensus": False, "ai_models_used": [result["ai_source"]]}
+
+    def _merged(self, gpt_result: dict, claude_result: dict) -> dict[str, Any]:
+        self._record_extraction(second_model_needed=True)
+        merged = self._ai_consensus_merge(gpt_result, claude_result)
+        merged["ai_models_used"] = ["gpt-4o", "claude-3.5"]
+        return merged
+
+    def _record_extraction(self, second_model_needed: bool) -> None:
+        self.extraction_stats["documents"] += 1
+        if second_model_needed:
+            self.extraction_stats["second_model_needed"] += 1
+        PREMIUM_OCR_EXTRACTIONS.labels(models="dual" if second_model_needed else "single").inc()
+
+    def second_model_rate(self) -> float:
+        """Osuus dokumenteista, joihin tarvittiin molemmat mallit"""
+        documents = self.extraction_stats["documents"]
+        if not documents:
+            return 0.0
+        return round(self.extraction_stats["second_model_needed"] / documents, 3)
+
+    def _is_acceptable(self, result: dict[str, Any]) -> bool:
+        """Luottamus- ja johdonmukaisuustarkistukset yksittäiselle mallille"""
+
+        if result.get("error"):
+            return False
+        try:
+            confidence = float(result.get("confidence") or 0.0)
+        except (TypeError, ValueError):
+            return False
+        if confidence < self.accept_confidence:
+            return False
+        if not result.get("vendor") or not result.get("date"):
+            return False
+
+        total = self._as_float(result.get("total_amount"))
+        vat = self._as_float(result.get("vat_amount"))
+        net = self._as_float(result.get("net_amount"))
+        rate = self._as_float(result.get("vat_rate"))
+        if total is None or total <= 0:
+            return False
+
+        # brutto = netto + ALV
+        if vat is not None:
+            if vat < 0 or vat > total:
+                return False
+            if net is not None and abs(net + vat - total) > AMOUNT_TOLERANCE:
+                return False
+            # ALV = brutto * p / (100 + p)
+            if rate is not None:
+                percent = rate * 100 if 0 < rate < 1 else rate
+                expected_vat = total * percent / (100 + percent)
+                if abs(expected_vat - vat) > max(AMOUNT_TOLERANCE, total * 0.005):
+                    return False
+
+        # Rivien summa ei saa ylittää kokonaissummaa
+        item_totals = [
+            self._as_float(item.get("total_price") or item.get("price"))
+            for item in result.get("items") or []
+            if isinstance(item, dict)
+        ]
+        return not (
+            item_totals
+            and None not in item_totals
+            and sum(item_totals) > total + AMOUNT_TOLERANCE
+        )
+
+    @staticmethod
+    def _as_float(value: Any) -> float | None:
+        if value is None or value == "":
+            return None
+        try:
+            return float(str(value).replace(",", ".").replace(" ", ""))
+        except (TypeError, ValueError):
+            return None
 
     async def _openai_vision_extract(self, image_bytes: bytes) -> dict[str, Any]:
         """GPT-4o Vision extraction"""
@@ -268,23 +408,24 @@ class PremiumOCRProcessor:
         """
 
         try:
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/jpeg;base64,{b64_image}"},
-                            },
-                        ],
-                    }
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-            )
+            async with self.clients.limit("openai"):
+                response = await self.clients.openai().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": prompt},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {"url": f"data:image/jpeg;base64,{b64_image}"},
+                                },
+                            ],
+                        }
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.1,
+                )
 
             result = json.loads(response.choices[0].message.content)
             result["ai_source"] = "gpt-4o"
@@ -317,26 +458,27 @@ class PremiumOCRProcessor:
         """
 
         try:
-            message = claude_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/jpeg",
-                                    "data": b64_image,
+            async with self.clients.limit("anthropic"):
+                message = await self.clients.anthropic().messages.create(
+                    model="claude-3-5-sonnet-20241022",
+                    max_tokens=1000,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": prompt},
+                                {
+                                    "type": "image",
+                                    "source": {
+                                        "type": "base64",
+                                        "media_type": "image/jpeg",
+                                        "data": b64_image,
+                                    },
                                 },
-                            },
-                        ],
-                    }
-                ],
-            )
+                            ],
+                        }
+                    ],
+                )
 
             # Parse Claude's response (assume it's JSON)
             result_text = message.content[0].text
@@ -411,27 +553,3 @@ async def process_invoice_premium(image_bytes: bytes, country: str = "FI") -> di
     """Premium invoice processing"""
     return await premium_ocr.process_document(image_bytes, country)
 
-
-# Backward compatibility
-def vision_enrich_receipt(image_bytes: bytes) -> dict[str, Any]:
-    """Legacy function - redirects to premium processing"""
-    import asyncio
-
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(process_receipt_premium(image_bytes))
-    finally:
-        loop.close()
-
-
-def vision_enrich_invoice(image_bytes: bytes) -> dict[str, Any]:
-    """Legacy function - redirects to premium processing"""
-    import asyncio
-
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(process_invoice_premium(image_bytes))
-    finally:
-        loop.close()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare OCR preprocessing modes ("full" vs "adaptive") on a fixture corpus.
+
+Usage:
+    python scripts/ocr_preprocess_benchmark.py path/to/fixtures
+
+The fixture directory holds label/receipt photos. An optional expected.json
+maps file names to the specs they should yield, e.g.
+{"kettle.jpg": {"rated_watts": 2200, "voltage_v": 230}}.
+
+For each mode the script reports the mean OCR time and how often the
+extracted specs match the expected values. It also reports how closely the
+adaptive text matches the full-resolution text.
+"""
+
+import difflib
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+from shared_core.modules.ocr.codec import decode_image
+from shared_core.modules.ocr.service import extract_specs, run_ocr_gray
+
+MODES = ("full", "adaptive")
+SPEC_FIELDS = ("rated_watts", "voltage_v", "current_a")
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+
+
+def run(fixtures: Path) -> None:
+    images = sorted(p for p in fixtures.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        print(f"No images found in {fixtures}")
+        return
+
+    expected_path = fixtures / "expected.json"
+    expected = json.loads(expected_path.read_text()) if expected_path.exists() else {}
+
+    timings = {mode: [] for mode in MODES}
+    spec_hits = {mode: 0 for mode in MODES}
+    spec_total = 0
+    similarity = []
+
+    for path in images:
+        gray = cv2.cvtColor(decode_image(path.read_bytes()), cv2.COLOR_BGR2GRAY)
+        texts = {}
+        for mode in MODES:
+            start = time.perf_counter()
+            texts[mode] = run_ocr_gray(gray, mode)
+            timings[mode].append(time.perf_counter() - start)
+
+        ratio = difflib.SequenceMatcher(None, texts["full"], texts["adaptive"]).ratio()
+        similarity.append(ratio)
+
+        truth = expected.get(path.name, {})
+        line = (
+            f"{path.name:40s} full={timings['full'][-1]:.2f}s "
+            f"adaptive={timings['adaptive'][-1]:.2f}s text_sim={ratio:.2f}"
+        )
+        for field, value in truth.items():
+            if field not in SPEC_FIELDS:
+                continue
+            spec_total += 1
+            for mode in MODES:
+                if extract_specs(texts[mode]).get(field) == value:
+                    spec_hits[mode] += 1
+        print(line)
+
+    print()
+    print(f"Images: {len(images)}")
+    for mode in MODES:
+        mean = sum(timings[mode]) / len(timings[mode])
+        print(f"{mode:9s} mean OCR time: {mean:.2f}s", end="")
+        if spec_total:
+            print(f"  spec accuracy: {spec_hits[mode]}/{spec_total}", end="")
+        print()
+    print(f"Mean text similarity adaptive vs full: {sum(similarity) / len(similarity):.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    run(Path(sys.argv[1]))
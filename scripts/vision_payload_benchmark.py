@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Measure what image normalisation saves on Vision API uploads.
+
+Usage:
+    python scripts/vision_payload_benchmark.py path/to/fixtures [--extract]
+
+The fixture directory holds receipt/invoice uploads (JPEG, PNG, HEIC, PDF).
+For each file the script reports the bytes sent and the estimated image
+tokens with and without ``normalize_for_vision``.
+
+With --extract it also calls ``process_receipt`` both ways (needs
+OPENAI_API_KEY) and compares the result with an optional expected.json, e.g.
+{"lidl.jpg": {"vendor": "Lidl", "total_amount": 23.45, "receipt_date": "2024-05-02"}}.
+"""
+
+import asyncio
+import io
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from shared_core.modules.ocr.normalize import is_pdf, normalize_for_vision
+from shared_core.modules.receipts.vision_service import process_receipt
+
+SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif", ".pdf"}
+FIELDS = ("vendor", "total_amount", "vat_amount", "receipt_date")
+
+
+def image_tokens(width: int, height: int) -> int:
+    """High-detail token estimate: 85 + 170 per 512px tile after downsampling."""
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def field_hits(result: dict, truth: dict) -> int:
+    hits = 0
+    for field, value in truth.items():
+        got = result.get(field)
+        if isinstance(value, float) and isinstance(got, int | float):
+            hits += abs(got - value) <= 0.01
+        elif isinstance(value, str) and isinstance(got, str):
+            hits += got.strip().lower() == value.strip().lower()
+        else:
+            hits += got == value
+    return hits
+
+
+async def run(fixtures: Path, extract: bool) -> None:
+    files = sorted(p for p in fixtures.iterdir() if p.suffix.lower() in SUFFIXES)
+    if not files:
+        print(f"No uploads found in {fixtures}")
+        return
+
+    expected_path = fixtures / "expected.json"
+    expected = json.loads(expected_path.read_text()) if expected_path.exists() else {}
+
+    totals = {"raw_bytes": 0, "norm_bytes": 0, "raw_tokens": 0, "norm_tokens": 0}
+    hits = {"raw": 0, "normalized": 0}
+    checked = 0
+
+    for path in files:
+        raw = path.read_bytes()
+        start = time.perf_counter()
+        normalized = normalize_for_vision(raw)
+        elapsed = time.perf_counter() - start
+
+        norm_tokens = image_tokens(normalized.width, normalized.height)
+        if is_pdf(raw):
+            # PDF:ää ei voi lähettää sellaisenaan - vertaa renderöityyn sivuun
+            raw_size, raw_tokens = normalized.original_bytes, norm_tokens
+        else:
+            with Image.open(io.BytesIO(raw)) as img:
+                raw_size, raw_tokens = len(raw), image_tokens(*img.size)
+
+        totals["raw_bytes"] += raw_size
+        totals["norm_bytes"] += len(normalized.data)
+        totals["raw_tokens"] += raw_tokens
+        totals["norm_tokens"] += norm_tokens
+
+        line = (
+            f"{path.name:40s} {raw_size / 1024:8.0f} KB -> {len(normalized.data) / 1024:6.0f} KB "
+            f"{normalized.width}x{normalized.height} tokens {raw_tokens}->{norm_tokens} "
+            f"crop={'y' if normalized.cropped else 'n'} {elapsed * 1000:.0f} ms"
+        )
+
+        truth = {k: v for k, v in expected.get(path.name, {}).items() if k in FIELDS}
+        if extract and truth and not is_pdf(raw):
+            checked += len(truth)
+            file_hits = {}
+            for label, normalize in (("raw", False), ("normalized", True)):
+                result = await process_receipt(raw, normalize=normalize)
+                file_hits[label] = field_hits(result, truth)
+                hits[label] += file_hits[label]
+            line += f" fields raw={file_hits['raw']} norm={file_hits['normalized']}/{len(truth)}"
+        print(line)
+
+    print()
+    print(f"Files: {len(files)}")
+    print(
+        f"Bytes sent: {totals['raw_bytes'] / 1024:.0f} KB -> {totals['norm_bytes'] / 1024:.0f} KB "
+        f"({100 * totals['norm_bytes'] / max(1, totals['raw_bytes']):.1f}%)"
+    )
+    print(f"Estimated image tokens: {totals['raw_tokens']} -> {totals['norm_tokens']}")
+    if checked:
+        print(
+            f"Field accuracy raw: {hits['raw']}/{checked}  "
+            f"normalized: {hits['normalized']}/{checked}"
+        )
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) != 1:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(run(Path(args[0]), "--extract" in sys.argv))
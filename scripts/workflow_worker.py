@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Run a standalone workflow step worker.
+
+Usage:
+    WORKFLOW_DISTRIBUTED=true python scripts/workflow_worker.py [--concurrency N]
+
+Claims steps queued by API processes running with WORKFLOW_DISTRIBUTED=true
+(the ``workflow:steps`` Redis stream), runs the agent with the default
+agent registry and reports the result back. Start as many as needed on any
+host that reaches the same Redis; stop with Ctrl+C, unfinished steps are taken
+over by other workers after WORKFLOW_STEP_VISIBILITY_TIMEOUT.
+"""
+
+import asyncio
+import contextlib
+import logging
+import sys
+
+from shared_core.modules.agent_orchestrator.distributed import (
+    WORKFLOW_WORKER_CONCURRENCY,
+    WorkflowStepWorker,
+)
+from shared_core.modules.agent_orchestrator.router import get_orchestrator
+from shared_core.utils.redis import stream_queue
+
+
+async def run(concurrency: int) -> None:
+    if not stream_queue.enabled:
+        print("Redis is not available - nothing to do")
+        sys.exit(1)
+
+    worker = WorkflowStepWorker(get_orchestrator().workflow_engine, concurrency=concurrency)
+    await worker.start()
+    print(f"Worker {worker.consumer} running with {concurrency} slots")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    concurrency = WORKFLOW_WORKER_CONCURRENCY
+    if "--concurrency" in sys.argv:
+        concurrency = int(sys.argv[sys.argv.index("--concurrency") + 1])
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run(concurrency))
@@ -43,6 +43,8 @@ class AgentMetadata:
     fallback_agent_id: str | None = None  # Fallback agent if this one fails
     max_retries: int = 3  # Maximum retry attempts
     timeout_ms: int = 30000  # Timeout in milliseconds
+    max_concurrency: int | None = None  # Max simultaneous executions (None = unlimited)
+    cache_ttl_seconds: int | None = None  # Memoize results per input (None = never cache)
 
     def __post_init__(self):
         if self.tags is None:
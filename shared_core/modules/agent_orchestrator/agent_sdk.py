@@ -22,6 +22,7 @@ def register_agent(
     fallback_agent_id: str | None = None,
     max_retries: int = 3,
     timeout_ms: int = 30000,
+    cache_ttl_seconds: int | None = None,
 ):
     """Decorator to register an agent easily.
 
@@ -50,6 +51,7 @@ def register_agent(
         fallback_agent_id: Fallback agent ID
         max_retries: Maximum retry attempts
         timeout_ms: Timeout in milliseconds
+        cache_ttl_seconds: Memoize results per input for this long (deterministic agents)
     """
 
     def decorator(func):
@@ -80,6 +82,7 @@ def register_agent(
                     fallback_agent_id=fallback_agent_id,
                     max_retries=max_retries,
                     timeout_ms=timeout_ms,
+                    cache_ttl_seconds=cache_ttl_seconds,
                 )
 
             async def validate_input(self, input_data: dict[str, Any]) -> bool:
@@ -150,6 +153,7 @@ class AgentSDK:
                     fallback_agent_id=metadata_kwargs.get("fallback_agent_id"),
                     max_retries=metadata_kwargs.get("max_retries", 3),
                     timeout_ms=metadata_kwargs.get("timeout_ms", 30000),
+                    cache_ttl_seconds=metadata_kwargs.get("cache_ttl_seconds"),
                 )
 
             async def validate_input(self, input_data: dict[str, Any]) -> bool:
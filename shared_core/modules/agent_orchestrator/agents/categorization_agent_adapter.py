@@ -3,6 +3,8 @@
 import logging
 from typing import Any
 
+from shared_core.modules.ai.clients import get_provider_clients
+
 from ..agent_registry import Agent, AgentMetadata, AgentType
 
 logger = logging.getLogger("converto.agent_orchestrator")
@@ -84,17 +86,11 @@ class CategorizationAgentAdapter(Agent):
         """
         try:
             # Try to use OpenAI if available
-            import os
-
-            openai_api_key = os.getenv("OPENAI_API_KEY")
+            clients = get_provider_clients()
 
-            if not openai_api_key:
+            if not clients.openai_configured:
                 return None, [], 0.0
 
-            from openai import AsyncOpenAI
-
-            client = AsyncOpenAI(api_key=openai_api_key)
-
             # Build context
             context = f"Merchant: {merchant_name}\n"
             if items:
@@ -115,12 +111,13 @@ Respond with JSON:
   "confidence": 0.0-1.0
 }}"""
 
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=200,
-            )
+            async with clients.limit("openai"):
+                response = await clients.openai().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=200,
+                )
 
             import json
 
@@ -249,6 +246,7 @@ Respond with JSON:
             dependencies=["ocr_agent"],  # Depends on OCR for text
             cost_per_request=0.001,  # OpenAI API cost
             avg_response_time_ms=1500,
+            cache_ttl_seconds=900,  # LLM-backed: reuse only for quick re-runs
         )
 
     async def validate_input(self, input_data: dict[str, Any]) -> bool:
@@ -5,8 +5,9 @@ import json
 import logging
 from typing import Any
 
-from shared_core.modules.ocr.privacy import blur_faces_and_plates
-from shared_core.modules.ocr.service import run_ocr_bytes
+from shared_core.modules.ai.clients import get_provider_clients
+from shared_core.modules.ocr.executor import run_cpu
+from shared_core.modules.ocr.pipeline import blur_and_ocr
 
 from ..agent_registry import Agent, AgentMetadata, AgentType
 
@@ -57,50 +58,48 @@ class OCRAgentAdapter(Agent):
                     "No receipt data provided (receipt_bytes, receipt_file, or receipt_url required)"
                 )
 
-            # Blur faces and license plates for privacy
-            safe_bytes = blur_faces_and_plates(receipt_bytes)
-
-            # Run OCR
-            ocr_text = run_ocr_bytes(safe_bytes)
+            # Blur faces and license plates for privacy, then run OCR (single decode)
+            use_vision = input_data.get("use_vision", True)
+            ocr_text, safe_bytes = await run_cpu(
+                "pipeline",
+                blur_and_ocr,
+                receipt_bytes,
+                use_vision,
+                input_data.get("document_type", "receipt"),
+            )
 
             # Run vision enrichment if needed (for receipts, not power devices)
             vision_data = None
-            if input_data.get("use_vision", True):
+            if use_vision:
                 try:
                     # Use a receipt-specific vision prompt
-                    import os
-
-                    from openai import AsyncOpenAI
-
-                    openai_api_key = os.getenv("OPENAI_API_KEY")
-                    if openai_api_key:
-                        client = AsyncOpenAI(api_key=openai_api_key)
-                        import base64
-
+                    clients = get_provider_clients()
+                    if clients.openai_configured:
                         b64_image = base64.b64encode(safe_bytes).decode()
 
-                        response = await client.chat.completions.create(
-                            model="gpt-4o-mini",
-                            messages=[
-                                {
-                                    "role": "user",
-                                    "content": [
-                                        {
-                                            "type": "text",
-                                            "text": "Extract receipt data from this image. Return JSON with: merchant_name, date, total_amount, vat_amount, vat_rate, items (array of {name, price}).",
-                                        },
-                                        {
-                                            "type": "image_url",
-                                            "image_url": {
-                                                "url": f"data:image/jpeg;base64,{b64_image}"
+                        async with clients.limit("openai"):
+                            response = await clients.openai().chat.completions.create(
+                                model="gpt-4o-mini",
+                                messages=[
+                                    {
+                                        "role": "user",
+                                        "content": [
+                                            {
+                                                "type": "text",
+                                                "text": "Extract receipt data from this image. Return JSON with: merchant_name, date, total_amount, vat_amount, vat_rate, items (array of {name, price}).",
                                             },
-                                        },
-                                    ],
-                                }
-                            ],
-                            response_format={"type": "json_object"},
-                            temperature=0.2,
-                        )
+                                            {
+                                                "type": "image_url",
+                                                "image_url": {
+                                                    "url": f"data:image/jpeg;base64,{b64_image}"
+                                                },
+                                            },
+                                        ],
+                                    }
+                                ],
+                                response_format={"type": "json_object"},
+                                temperature=0.2,
+                            )
                         vision_data = json.loads(response.choices[0].message.content)
                 except Exception as e:
                     logger.warning(f"Vision enrichment failed: {e}")
@@ -165,6 +164,11 @@ class OCRAgentAdapter(Agent):
                         "description": "Whether to use OpenAI Vision for enrichment",
                         "default": True,
                     },
+                    "document_type": {
+                        "type": "string",
+                        "description": "Document type; types in PRIVACY_SKIP_DOC_TYPES skip face/plate detection",
+                        "default": "receipt",
+                    },
                 },
             },
             output_schema={
@@ -167,6 +167,7 @@ class VATAgentAdapter(Agent):
             dependencies=[],
             cost_per_request=0.0,  # No API cost
             avg_response_time_ms=100,
+            cache_ttl_seconds=86400,  # Deterministic for a given input
         )
 
     async def validate_input(self, input_data: dict[str, Any]) -> bool:
@@ -0,0 +1,344 @@
+"""Distributed workflow step execution over Redis streams.
+
+In distributed mode (``WORKFLOW_DISTRIBUTED``) the ``WorkflowEngine`` that
+received ``/execute`` only schedules the DAG. Each ready step is added to the
+``workflow:steps`` stream; any ``WorkflowStepWorker`` (in an API process or a
+standalone ``scripts/workflow_worker.py`` on another host) claims it through
+the consumer group, runs the agent and appends the outcome to the
+execution's result stream. One reader task per coordinator process reads
+the result streams of all its active executions in a single blocking XREAD.
+
+A step is queued once per execution: a coordinator that resumes an execution
+takes the result of a step that already reported from the result stream, and
+waits for a step whose job is still queued or running instead of queueing it
+again. A step that gets no result within its agent timeout plus
+``WORKFLOW_STEP_VISIBILITY_TIMEOUT`` for every allowed delivery fails.
+
+A worker keeps its in-flight entries alive with a heartbeat. Entries of a
+crashed worker become idle and are taken over by another worker after
+``WORKFLOW_STEP_VISIBILITY_TIMEOUT`` seconds; taken-over entries wait in a
+local queue (still heartbeated) until a slot is free. An entry delivered more
+than ``WORKFLOW_STEP_MAX_DELIVERIES`` times is reported as failed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import random
+import socket
+import time
+from typing import Any
+from uuid import uuid4
+
+from shared_core.utils.redis import StreamQueue, idempotency_store
+from shared_core.utils.redis import stream_queue as default_stream_queue
+
+from .workflow_persistence import decode_value, encode_value
+
+logger = logging.getLogger("converto.agent_orchestrator.distributed")
+
+WORKFLOW_DISTRIBUTED = os.getenv("WORKFLOW_DISTRIBUTED", "false").lower() in ("true", "1", "yes")
+WORKFLOW_WORKER_CONCURRENCY = int(os.getenv("WORKFLOW_WORKER_CONCURRENCY", "4"))
+WORKFLOW_STEP_VISIBILITY_TIMEOUT = float(os.getenv("WORKFLOW_STEP_VISIBILITY_TIMEOUT", "300"))
+WORKFLOW_STEP_MAX_DELIVERIES = int(os.getenv("WORKFLOW_STEP_MAX_DELIVERIES", "3"))
+# Used when the agent declares no timeout (AgentMetadata.timeout_ms)
+WORKFLOW_STEP_DEFAULT_TIMEOUT_MS = 30000
+# Cap for the retry delay while Redis is unreachable
+WORKFLOW_STREAM_ERROR_BACKOFF_MAX = 30.0
+
+STEP_STREAM = "workflow:steps"
+STEP_GROUP = "workflow-workers"
+# Result streams outlive the execution briefly so late readers still find them
+RESULT_STREAM_TTL = 3600
+RESULT_STREAM_PREFIX = "workflow:results:"
+
+
+def result_stream(execution_id: str) -> str:
+    return f"{RESULT_STREAM_PREFIX}{execution_id}"
+
+
+async def _backoff(failures: int, what: str, error: Exception) -> None:
+    """Sleep before retrying a failed Redis read instead of spinning on it."""
+    delay = min(WORKFLOW_STREAM_ERROR_BACKOFF_MAX, 0.5 * 2 ** (failures - 1))
+    if failures == 1 or delay == WORKFLOW_STREAM_ERROR_BACKOFF_MAX:
+        logger.error(f"{what} failed: {error}")
+    await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+
+
+class StepDispatcher:
+    """Coordinator side: queue a step and wait for a worker to report it."""
+
+    def __init__(self, streams: StreamQueue | None = None):
+        self.streams = streams or default_stream_queue
+        # execution_id -> step_id -> future resolved by the result reader
+        self._waiting: dict[str, dict[str, asyncio.Future]] = {}
+        self._last_ids: dict[str, str] = {}
+        self._reader: asyncio.Task | None = None
+
+    async def run_step(
+        self,
+        execution_id: str,
+        step_id: str,
+        agent_id: str,
+        agent_input: dict[str, Any],
+        context: dict[str, Any],
+        timeout_ms: int | None = None,
+    ) -> dict[str, Any]:
+        """Queue a step for the workers and return the agent result.
+
+        Args:
+            execution_id: Execution the step belongs to
+            step_id: Step identifier
+            agent_id: Agent to run
+            agent_input: Mapped agent input
+            context: Execution context
+            timeout_ms: Agent timeout (``AgentMetadata.timeout_ms``)
+
+        Returns:
+            Agent execution result
+        """
+        report = await asyncio.to_thread(self._find_report, execution_id, step_id)
+        if report is not None:
+            # Finished before the coordinator restarted: don't run it again
+            logger.info(f"Workflow step {step_id} ({execution_id}) already reported")
+            if report.get("ok"):
+                return decode_value(report.get("result")) or {}
+            raise RuntimeError(report.get("error") or "Step failed")
+
+        future = asyncio.get_running_loop().create_future()
+        waiting = self._waiting.setdefault(execution_id, {})
+        waiting[step_id] = future
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_results())
+        limit = (
+            (timeout_ms or WORKFLOW_STEP_DEFAULT_TIMEOUT_MS) / 1000
+            + WORKFLOW_STEP_VISIBILITY_TIMEOUT
+        ) * WORKFLOW_STEP_MAX_DELIVERIES
+        job_key = f"workflow:step:{execution_id}:{step_id}"
+
+        job = {
+            "execution_id": execution_id,
+            "step_id": step_id,
+            "agent_id": agent_id,
+            "input": encode_value(agent_input),
+            "context": encode_value(context),
+            "queued_at": time.time(),
+        }
+        try:
+            queued, _ = await asyncio.to_thread(idempotency_store.claim, job_key, math.ceil(limit))
+            if queued:
+                entry_id = await asyncio.to_thread(self.streams.add, STEP_STREAM, job)
+                if entry_id is None:
+                    await asyncio.to_thread(idempotency_store.release, job_key)
+                    raise RuntimeError(f"Failed to queue workflow step {step_id}")
+            else:
+                logger.info(f"Workflow step {step_id} ({execution_id}) already queued, waiting")
+            return await asyncio.wait_for(future, limit)
+        except TimeoutError:
+            await asyncio.to_thread(idempotency_store.release, job_key)
+            raise RuntimeError(
+                f"Workflow step {step_id} got no result within {limit:.0f}s"
+            ) from None
+        finally:
+            waiting.pop(step_id, None)
+
+    def _find_report(self, execution_id: str, step_id: str) -> dict[str, Any] | None:
+        """Report already in the execution's result stream for this step, if any."""
+        for _, report in self.streams.read(result_stream(execution_id), "0", 1000, None):
+            if report.get("step_id") == step_id:
+                return report
+        return None
+
+    async def finish(self, execution_id: str) -> None:
+        """Stop tracking a finished execution and let its result stream expire."""
+        self._waiting.pop(execution_id, None)
+        self._last_ids.pop(execution_id, None)
+        await asyncio.to_thread(self.streams.expire, result_stream(execution_id), RESULT_STREAM_TTL)
+
+    async def _read_results(self) -> None:
+        """Read the result streams of all executions with waiting steps; exits when idle."""
+        failures = 0
+        while True:
+            positions = {
+                result_stream(execution_id): self._last_ids.get(execution_id, "0")
+                for execution_id, waiting in self._waiting.items()
+                if waiting
+            }
+            if not positions:
+                return
+            try:
+                entries = await asyncio.to_thread(
+                    self.streams.read_many, positions, raise_errors=True
+                )
+            except Exception as e:
+                failures += 1
+                await _backoff(failures, "Reading workflow step results", e)
+                continue
+            failures = 0
+            for stream, entry_id, report in entries:
+                execution_id = stream.removeprefix(RESULT_STREAM_PREFIX)
+                waiting = self._waiting.get(execution_id)
+                if waiting is None:
+                    continue  # Finished meanwhile
+                self._last_ids[execution_id] = entry_id
+                future = waiting.get(report.get("step_id"))
+                if future is None or future.done():
+                    continue
+                if report.get("ok"):
+                    future.set_result(decode_value(report.get("result")) or {})
+                else:
+                    future.set_exception(RuntimeError(report.get("error") or "Step failed"))
+
+
+class WorkflowStepWorker:
+    """Claims queued workflow steps, runs the agent and reports the result."""
+
+    def __init__(
+        self,
+        engine: Any,
+        concurrency: int = WORKFLOW_WORKER_CONCURRENCY,
+        streams: StreamQueue | None = None,
+        consumer: str | None = None,
+    ):
+        self.engine = engine  # WorkflowEngine; only run_agent is used
+        self.streams = streams or default_stream_queue
+        self.concurrency = concurrency
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self.visibility_ms = int(WORKFLOW_STEP_VISIBILITY_TIMEOUT * 1000)
+        self._slots = asyncio.Semaphore(concurrency)
+        # Claimed or taken over by this worker (heartbeated), including queued takeovers
+        self._in_flight: set[str] = set()
+        self._taken_over: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Join the consumer group and start claiming steps."""
+        if self.running or not self.streams.enabled:
+            return
+        await asyncio.to_thread(self.streams.ensure_group, STEP_STREAM, STEP_GROUP)
+        self._tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._maintain()),
+        ]
+        logger.info(f"Workflow step worker {self.consumer} started ({self.concurrency} slots)")
+
+    async def stop(self) -> None:
+        """Stop claiming; unfinished entries are taken over by other workers."""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Workflow step worker {self.consumer} stopped")
+
+    async def _consume(self) -> None:
+        failures = 0
+        while True:
+            await self._slots.acquire()
+            if not self._taken_over.empty():
+                # Entries of crashed workers go first; they have waited longest
+                entry_id, job = self._taken_over.get_nowait()
+                self._spawn(entry_id, job)
+                continue
+            try:
+                entries = await asyncio.to_thread(
+                    self.streams.read_group,
+                    STEP_STREAM,
+                    STEP_GROUP,
+                    self.consumer,
+                    raise_errors=True,
+                )
+            except Exception as e:
+                self._slots.release()
+                failures += 1
+                await _backoff(failures, f"Workflow worker {self.consumer} reading steps", e)
+                continue
+            except BaseException:
+                self._slots.release()
+                raise
+            failures = 0
+            if not entries:
+                self._slots.release()
+                continue
+            entry_id, job = entries[0]
+            self._spawn(entry_id, job)
+
+    async def _maintain(self) -> None:
+        """Heartbeat own entries and take over entries of crashed workers.
+
+        Never waits for a slot: taken-over entries are queued for ``_consume``
+        and heartbeated with the running ones until they start.
+        """
+        while True:
+            await asyncio.sleep(WORKFLOW_STEP_VISIBILITY_TIMEOUT / 3)
+            try:
+                if self._in_flight:
+                    await asyncio.to_thread(
+                        self.streams.touch,
+                        STEP_STREAM,
+                        STEP_GROUP,
+                        self.consumer,
+                        list(self._in_flight),
+                    )
+                if not self._taken_over.empty():
+                    continue  # Still working through the last takeover
+                stale = await asyncio.to_thread(
+                    self.streams.claim_stale,
+                    STEP_STREAM,
+                    STEP_GROUP,
+                    self.consumer,
+                    self.visibility_ms,
+                    self.concurrency,
+                )
+                for entry_id, job, deliveries in stale:
+                    if entry_id in self._in_flight:
+                        continue
+                    if deliveries > WORKFLOW_STEP_MAX_DELIVERIES:
+                        await self._report(
+                            entry_id,
+                            job,
+                            {"ok": False, "error": f"Step abandoned after {deliveries} deliveries"},
+                        )
+                        continue
+                    logger.warning(
+                        f"Taking over workflow step {job.get('step_id')} "
+                        f"({job.get('execution_id')}), delivery {deliveries}"
+                    )
+                    self._in_flight.add(entry_id)
+                    self._taken_over.put_nowait((entry_id, job))
+            except Exception as e:
+                logger.error(f"Workflow worker maintenance failed: {e}")
+
+    def _spawn(self, entry_id: str, job: dict[str, Any]) -> None:
+        self._in_flight.add(entry_id)
+        task = asyncio.create_task(self._handle(entry_id, job))
+
+        def _done(_: asyncio.Task) -> None:
+            self._in_flight.discard(entry_id)
+            self._slots.release()
+
+        task.add_done_callback(_done)
+
+    async def _handle(self, entry_id: str, job: dict[str, Any]) -> None:
+        try:
+            result = await self.engine.run_agent(
+                job["agent_id"], decode_value(job["input"]), decode_value(job["context"])
+            )
+            outcome = {"ok": True, "result": encode_value(result)}
+        except Exception as e:
+            logger.error(f"Workflow step {job.get('step_id')} failed on {self.consumer}: {e}")
+            outcome = {"ok": False, "error": str(e)}
+        await self._report(entry_id, job, outcome)
+
+    async def _report(self, entry_id: str, job: dict[str, Any], outcome: dict[str, Any]) -> None:
+        report = {"step_id": job.get("step_id"), "worker": self.consumer, **outcome}
+        await asyncio.to_thread(self.streams.add, result_stream(job["execution_id"]), report)
+        await asyncio.to_thread(self.streams.ack, STEP_STREAM, STEP_GROUP, entry_id)
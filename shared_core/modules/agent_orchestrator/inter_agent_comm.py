@@ -1,7 +1,18 @@
-"""Inter-Agent Communication - Enables agents to communicate with each other."""
+"""Inter-Agent Communication - Enables agents to communicate with each other.
+
+Every agent has its own mailbox, so ``receive_message`` waits only on
+messages meant for it. ``send_message`` routes a message once: to the
+recipient, to every other mailbox for a broadcast, and to the sender's
+subscribers. A response whose ``correlation_id`` matches a pending
+``request_response`` resolves that request's future directly. Mailboxes hold
+at most ``AGENT_MAILBOX_SIZE`` messages (oldest dropped) and the history keeps
+the last ``AGENT_MESSAGE_HISTORY_SIZE`` messages.
+"""
 
 import asyncio
 import logging
+import os
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -10,6 +21,9 @@ from uuid import uuid4
 
 logger = logging.getLogger("converto.agent_orchestrator")
 
+AGENT_MAILBOX_SIZE = int(os.getenv("AGENT_MAILBOX_SIZE", "1000"))
+AGENT_MESSAGE_HISTORY_SIZE = int(os.getenv("AGENT_MESSAGE_HISTORY_SIZE", "1000"))
+
 
 class MessageType(str, Enum):
     """Types of messages between agents."""
@@ -37,9 +51,15 @@ class AgentMessage:
 class InterAgentMessaging:
     """Manages inter-agent communication."""
 
-    def __init__(self):
-        self._message_queue: asyncio.Queue = asyncio.Queue()
-        self._message_history: list[AgentMessage] = []
+    def __init__(
+        self,
+        mailbox_size: int = AGENT_MAILBOX_SIZE,
+        history_size: int = AGENT_MESSAGE_HISTORY_SIZE,
+    ):
+        self.mailbox_size = mailbox_size
+        self._mailboxes: dict[str, asyncio.Queue] = {}  # agent_id -> pending messages
+        self._pending: dict[str, asyncio.Future] = {}  # correlation_id -> response future
+        self._message_history: deque[AgentMessage] = deque(maxlen=history_size)
         self._subscribers: dict[str, list[str]] = {}  # agent_id -> list of subscriber agent_ids
         self._message_handlers: dict[str, callable] = {}  # agent_id -> handler function
 
@@ -73,8 +93,8 @@ class InterAgentMessaging:
             correlation_id=correlation_id,
         )
 
-        await self._message_queue.put(message)
         self._message_history.append(message)
+        self._route(message)
 
         logger.debug(
             f"Message sent from {from_agent_id} to {to_agent_id}: "
@@ -95,35 +115,48 @@ class InterAgentMessaging:
         Returns:
             Message or None if timeout
         """
+        mailbox = self._mailbox(agent_id)
         try:
-            # Get messages from queue that are for this agent or broadcasts
-            start_time = asyncio.get_event_loop().time()
-
-            while True:
-                if timeout and (asyncio.get_event_loop().time() - start_time) > timeout:
-                    return None
-
-                try:
-                    message = await asyncio.wait_for(self._message_queue.get(), timeout=1.0)
-
-                    # Check if message is for this agent
-                    if (
-                        message.to_agent_id == agent_id
-                        or message.to_agent_id is None
-                        or agent_id in self._subscribers.get(message.from_agent_id, [])
-                    ):
-                        return message
-                    else:
-                        # Put message back for other agents
-                        await self._message_queue.put(message)
-
-                except TimeoutError:
-                    continue
-
+            if timeout is None:
+                return await mailbox.get()
+            return await asyncio.wait_for(mailbox.get(), timeout=timeout)
+        except TimeoutError:
+            return None
         except Exception as e:
             logger.error(f"Error receiving message for {agent_id}: {e}")
             return None
 
+    def _mailbox(self, agent_id: str) -> asyncio.Queue:
+        mailbox = self._mailboxes.get(agent_id)
+        if mailbox is None:
+            mailbox = asyncio.Queue(maxsize=self.mailbox_size)
+            self._mailboxes[agent_id] = mailbox
+        return mailbox
+
+    def _route(self, message: AgentMessage) -> None:
+        """Deliver a message to every mailbox it is meant for."""
+        if message.message_type == MessageType.RESPONSE and message.correlation_id:
+            future = self._pending.get(message.correlation_id)
+            if future is not None:
+                if not future.done():
+                    future.set_result(message)
+                return
+
+        if message.to_agent_id is None:
+            recipients = {a for a in self._mailboxes if a != message.from_agent_id}
+        else:
+            recipients = {message.to_agent_id}
+        recipients.update(self._subscribers.get(message.from_agent_id, []))
+
+        for agent_id in recipients:
+            mailbox = self._mailbox(agent_id)
+            if mailbox.full():
+                dropped = mailbox.get_nowait()
+                logger.warning(
+                    f"Mailbox of {agent_id} full, dropped message {dropped.message_id}"
+                )
+            mailbox.put_nowait(message)
+
     def subscribe(self, agent_id: str, publisher_agent_id: str) -> None:
         """Subscribe an agent to messages from another agent.
 
@@ -131,6 +164,7 @@ class InterAgentMessaging:
             agent_id: Subscriber agent ID
             publisher_agent_id: Publisher agent ID
         """
+        self._mailbox(agent_id)
         if publisher_agent_id not in self._subscribers:
             self._subscribers[publisher_agent_id] = []
 
@@ -171,34 +205,27 @@ class InterAgentMessaging:
             Response payload or None if timeout
         """
         correlation_id = str(uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
 
-        # Send request
-        await self.send_message(
-            from_agent_id=from_agent_id,
-            to_agent_id=to_agent_id,
-            message_type=MessageType.REQUEST,
-            payload=request_payload,
-            correlation_id=correlation_id,
-        )
-
-        # Wait for response
-        start_time = asyncio.get_event_loop().time()
-
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
-            message = await self.receive_message(from_agent_id, timeout=1.0)
-
-            if (
-                message
-                and message.message_type == MessageType.RESPONSE
-                and message.correlation_id == correlation_id
-            ):
-                return message.payload
-
-        logger.warning(
-            f"Request from {from_agent_id} to {to_agent_id} timed out "
-            f"(correlation_id: {correlation_id})"
-        )
-        return None
+        try:
+            await self.send_message(
+                from_agent_id=from_agent_id,
+                to_agent_id=to_agent_id,
+                message_type=MessageType.REQUEST,
+                payload=request_payload,
+                correlation_id=correlation_id,
+            )
+            response = await asyncio.wait_for(future, timeout=timeout)
+            return response.payload
+        except TimeoutError:
+            logger.warning(
+                f"Request from {from_agent_id} to {to_agent_id} timed out "
+                f"(correlation_id: {correlation_id})"
+            )
+            return None
+        finally:
+            self._pending.pop(correlation_id, None)
 
     def get_message_history(
         self, agent_id: str | None = None, limit: int = 100
@@ -212,7 +239,7 @@ class InterAgentMessaging:
         Returns:
             List of messages
         """
-        messages = self._message_history
+        messages = list(self._message_history)
 
         if agent_id:
             messages = [
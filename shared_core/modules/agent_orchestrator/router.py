@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -158,7 +159,8 @@ async def get_workflow_status(
     Returns:
         Workflow status
     """
-    execution = orchestrator.workflow_engine.get_execution(execution_id)
+    # Finished executions are loaded from the database, off the event loop
+    execution = await asyncio.to_thread(orchestrator.workflow_engine.get_execution, execution_id)
 
     if not execution:
         raise HTTPException(status_code=404, detail="Workflow execution not found")
@@ -195,10 +197,12 @@ async def get_workflow_result(
     Returns:
         Workflow result (final variables)
     """
-    result = orchestrator.get_workflow_result(execution_id)
+    result = await asyncio.to_thread(orchestrator.get_workflow_result, execution_id)
 
     if result is None:
-        execution = orchestrator.workflow_engine.get_execution(execution_id)
+        execution = await asyncio.to_thread(
+            orchestrator.workflow_engine.get_execution, execution_id
+        )
         if not execution:
             raise HTTPException(status_code=404, detail="Workflow execution not found")
 
@@ -286,7 +290,9 @@ async def list_executions(
         List of workflow executions
     """
     status_enum = WorkflowStatus(status) if status else None
-    executions = orchestrator.list_workflow_executions(template_id, status_enum)
+    executions = await asyncio.to_thread(
+        orchestrator.list_workflow_executions, template_id, status_enum
+    )
 
     return [
         {
@@ -0,0 +1,137 @@
+"""Memoized workflow step results.
+
+Agents opt in with ``AgentMetadata.cache_ttl_seconds``. A result is keyed on
+agent id, agent version and a SHA-256 of the canonical JSON of the mapped
+input, so re-running a workflow on the same receipt returns deterministic
+steps instantly and a version bump invalidates old results. The workflow
+context (execution and step ids) is not part of the key; agents whose output
+depends on it must not opt in.
+
+Results are kept in an in-process LRU (``WORKFLOW_STEP_CACHE_SIZE`` entries)
+and in Redis (``AdvancedCache``) so every worker shares them. Results larger
+than ``WORKFLOW_STEP_CACHE_MAX_BYTES`` and results with ``"success": False``
+are not cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any
+
+from shared_core.utils.redis import AdvancedCache, advanced_cache
+
+from .agent_registry import AgentMetadata
+from .workflow_persistence import decode_value, encode_value
+
+logger = logging.getLogger("converto.agent_orchestrator.step_cache")
+
+WORKFLOW_STEP_CACHE = os.getenv("WORKFLOW_STEP_CACHE", "true").lower() in ("true", "1", "yes")
+WORKFLOW_STEP_CACHE_SIZE = int(os.getenv("WORKFLOW_STEP_CACHE_SIZE", "512"))
+WORKFLOW_STEP_CACHE_MAX_BYTES = int(os.getenv("WORKFLOW_STEP_CACHE_MAX_BYTES", "262144"))
+
+
+def input_digest(agent_input: dict[str, Any]) -> str:
+    """Stable hash of an agent input (key order and bytes vs base64 do not matter)."""
+    canonical = json.dumps(
+        encode_value(agent_input), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class StepResultCache:
+    """Two-level (in-process LRU + Redis) cache of agent results."""
+
+    def __init__(
+        self,
+        redis_cache: AdvancedCache | None = None,
+        max_entries: int = WORKFLOW_STEP_CACHE_SIZE,
+        max_bytes: int = WORKFLOW_STEP_CACHE_MAX_BYTES,
+    ):
+        self.redis_cache = redis_cache or advanced_cache
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (encoded result, expires_at)
+        self._l1: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "skipped": 0}
+
+    @staticmethod
+    def key(metadata: AgentMetadata, agent_input: dict[str, Any]) -> str:
+        return (
+            f"workflow:step:{metadata.agent_id}:{metadata.version}:{input_digest(agent_input)}"
+        )
+
+    async def get(
+        self, metadata: AgentMetadata, agent_input: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Return a cached result for this agent and input, or None."""
+        if not metadata.cache_ttl_seconds:
+            return None
+        key = self.key(metadata, agent_input)
+        encoded = self._l1_get(key)
+        if encoded is None:
+            entry = await asyncio.to_thread(self.redis_cache.cache_get, key)
+            if entry is not None:
+                encoded = entry["result"]
+                self._l1_set(key, encoded, entry["expires_at"])
+        if encoded is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return decode_value(copy.deepcopy(encoded))
+
+    async def set(
+        self, metadata: AgentMetadata, agent_input: dict[str, Any], result: dict[str, Any]
+    ) -> None:
+        """Store a result if the agent opted in and the result is cacheable."""
+        ttl = metadata.cache_ttl_seconds
+        if not ttl or not isinstance(result, dict) or result.get("success") is False:
+            return
+        encoded = encode_value(result)
+        if len(json.dumps(encoded, separators=(",", ":"))) > self.max_bytes:
+            self.stats["skipped"] += 1
+            return
+        key = self.key(metadata, agent_input)
+        expires_at = time.time() + ttl
+        self._l1_set(key, encoded, expires_at)
+        entry = {"result": encoded, "expires_at": expires_at}
+        await asyncio.to_thread(self.redis_cache.cache_set, key, entry, ttl)
+        self.stats["stored"] += 1
+
+    def clear(self) -> None:
+        """Clear the in-process level."""
+        self._l1.clear()
+
+    def _l1_get(self, key: str) -> Any | None:
+        cached = self._l1.get(key)
+        if cached is None:
+            return None
+        encoded, expires_at = cached
+        if time.time() >= expires_at:
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return encoded
+
+    def _l1_set(self, key: str, encoded: Any, expires_at: float) -> None:
+        self._l1[key] = (encoded, expires_at)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.max_entries:
+            self._l1.popitem(last=False)
+
+
+_cache: StepResultCache | None = None
+
+
+def get_step_cache() -> StepResultCache:
+    """Get the process-wide step result cache."""
+    global _cache
+    if _cache is None:
+        _cache = StepResultCache()
+    return _cache
@@ -1,17 +1,69 @@
-"""Workflow Engine - Executes multi-agent workflows."""
+"""Workflow Engine - Executes multi-agent workflows.
+
+Steps form a DAG. ``_run_workflow`` precomputes each step's count of
+unfinished dependencies and starts a step as soon as its last dependency
+completes, so a long chain is never held back by a slow sibling. At most
+``WorkflowTemplate.max_concurrency`` steps of one execution run at once
+(default ``WORKFLOW_MAX_CONCURRENCY``) and at most
+``AgentMetadata.max_concurrency`` calls per agent across all executions.
+
+Executions are durable: the state (step status, results, variables) is
+checkpointed to ``WorkflowExecutionRecord`` at every step boundary and
+finished executions are dropped from memory. ``resume_executions`` (run by
+``start`` and then every ``WORKFLOW_RESUME_INTERVAL`` seconds) continues
+unfinished executions from their last completed step; completed steps are
+never re-run. A lease in Redis, owned by ``WORKFLOW_INSTANCE_ID``, keeps two
+workers from running the same execution: the owner renews it while the
+execution runs (a worker that finds it taken over stops its run) and
+releases it on ``shutdown``, and a crashed worker's executions are picked up
+by the next scan once its lease expires. Without Redis nothing is resumed.
+
+With ``WORKFLOW_DISTRIBUTED`` the engine still schedules the DAG, but ready
+steps are queued to a Redis stream and executed by ``WorkflowStepWorker``
+processes (see ``distributed.py``).
+
+Agents that declare ``AgentMetadata.cache_ttl_seconds`` have their results
+memoized per input (see ``step_cache.py``); a cache hit skips the agent.
+"""
 
 import asyncio
 import logging
+import os
+import socket
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
 from uuid import uuid4
 
+from shared_core.utils.db import SessionLocal
+from shared_core.utils.redis import idempotency_store, stream_queue
+
 from .agent_registry import AgentRegistry
+from .distributed import WORKFLOW_DISTRIBUTED, StepDispatcher
+from .step_cache import WORKFLOW_STEP_CACHE, StepResultCache, get_step_cache
+from .workflow_persistence import (
+    UNFINISHED_STATUSES,
+    checkpoint_execution,
+    decode_value,
+    encode_value,
+    list_execution_states,
+    load_execution_state,
+)
 
 logger = logging.getLogger("converto.agent_orchestrator")
 
+WORKFLOW_MAX_CONCURRENCY = int(os.getenv("WORKFLOW_MAX_CONCURRENCY", "8"))
+WORKFLOW_PERSISTENCE = os.getenv("WORKFLOW_PERSISTENCE", "true").lower() in ("true", "1", "yes")
+# Renewed at every checkpoint and every WORKFLOW_RESUME_INTERVAL while the execution runs
+WORKFLOW_LEASE_SECONDS = int(os.getenv("WORKFLOW_LEASE_SECONDS", "120"))
+WORKFLOW_RESUME_INTERVAL = int(os.getenv("WORKFLOW_RESUME_INTERVAL", "30"))
+WORKFLOW_RESUME_PAGE_SIZE = 100
+# Lease owner; hostname:pid is stable across a container restart, so a restarted
+# worker re-claims its own executions instead of waiting for the lease to expire
+WORKFLOW_INSTANCE_ID = os.getenv("WORKFLOW_INSTANCE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
 
 class WorkflowStatus(str, Enum):
     """Workflow execution status."""
@@ -60,6 +112,7 @@ class WorkflowTemplate:
     steps: list[dict[str, Any]]  # Step definitions
     version: str = "1.0.0"
     tags: list[str] = field(default_factory=list)
+    max_concurrency: int | None = None  # Max steps running at once per execution
 
 
 @dataclass
@@ -79,13 +132,97 @@ class WorkflowExecution:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+def _parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def execution_to_state(execution: WorkflowExecution) -> dict[str, Any]:
+    """Serialize an execution for checkpointing."""
+    return {
+        "execution_id": execution.execution_id,
+        "template_id": execution.template_id,
+        "name": execution.name,
+        "status": execution.status.value,
+        "variables": encode_value(execution.variables),
+        "steps": [
+            {
+                "step_id": step.step_id,
+                "agent_id": step.agent_id,
+                "input_mapping": step.input_mapping,
+                "output_mapping": step.output_mapping,
+                "dependencies": step.dependencies,
+                "condition": step.condition,
+                "status": step.status.value,
+                "result": encode_value(step.result),
+                "error": step.error,
+                "started_at": encode_value(step.started_at),
+                "completed_at": encode_value(step.completed_at),
+            }
+            for step in execution.steps
+        ],
+        "created_at": encode_value(execution.created_at),
+        "started_at": encode_value(execution.started_at),
+        "completed_at": encode_value(execution.completed_at),
+        "error": execution.error,
+        "metadata": encode_value(execution.metadata),
+    }
+
+
+def execution_from_state(state: dict[str, Any]) -> WorkflowExecution:
+    """Rebuild an execution from a checkpoint."""
+    steps = [
+        WorkflowStep(
+            step_id=step["step_id"],
+            agent_id=step["agent_id"],
+            input_mapping=step.get("input_mapping", {}),
+            output_mapping=step.get("output_mapping", {}),
+            dependencies=step.get("dependencies", []),
+            condition=step.get("condition"),
+            status=StepStatus(step.get("status", StepStatus.PENDING.value)),
+            result=decode_value(step.get("result")),
+            error=step.get("error"),
+            started_at=_parse_datetime(step.get("started_at")),
+            completed_at=_parse_datetime(step.get("completed_at")),
+        )
+        for step in state.get("steps", [])
+    ]
+    return WorkflowExecution(
+        execution_id=state["execution_id"],
+        template_id=state.get("template_id") or "",
+        name=state["name"],
+        status=WorkflowStatus(state["status"]),
+        steps=steps,
+        variables=decode_value(state.get("variables") or {}),
+        created_at=_parse_datetime(state.get("created_at")) or datetime.utcnow(),
+        started_at=_parse_datetime(state.get("started_at")),
+        completed_at=_parse_datetime(state.get("completed_at")),
+        error=state.get("error"),
+        metadata=state.get("metadata") or {},
+    )
+
+
 class WorkflowEngine:
     """Engine for executing multi-agent workflows."""
 
-    def __init__(self, agent_registry: AgentRegistry):
+    def __init__(
+        self,
+        agent_registry: AgentRegistry,
+        persistence: bool = WORKFLOW_PERSISTENCE,
+        distributed: bool = WORKFLOW_DISTRIBUTED,
+        step_cache: StepResultCache | None = None,
+    ):
         self.agent_registry = agent_registry
+        self.persistence = persistence
+        self.step_cache = step_cache or (get_step_cache() if WORKFLOW_STEP_CACHE else None)
+        # Distributed mode: steps are queued to Redis and run by WorkflowStepWorker
+        self.dispatcher = StepDispatcher() if distributed and stream_queue.enabled else None
         self._templates: dict[str, WorkflowTemplate] = {}
+        # Active executions only when persistence is on; finished ones live in the database
         self._executions: dict[str, WorkflowExecution] = {}
+        # execution_id -> task running it
+        self._runs: dict[str, asyncio.Task] = {}
+        self._recovery: asyncio.Task | None = None
+        self._agent_slots: dict[str, asyncio.Semaphore] = {}
         self._load_default_templates()
 
     def register_template(self, template: WorkflowTemplate) -> None:
@@ -163,12 +300,220 @@ class WorkflowEngine:
         )
 
         self._executions[execution.execution_id] = execution
+        if self.persistence:
+            await asyncio.to_thread(
+                idempotency_store.claim,
+                self._lease_key(execution),
+                WORKFLOW_LEASE_SECONDS,
+                WORKFLOW_INSTANCE_ID,
+            )
+            await self._checkpoint(execution)
 
         # Execute workflow asynchronously
-        asyncio.create_task(self._run_workflow(execution))
+        self._start(execution)
 
         return execution
 
+    async def start(self) -> None:
+        """Resume unfinished executions and start the lease/resume loop.
+
+        Needs Redis: the in-process lease fallback cannot keep two workers
+        from resuming the same execution, so nothing is resumed without it.
+        """
+        if not self.persistence or self._recovery is not None:
+            return
+        if not idempotency_store.enabled:
+            logger.warning("Redis unavailable: unfinished workflow executions are not resumed")
+            return
+        try:
+            resumed = await self.resume_executions()
+            if resumed:
+                logger.info(f"Resumed {resumed} unfinished workflow executions")
+        except Exception as e:
+            logger.error(f"Workflow resume failed: {e}")
+        self._recovery = asyncio.create_task(self._recovery_loop())
+
+    async def shutdown(self) -> None:
+        """Stop running executions and release their leases.
+
+        Checkpoints stay unfinished, so another worker resumes the executions
+        on its next scan instead of waiting for the leases to expire.
+        """
+        tasks = list(self._runs.values())
+        if self._recovery is not None:
+            tasks.append(self._recovery)
+            self._recovery = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if not self.persistence:
+            return
+        for execution in list(self._executions.values()):
+            await asyncio.to_thread(
+                idempotency_store.release, self._lease_key(execution), WORKFLOW_INSTANCE_ID
+            )
+        self._executions.clear()
+
+    async def resume_executions(self) -> int:
+        """Resume executions left unfinished by a stopped worker.
+
+        Completed steps keep their checkpointed results; steps that were
+        running when the worker stopped are run again. Executions whose
+        lease is held by a live worker are skipped.
+
+        Returns:
+            Number of resumed executions
+        """
+        if not self.persistence or not idempotency_store.enabled:
+            return 0
+
+        resumed = 0
+        offset = 0
+        while True:
+            states = await asyncio.to_thread(
+                self._load_states,
+                UNFINISHED_STATUSES,
+                None,
+                WORKFLOW_RESUME_PAGE_SIZE,
+                offset,
+            )
+            for state in states:
+                if await self._resume(state):
+                    resumed += 1
+            if len(states) < WORKFLOW_RESUME_PAGE_SIZE:
+                return resumed
+            offset += len(states)
+
+    async def _resume(self, state: dict[str, Any]) -> bool:
+        if state["execution_id"] in self._executions:
+            return False
+        execution = execution_from_state(state)
+        claimed, _ = await asyncio.to_thread(
+            idempotency_store.claim,
+            self._lease_key(execution),
+            WORKFLOW_LEASE_SECONDS,
+            WORKFLOW_INSTANCE_ID,
+            False,  # Redis error -> not claimed; another worker may still hold it
+        )
+        if not claimed:
+            return False  # Another worker owns it
+
+        if not self.get_template(execution.template_id):
+            execution.status = WorkflowStatus.FAILED
+            execution.error = f"Workflow template not found: {execution.template_id}"
+            execution.completed_at = datetime.utcnow()
+            await self._finish(execution)
+            return False
+
+        for step in execution.steps:
+            if step.status == StepStatus.RUNNING:
+                step.status = StepStatus.PENDING
+                step.started_at = None
+        self._executions[execution.execution_id] = execution
+        self._start(execution)
+        logger.info(f"Resumed workflow {execution.execution_id} ({execution.template_id})")
+        return True
+
+    async def _recovery_loop(self) -> None:
+        """Renew this worker's leases and pick up executions whose lease expired."""
+        while True:
+            await asyncio.sleep(WORKFLOW_RESUME_INTERVAL)
+            try:
+                for execution in list(self._executions.values()):
+                    await self._renew_lease(execution)
+                resumed = await self.resume_executions()
+                if resumed:
+                    logger.info(f"Resumed {resumed} workflow executions with expired leases")
+            except Exception as e:
+                logger.error(f"Workflow lease renewal failed: {e}")
+
+    def _start(self, execution: WorkflowExecution) -> None:
+        execution_id = execution.execution_id
+        task = asyncio.create_task(self._run_workflow(execution))
+        self._runs[execution_id] = task
+
+        def _done(_: asyncio.Task) -> None:
+            if self._runs.get(execution_id) is task:
+                del self._runs[execution_id]
+
+        task.add_done_callback(_done)
+
+    @staticmethod
+    def _lease_key(execution: WorkflowExecution) -> str:
+        return f"workflow:execution:{execution.execution_id}"
+
+    async def _checkpoint(self, execution: WorkflowExecution) -> None:
+        """Renew this worker's lease and persist the execution state.
+
+        A worker that lost its lease stops instead of overwriting the new
+        owner's checkpoint.
+        """
+        if not self.persistence:
+            return
+        state = execution_to_state(execution)
+        try:
+            if not await self._renew_lease(execution):
+                return
+            await asyncio.to_thread(self._save_state, state)
+        except Exception as e:
+            logger.error(f"Workflow checkpoint failed for {execution.execution_id}: {e}")
+
+    async def _renew_lease(self, execution: WorkflowExecution) -> bool:
+        """Extend the lease; if another worker took it over, cancel the local run."""
+        held = await asyncio.to_thread(
+            idempotency_store.renew,
+            self._lease_key(execution),
+            WORKFLOW_INSTANCE_ID,
+            {"status": execution.status.value},
+            WORKFLOW_LEASE_SECONDS,
+        )
+        if not held:
+            logger.warning(
+                f"Lost the lease on workflow {execution.execution_id} to another worker; "
+                "stopping the local run"
+            )
+            self._executions.pop(execution.execution_id, None)
+            task = self._runs.get(execution.execution_id)
+            if task is not None:
+                task.cancel()
+        return held
+
+    async def _finish(self, execution: WorkflowExecution) -> None:
+        """Write the final checkpoint, release the lease and evict from memory."""
+        if self.dispatcher is not None:
+            await self.dispatcher.finish(execution.execution_id)
+        if not self.persistence:
+            return
+        await self._checkpoint(execution)
+        await asyncio.to_thread(
+            idempotency_store.release, self._lease_key(execution), WORKFLOW_INSTANCE_ID
+        )
+        self._executions.pop(execution.execution_id, None)
+
+    @staticmethod
+    def _save_state(state: dict[str, Any]) -> None:
+        db = SessionLocal()
+        try:
+            checkpoint_execution(db, state)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _load_states(
+        statuses: tuple[str, ...] | None,
+        template_id: str | None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            return list_execution_states(db, statuses, template_id, limit, offset)
+        finally:
+            db.close()
+
     async def _run_workflow(self, execution: WorkflowExecution) -> None:
         """Run a workflow execution (internal method).
 
@@ -176,54 +521,113 @@ class WorkflowEngine:
             execution: Workflow execution to run
         """
         execution.status = WorkflowStatus.RUNNING
-        execution.started_at = datetime.utcnow()
+        execution.started_at = execution.started_at or datetime.utcnow()
+        running: dict[asyncio.Task, WorkflowStep] = {}
 
         try:
-            # Build dependency graph
+            await self._checkpoint(execution)
             step_map = {step.step_id: step for step in execution.steps}
-            ready_steps = self._get_ready_steps(execution.steps)
-
-            while ready_steps:
-                # Execute ready steps in parallel
-                tasks = [
-                    self._execute_step(step, execution.variables, step_map) for step in ready_steps
+            template = self.get_template(execution.template_id)
+            max_running = (template and template.max_concurrency) or WORKFLOW_MAX_CONCURRENCY
+
+            # In-degree = unfinished dependencies; dependents are released as steps complete
+            waiting_on: dict[str, int] = {}
+            dependents: dict[str, list[str]] = {step_id: [] for step_id in step_map}
+            for step in execution.steps:
+                if step.status != StepStatus.PENDING:
+                    continue
+                unknown = [dep for dep in step.dependencies if dep not in step_map]
+                if unknown:
+                    raise ValueError(f"Step {step.step_id} depends on unknown steps: {unknown}")
+                pending_deps = [
+                    dep for dep in step.dependencies if step_map[dep].status != StepStatus.COMPLETED
                 ]
+                waiting_on[step.step_id] = len(pending_deps)
+                for dep in pending_deps:
+                    dependents[dep].append(step.step_id)
+
+            ready = deque(step_id for step_id, count in waiting_on.items() if count == 0)
+            failed = False
+
+            while ready or running:
+                while ready and not failed and len(running) < max_running:
+                    step = step_map[ready.popleft()]
+                    task = asyncio.create_task(
+                        self._execute_step(
+                            step, execution.variables, step_map, execution.execution_id
+                        )
+                    )
+                    running[task] = step
+                if not running:
+                    break
 
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # Update step results
-                for step, result in zip(ready_steps, results, strict=False):
-                    if isinstance(result, Exception):
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        # Let in-flight siblings finish, start nothing new
                         step.status = StepStatus.FAILED
-                        step.error = str(result)
-                        logger.error(f"Step {step.step_id} failed: {result}")
-                    else:
-                        step.status = StepStatus.COMPLETED
-                        step.result = result
-
-                # Check if any step failed
-                if any(step.status == StepStatus.FAILED for step in ready_steps):
-                    execution.status = WorkflowStatus.FAILED
-                    execution.error = "One or more steps failed"
-                    execution.completed_at = datetime.utcnow()
-                    return
-
-                # Get next ready steps
-                ready_steps = self._get_ready_steps(execution.steps)
+                        step.error = str(error)
+                        logger.error(f"Step {step.step_id} failed: {error}")
+                        failed = True
+                        continue
+
+                    step.status = StepStatus.COMPLETED
+                    step.result = task.result()
+                    for child_id in dependents[step.step_id]:
+                        waiting_on[child_id] -= 1
+                        if waiting_on[child_id] == 0:
+                            ready.append(child_id)
+                # Step boundary: completed results survive a restart
+                await self._checkpoint(execution)
+
+            if failed:
+                execution.status = WorkflowStatus.FAILED
+                execution.error = "One or more steps failed"
+                execution.completed_at = datetime.utcnow()
+                await self._finish(execution)
+                return
+
+            blocked = [s.step_id for s in execution.steps if s.status == StepStatus.PENDING]
+            if blocked:
+                raise ValueError(f"Circular step dependencies: {blocked}")
 
             # All steps completed successfully
             execution.status = WorkflowStatus.COMPLETED
             execution.completed_at = datetime.utcnow()
             logger.info(f"Workflow {execution.execution_id} completed successfully")
+            await self._finish(execution)
 
+        except asyncio.CancelledError:
+            # Worker shutting down: leave the checkpoint as running for resume
+            for task in running:
+                task.cancel()
+            raise
         except Exception as e:
             execution.status = WorkflowStatus.FAILED
             execution.error = str(e)
             execution.completed_at = datetime.utcnow()
             logger.error(f"Workflow {execution.execution_id} failed: {e}")
+            await self._finish(execution)
+
+    def _agent_slot(self, agent_id: str) -> asyncio.Semaphore | None:
+        """Concurrency limit for an agent, or None if it is unlimited."""
+        semaphore = self._agent_slots.get(agent_id)
+        if semaphore is None:
+            metadata = self.agent_registry.get_metadata(agent_id)
+            if not metadata or not metadata.max_concurrency:
+                return None
+            semaphore = asyncio.Semaphore(metadata.max_concurrency)
+            self._agent_slots[agent_id] = semaphore
+        return semaphore
 
     async def _execute_step(
-        self, step: WorkflowStep, variables: dict[str, Any], step_map: dict[str, WorkflowStep]
+        self,
+        step: WorkflowStep,
+        variables: dict[str, Any],
+        step_map: dict[str, WorkflowStep],
+        execution_id: str | None = None,
     ) -> dict[str, Any]:
         """Execute a single workflow step.
 
@@ -231,6 +635,7 @@ class WorkflowEngine:
             step: Step to execute
             variables: Workflow variables
             step_map: Map of step_id to WorkflowStep
+            execution_id: Execution the step belongs to
 
         Returns:
             Agent execution result
@@ -255,23 +660,34 @@ class WorkflowEngine:
                         else:
                             agent_input[input_key] = dep_step.result
 
-            # Get agent and execute
-            agent = self.agent_registry.get_agent(step.agent_id)
-            if not agent:
-                raise ValueError(f"Agent not found: {step.agent_id}")
-
-            # Validate input
-            if not await agent.validate_input(agent_input):
-                raise ValueError(f"Invalid input for agent {step.agent_id}")
-
-            # Execute agent
+            # Execute agent (locally, or on a workflow worker in distributed mode)
             context = {
                 "workflow_variables": variables,
                 "step_id": step.step_id,
-                "execution_id": step.step_id,  # Simplified
+                "execution_id": execution_id or step.step_id,
             }
 
-            result = await agent.execute(agent_input, context)
+            metadata = self.agent_registry.get_metadata(step.agent_id)
+            cacheable = (
+                self.step_cache is not None and metadata is not None and metadata.cache_ttl_seconds
+            )
+            result = await self.step_cache.get(metadata, agent_input) if cacheable else None
+            if result is not None:
+                logger.debug(f"Step {step.step_id} served from cache ({step.agent_id})")
+            else:
+                if self.dispatcher is not None and execution_id:
+                    result = await self.dispatcher.run_step(
+                        execution_id,
+                        step.step_id,
+                        step.agent_id,
+                        agent_input,
+                        context,
+                        metadata.timeout_ms if metadata else None,
+                    )
+                else:
+                    result = await self.run_agent(step.agent_id, agent_input, context)
+                if cacheable:
+                    await self.step_cache.set(metadata, agent_input, result)
 
             # Map agent output to workflow variables
             for output_key, var_name in step.output_mapping.items():
@@ -299,33 +715,32 @@ class WorkflowEngine:
             step.completed_at = datetime.utcnow()
             raise
 
-    def _get_ready_steps(self, steps: list[WorkflowStep]) -> list[WorkflowStep]:
-        """Get steps that are ready to execute (dependencies satisfied).
+    async def run_agent(
+        self, agent_id: str, agent_input: dict[str, Any], context: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Validate input and execute an agent within its concurrency limit.
 
         Args:
-            steps: List of workflow steps
+            agent_id: Agent identifier
+            agent_input: Mapped agent input
+            context: Execution context
 
         Returns:
-            List of ready steps
+            Agent execution result
         """
-        ready = []
-
-        for step in steps:
-            if step.status != StepStatus.PENDING:
-                continue
-
-            # Check if all dependencies are completed
-            deps_completed = True
-            for dep_id in step.dependencies:
-                dep_step = next((s for s in steps if s.step_id == dep_id), None)
-                if not dep_step or dep_step.status != StepStatus.COMPLETED:
-                    deps_completed = False
-                    break
+        agent = self.agent_registry.get_agent(agent_id)
+        if not agent:
+            raise ValueError(f"Agent not found: {agent_id}")
 
-            if deps_completed:
-                ready.append(step)
+        # Validate input
+        if not await agent.validate_input(agent_input):
+            raise ValueError(f"Invalid input for agent {agent_id}")
 
-        return ready
+        slot = self._agent_slot(agent_id)
+        if slot is None:
+            return await agent.execute(agent_input, context)
+        async with slot:
+            return await agent.execute(agent_input, context)
 
     def get_execution(self, execution_id: str) -> WorkflowExecution | None:
         """Get a workflow execution by ID.
@@ -336,7 +751,16 @@ class WorkflowEngine:
         Returns:
             Workflow execution or None if not found
         """
-        return self._executions.get(execution_id)
+        execution = self._executions.get(execution_id)
+        if execution is None and self.persistence:
+            db = SessionLocal()
+            try:
+                state = load_execution_state(db, execution_id)
+            finally:
+                db.close()
+            if state is not None:
+                execution = execution_from_state(state)
+        return execution
 
     def list_executions(
         self, template_id: str | None = None, status: WorkflowStatus | None = None
@@ -351,6 +775,11 @@ class WorkflowEngine:
             List of workflow executions
         """
         executions = list(self._executions.values())
+        if self.persistence:
+            statuses = (status.value,) if status else None
+            for state in self._load_states(statuses, template_id):
+                if state["execution_id"] not in self._executions:
+                    executions.append(execution_from_state(state))
 
         if template_id:
             executions = [e for e in executions if e.template_id == template_id]
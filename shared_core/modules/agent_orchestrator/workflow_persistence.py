@@ -1,5 +1,6 @@
 """Workflow Persistence - Save and load workflows from database."""
 
+import base64
 import logging
 from datetime import datetime
 from typing import Any
@@ -339,3 +340,133 @@ def record_execution(
 
     logger.debug(f"Workflow execution recorded: {execution_id} ({status})")
     return record
+
+
+# Statuses of executions that a restarted worker should resume
+UNFINISHED_STATUSES = ("pending", "running")
+
+
+def checkpoint_execution(db: Session, state: dict[str, Any]) -> WorkflowExecutionRecord:
+    """Insert or update the durable state of a running execution.
+
+    Called by the workflow engine at every step boundary. ``state`` is the
+    JSON-safe dict produced by ``workflow_engine.execution_to_state``.
+
+    Args:
+        db: Database session
+        state: Execution state (status, variables, steps, timestamps)
+
+    Returns:
+        Execution record
+    """
+    record = db.get(WorkflowExecutionRecord, state["execution_id"])
+    if record is None:
+        record = WorkflowExecutionRecord(
+            id=state["execution_id"],
+            template_id=state.get("template_id"),
+            name=state["name"],
+            initial_variables=state.get("variables"),
+        )
+        db.add(record)
+
+    record.status = state["status"]
+    record.final_variables = state.get("variables")
+    record.steps_data = {"steps": state.get("steps", []), "metadata": state.get("metadata", {})}
+    record.error_message = state.get("error")
+    record.started_at = _parse_datetime(state.get("started_at"))
+    record.completed_at = _parse_datetime(state.get("completed_at"))
+    if record.started_at and record.completed_at:
+        record.duration_ms = (record.completed_at - record.started_at).total_seconds() * 1000
+    db.commit()
+    return record
+
+
+def load_execution_state(db: Session, execution_id: str) -> dict[str, Any] | None:
+    """Load the checkpointed state of an execution.
+
+    Args:
+        db: Database session
+        execution_id: Execution ID
+
+    Returns:
+        Execution state or None if not found
+    """
+    record = db.get(WorkflowExecutionRecord, execution_id)
+    return _record_to_state(record) if record else None
+
+
+def list_execution_states(
+    db: Session,
+    statuses: tuple[str, ...] | None = None,
+    template_id: str | None = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """List checkpointed executions, newest first.
+
+    Args:
+        db: Database session
+        statuses: Filter by status
+        template_id: Filter by template
+        limit: Maximum number of executions
+        offset: Number of executions to skip (paging)
+
+    Returns:
+        List of execution states
+    """
+    query = db.query(WorkflowExecutionRecord)
+    if statuses:
+        query = query.filter(WorkflowExecutionRecord.status.in_(statuses))
+    if template_id:
+        query = query.filter(WorkflowExecutionRecord.template_id == template_id)
+    # Tie-break on id so pages are stable
+    query = query.order_by(WorkflowExecutionRecord.created_at.desc(), WorkflowExecutionRecord.id)
+    records = query.offset(offset).limit(limit).all()
+    return [_record_to_state(record) for record in records]
+
+
+def encode_value(value: Any) -> Any:
+    """JSON-safe copy of workflow data; bytes (uploaded files) survive as base64."""
+    if isinstance(value, bytes | bytearray):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    if isinstance(value, dict):
+        return {str(k): encode_value(v) for k, v in value.items()}
+    if isinstance(value, list | tuple | set):
+        return [encode_value(v) for v in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    return str(value)
+
+
+def decode_value(value: Any) -> Any:
+    """Inverse of ``encode_value``."""
+    if isinstance(value, dict):
+        if set(value) == {"__bytes__"}:
+            return base64.b64decode(value["__bytes__"])
+        return {k: decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    return value
+
+
+def _record_to_state(record: WorkflowExecutionRecord) -> dict[str, Any]:
+    steps_data = record.steps_data or {}
+    return {
+        "execution_id": record.id,
+        "template_id": record.template_id,
+        "name": record.name,
+        "status": record.status,
+        "variables": record.final_variables or record.initial_variables or {},
+        "steps": steps_data.get("steps", []),
+        "metadata": steps_data.get("metadata", {}),
+        "error": record.error_message,
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "started_at": record.started_at.isoformat() if record.started_at else None,
+        "completed_at": record.completed_at.isoformat() if record.completed_at else None,
+    }
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
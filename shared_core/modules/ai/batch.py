@@ -9,6 +9,8 @@ from typing import Any
 
 from openai import OpenAI
 
+from .clients import get_provider_clients
+
 logger = logging.getLogger("converto.ai.batch")
 
 
@@ -19,9 +21,9 @@ class OpenAIBatchProcessor:
         """Initialize batch processor.
 
         Args:
-            client: OpenAI client (optional, creates new if None)
+            client: OpenAI client (optional, uses the shared pooled client if None)
         """
-        self.client = client or OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = client or get_provider_clients().openai_sync()
         self.batch_size = int(os.getenv("OPENAI_BATCH_SIZE", "50"))
 
     async def process_chat_batch(
@@ -0,0 +1,165 @@
+"""Shared, pooled clients for the AI providers (OpenAI, Anthropic).
+
+Every vision and LLM call site goes through one ``ProviderClients`` instance
+instead of building its own SDK client. The clients share keep-alive
+connection pools (HTTP/2 when the ``h2`` package is installed), so calls skip
+the TCP/TLS handshake. Each provider has its own concurrency limit so a burst
+of scans cannot exceed the provider's rate limits.
+
+FastAPI routes get the instance via ``Depends(get_provider_clients)``. Tests
+can swap it with ``set_provider_clients`` or point the base URLs at a local
+fake server (``OPENAI_BASE_URL`` / ``ANTHROPIC_BASE_URL``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger("converto.ai.clients")
+
+try:
+    import h2  # type: ignore  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "60")),
+    )
+
+
+class ProviderClients:
+    """Lazily created, pooled SDK clients plus per-provider concurrency limits."""
+
+    def __init__(
+        self,
+        openai_api_key: str | None = None,
+        anthropic_api_key: str | None = None,
+        openai_base_url: str | None = None,
+        anthropic_base_url: str | None = None,
+        concurrency: dict[str, int] | None = None,
+        timeout: float = 60.0,
+    ):
+        self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
+        self.anthropic_api_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.openai_base_url = openai_base_url or os.getenv("OPENAI_BASE_URL")
+        self.anthropic_base_url = anthropic_base_url or os.getenv("ANTHROPIC_BASE_URL")
+        self.timeout = timeout
+        self.concurrency = {
+            "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+            "anthropic": int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "8")),
+            **(concurrency or {}),
+        }
+
+        self._http: httpx.AsyncClient | None = None
+        self._sync_http: httpx.Client | None = None
+        self._openai: AsyncOpenAI | None = None
+        self._openai_sync: OpenAI | None = None
+        self._anthropic: Any | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def openai_configured(self) -> bool:
+        return bool(self.openai_api_key)
+
+    @property
+    def anthropic_configured(self) -> bool:
+        return bool(self.anthropic_api_key)
+
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE, limits=_limits(), timeout=self.timeout
+            )
+        return self._http
+
+    def openai(self) -> AsyncOpenAI:
+        """Shared async OpenAI client."""
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                api_key=self.openai_api_key,
+                base_url=self.openai_base_url,
+                http_client=self._http_client(),
+            )
+        return self._openai
+
+    def openai_sync(self) -> OpenAI:
+        """Shared sync OpenAI client for code paths that are not async yet."""
+        if self._openai_sync is None:
+            if self._sync_http is None:
+                self._sync_http = httpx.Client(limits=_limits(), timeout=self.timeout)
+            self._openai_sync = OpenAI(
+                api_key=self.openai_api_key,
+                base_url=self.openai_base_url,
+                http_client=self._sync_http,
+            )
+        return self._openai_sync
+
+    def anthropic(self) -> Any:
+        """Shared async Anthropic client (requires the ``anthropic`` package)."""
+        if self._anthropic is None:
+            import anthropic
+
+            self._anthropic = anthropic.AsyncAnthropic(
+                api_key=self.anthropic_api_key,
+                base_url=self.anthropic_base_url,
+                http_client=self._http_client(),
+            )
+        return self._anthropic
+
+    @asynccontextmanager
+    async def limit(self, provider: str) -> AsyncIterator[None]:
+        """Hold one of the provider's concurrency slots for the duration of a call."""
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency.get(provider, 8))
+            self._semaphores[provider] = semaphore
+        async with semaphore:
+            yield
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called from the app lifespan)."""
+        if self._http is not None:
+            await self._http.aclose()
+        if self._sync_http is not None:
+            self._sync_http.close()
+        self._http = self._sync_http = None
+        self._openai = self._openai_sync = self._anthropic = None
+        logger.info("AI provider clients closed")
+
+
+_provider_clients: ProviderClients | None = None
+
+
+def get_provider_clients() -> ProviderClients:
+    """Get the app-wide provider clients (also usable as a FastAPI dependency)."""
+    global _provider_clients
+    if _provider_clients is None:
+        _provider_clients = ProviderClients()
+    return _provider_clients
+
+
+def set_provider_clients(clients: ProviderClients | None) -> None:
+    """Replace the app-wide provider clients (tests, custom endpoints)."""
+    global _provider_clients
+    _provider_clients = clients
+
+
+async def close_provider_clients() -> None:
+    global _provider_clients
+    if _provider_clients is not None:
+        await _provider_clients.aclose()
+    _provider_clients = None
@@ -1,24 +1,11 @@
 import os
 
-from fastapi import APIRouter, HTTPException
-from openai import OpenAI
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
-
-# Lazy-initialize OpenAI client at request time to avoid build-time failures
-client: OpenAI | None = None
+from .clients import ProviderClients, get_provider_clients
 
-
-def get_openai_client() -> OpenAI:
-    global client
-    if client is None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            # Create a placeholder client with empty key to raise clear error later
-            raise RuntimeError("OPENAI_API_KEY not configured")
-        client = OpenAI(api_key=api_key)
-    return client
+router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
 
 
 class ChatMessage(BaseModel):
@@ -41,9 +28,14 @@ class ChatResponse(BaseModel):
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def ai_chat(request: ChatRequest):
+async def ai_chat(
+    request: ChatRequest, clients: ProviderClients = Depends(get_provider_clients)
+):
     """AI chat endpoint for business assistance."""
     try:
+        if not clients.openai_configured:
+            raise RuntimeError("OPENAI_API_KEY not configured")
+
         # Add system message if not present
         system_message = ChatMessage(
             role="system",
@@ -57,12 +49,13 @@ async def ai_chat(request: ChatRequest):
         # Convert to OpenAI format
         openai_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
 
-        completion = get_openai_client().chat.completions.create(
-            model=request.model,
-            messages=openai_messages,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature,
-        )
+        async with clients.limit("openai"):
+            completion = await clients.openai().chat.completions.create(
+                model=request.model,
+                messages=openai_messages,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+            )
 
         return ChatResponse(
             success=True,
@@ -9,6 +9,8 @@ from typing import Any
 
 from openai import OpenAI
 
+from ..ai.clients import get_provider_clients
+
 logger = logging.getLogger("converto.finance_agent.memory")
 
 
@@ -23,9 +25,9 @@ class MemoryLayer:
 
     def _initialize_clients(self) -> None:
         """Initialize OpenAI and Pinecone clients."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            self.openai_client = OpenAI(api_key=api_key)
+        clients = get_provider_clients()
+        if clients.openai_configured:
+            self.openai_client = clients.openai_sync()
 
         pinecone_api_key = os.getenv("PINECONE_API_KEY")
         pinecone_index_name = os.getenv("PINECONE_INDEX_NAME", "converto-finance-agent")
@@ -4,10 +4,9 @@ from __future__ import annotations
 
 import json
 import logging
-import os
 from typing import Any
 
-from openai import OpenAI
+from ..ai.clients import get_provider_clients
 
 logger = logging.getLogger("converto.finance_agent.reasoning")
 
@@ -16,10 +15,10 @@ class ReasoningEngine:
     """GPT-based reasoning engine for financial decisions."""
 
     def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        clients = get_provider_clients()
+        if not clients.openai_configured:
             raise ValueError("OPENAI_API_KEY not configured")
-        self.client = OpenAI(api_key=api_key)
+        self.client = clients.openai_sync()
         self.model = "gpt-4o-mini"
 
     def analyze_financial_context(
@@ -0,0 +1,183 @@
+"""Read-through cache for rarely changing Linear metadata.
+
+Teams, labels, users and workflow states are loaded constantly by the issue
+creation UI but change rarely. They are cached on two levels:
+
+- an in-process LRU (``LINEAR_CACHE_L1_SIZE`` entries) that serves repeat
+  reads from memory; entries are re-read from Redis after
+  ``LINEAR_CACHE_L1_TTL`` seconds so other instances pick up invalidations,
+- Redis (``AdvancedCache``), shared by all app instances.
+
+Values are fresh for ``LINEAR_CACHE_TTL`` seconds. For another
+``LINEAR_CACHE_STALE`` seconds the stale value is returned immediately and
+refreshed in the background (stale-while-revalidate). Concurrent misses for
+the same key share one Linear request. Linear webhooks call ``invalidate``,
+which bumps a per-kind version in Redis; a load on any instance that started
+before the bump does not write its result back.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ...utils.redis import AdvancedCache, advanced_cache
+
+logger = logging.getLogger("converto.linear.cache")
+
+LINEAR_CACHE_TTL = int(os.getenv("LINEAR_CACHE_TTL", "300"))
+LINEAR_CACHE_STALE = int(os.getenv("LINEAR_CACHE_STALE", "3600"))
+LINEAR_CACHE_L1_TTL = float(os.getenv("LINEAR_CACHE_L1_TTL", "30"))
+LINEAR_CACHE_L1_SIZE = int(os.getenv("LINEAR_CACHE_L1_SIZE", "256"))
+
+CACHE_KINDS = ("teams", "labels", "users", "states")
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class LinearMetadataCache:
+    """Two-level (in-process LRU + Redis) cache with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        redis_cache: AdvancedCache | None = None,
+        ttl: int = LINEAR_CACHE_TTL,
+        stale: int = LINEAR_CACHE_STALE,
+        l1_ttl: float = LINEAR_CACHE_L1_TTL,
+        l1_size: int = LINEAR_CACHE_L1_SIZE,
+    ):
+        self.redis_cache = redis_cache or advanced_cache
+        self.ttl = ttl
+        self.stale = stale
+        self.l1_ttl = l1_ttl
+        self.l1_size = l1_size
+        # key -> (entry, l1_loaded_at); entry = {"value": ..., "fetched_at": ...}
+        self._l1: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+        # Bumped on invalidation so loads started before it do not write back old data
+        # (the Redis version in version_key() does the same across instances)
+        self._generation: dict[str, int] = {}
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "stale": 0}
+
+    @staticmethod
+    def key(kind: str, team_id: str | None = None) -> str:
+        return f"linear:{kind}:{team_id or 'all'}"
+
+    @staticmethod
+    def version_key(kind: str) -> str:
+        return f"linear:version:{kind}"
+
+    async def get(self, kind: str, team_id: str | None, loader: Loader) -> Any:
+        """Return the cached value, loading it with ``loader`` when missing or expired."""
+        key = self.key(kind, team_id)
+        entry = self._l1_get(key)
+        if entry is not None:
+            self.stats["l1_hits"] += 1
+        else:
+            entry = await asyncio.to_thread(self.redis_cache.cache_get, key)
+            if entry is not None:
+                self.stats["l2_hits"] += 1
+                self._l1_set(key, entry)
+
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age < self.ttl:
+                return entry["value"]
+            if age < self.ttl + self.stale:
+                self.stats["stale"] += 1
+                self._refresh(key, loader)
+                return entry["value"]
+
+        self.stats["misses"] += 1
+        return await asyncio.shield(self._refresh(key, loader))
+
+    async def invalidate(self, kind: str) -> None:
+        """Drop every cached ``kind`` entry (all teams) from both levels."""
+        prefix = f"linear:{kind}:"
+        self._generation[kind] = self._generation.get(kind, 0) + 1
+        await asyncio.to_thread(self.redis_cache.cache_bump_version, self.version_key(kind))
+        for key in [k for k in self._l1 if k.startswith(prefix)]:
+            del self._l1[key]
+        for key in [k for k in self._refreshing if k.startswith(prefix)]:
+            del self._refreshing[key]
+        deleted = await asyncio.to_thread(self.redis_cache.cache_delete, f"{prefix}*")
+        logger.info(f"Invalidated Linear {kind} cache ({deleted} shared entries)")
+
+    def clear(self) -> None:
+        """Clear the in-process level (tests, key rotation)."""
+        self._l1.clear()
+
+    def _l1_get(self, key: str) -> dict[str, Any] | None:
+        cached = self._l1.get(key)
+        if cached is None:
+            return None
+        entry, loaded_at = cached
+        if time.monotonic() - loaded_at >= self.l1_ttl:
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return entry
+
+    def _l1_set(self, key: str, entry: dict[str, Any]) -> None:
+        self._l1[key] = (entry, time.monotonic())
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    def _refresh(self, key: str, loader: Loader) -> asyncio.Task:
+        """Start (or join) the single in-flight load for ``key``."""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        # Background refreshes have no awaiter; the error is already logged
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: str, loader: Loader) -> Any:
+        kind = key.split(":")[1]
+        generation = self._generation.get(kind, 0)
+        version = await asyncio.to_thread(self.redis_cache.cache_version, self.version_key(kind))
+        try:
+            value = await loader()
+        except Exception as e:
+            logger.error(f"Linear cache refresh failed for {key}: {e}")
+            raise
+        if self._generation.get(kind, 0) != generation:
+            return value
+        entry = {"value": value, "fetched_at": time.time()}
+        if version is not None:
+            stored = await asyncio.to_thread(
+                self.redis_cache.cache_set_if_version,
+                key,
+                entry,
+                self.ttl + self.stale,
+                self.version_key(kind),
+                version,
+            )
+            if not stored:
+                return value  # Invalidated on another instance while loading
+        self._l1_set(key, entry)
+        return value
+
+
+_cache: LinearMetadataCache | None = None
+
+
+def get_linear_metadata_cache() -> LinearMetadataCache:
+    """Get the process-wide Linear metadata cache."""
+    global _cache
+    if _cache is None:
+        _cache = LinearMetadataCache()
+    return _cache
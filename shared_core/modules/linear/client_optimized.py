@@ -8,19 +8,131 @@ Maximizes usage of Linear paid features:
 - Assignees & notifications
 - Webhooks integration
 - Analytics & reporting
+
+One app-scoped client (``get_linear_client_optimized``) keeps a pooled
+keep-alive connection to the GraphQL endpoint. A client-side budget tracks
+Linear's ``X-RateLimit-*`` headers and waits for the reset instead of
+spending the last requests/complexity points; rate-limited and transient
+failures are retried with backoff. The client is closed in the app lifespan.
+
+Teams, labels, users and workflow states are served from
+``LinearMetadataCache`` (see ``cache.py``); Linear webhooks invalidate it.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import os
+import random
+import time
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
 import httpx
 
+from .cache import LinearMetadataCache, get_linear_metadata_cache
+
 logger = logging.getLogger("converto.linear")
 
+try:
+    import h2  # type: ignore  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+LINEAR_MAX_CONNECTIONS = int(os.getenv("LINEAR_MAX_CONNECTIONS", "10"))
+LINEAR_MAX_RETRIES = int(os.getenv("LINEAR_MAX_RETRIES", "3"))
+LINEAR_RETRY_BASE = float(os.getenv("LINEAR_RETRY_BASE", "0.5"))
+# Keep this many requests in reserve before waiting for the window to reset
+LINEAR_RATE_RESERVE = int(os.getenv("LINEAR_RATE_RESERVE", "5"))
+LINEAR_MAX_RATE_WAIT = float(os.getenv("LINEAR_MAX_RATE_WAIT", "30"))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Linear caps connection page size at 250
+LINEAR_PAGE_SIZE = int(os.getenv("LINEAR_PAGE_SIZE", "100"))
+
+
+class LinearRateLimitError(Exception):
+    """Linear rejected the request for exceeding the rate or complexity limit."""
+
+
+class RateLimitBudget:
+    """Client-side view of Linear's request and complexity budgets.
+
+    Updated from the ``X-RateLimit-Requests-*`` / ``X-RateLimit-Complexity-*``
+    and ``X-Complexity`` response headers. ``wait`` sleeps until the window
+    resets when the remaining budget would not cover another query.
+    """
+
+    def __init__(self, reserve: int = LINEAR_RATE_RESERVE, max_wait: float = LINEAR_MAX_RATE_WAIT):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.requests_remaining: int | None = None
+        self.requests_reset: float | None = None
+        self.complexity_remaining: int | None = None
+        self.complexity_reset: float | None = None
+        self.last_complexity = 0
+
+    @staticmethod
+    def _int(headers: httpx.Headers, name: str) -> int | None:
+        value = headers.get(name)
+        try:
+            return int(float(value)) if value is not None else None
+        except ValueError:
+            return None
+
+    def update(self, headers: httpx.Headers) -> None:
+        """Record the budget reported by a response."""
+        requests_remaining = self._int(headers, "X-RateLimit-Requests-Remaining")
+        if requests_remaining is not None:
+            self.requests_remaining = requests_remaining
+        complexity_remaining = self._int(headers, "X-RateLimit-Complexity-Remaining")
+        if complexity_remaining is not None:
+            self.complexity_remaining = complexity_remaining
+        # Reset headers are epoch milliseconds
+        requests_reset = self._int(headers, "X-RateLimit-Requests-Reset")
+        if requests_reset is not None:
+            self.requests_reset = requests_reset / 1000
+        complexity_reset = self._int(headers, "X-RateLimit-Complexity-Reset")
+        if complexity_reset is not None:
+            self.complexity_reset = complexity_reset / 1000
+        complexity = self._int(headers, "X-Complexity")
+        if complexity is not None:
+            self.last_complexity = complexity
+
+    def delay(self) -> float:
+        """Seconds to wait before the next request (0 when the budget allows it)."""
+        now = time.time()
+        resets = []
+        if self.requests_remaining is not None and self.requests_remaining <= self.reserve:
+            resets.append(self.requests_reset)
+        if (
+            self.complexity_remaining is not None
+            and self.complexity_remaining <= self.last_complexity
+        ):
+            resets.append(self.complexity_reset)
+        waits = [reset - now for reset in resets if reset is not None and reset > now]
+        return min(max(waits, default=0.0), self.max_wait)
+
+    async def wait(self) -> None:
+        delay = self.delay()
+        if delay > 0:
+            logger.warning(f"Linear rate budget low, waiting {delay:.1f}s for reset")
+            await asyncio.sleep(delay)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests_remaining": self.requests_remaining,
+            "requests_reset": self.requests_reset,
+            "complexity_remaining": self.complexity_remaining,
+            "complexity_reset": self.complexity_reset,
+            "last_complexity": self.last_complexity,
+        }
+
 
 @dataclass
 class LinearConfig:
@@ -31,24 +143,107 @@ class LinearConfig:
 class LinearClientOptimized:
     """Optimized Linear client for maximum ROI."""
 
-    def __init__(self, config: LinearConfig):
+    def __init__(
+        self,
+        config: LinearConfig,
+        timeout: float = 30.0,
+        cache: LinearMetadataCache | None = None,
+    ):
         self.config = config
+        self.timeout = timeout
+        self.cache = cache or get_linear_metadata_cache()
         self.headers = {
             "Authorization": f"Bearer {config.api_key}",
             "Content-Type": "application/json",
         }
+        self.budget = RateLimitBudget()
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers=self.headers,
+                limits=httpx.Limits(
+                    max_connections=LINEAR_MAX_CONNECTIONS,
+                    max_keepalive_connections=LINEAR_MAX_CONNECTIONS,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=self.timeout,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+    @staticmethod
+    def _is_rate_limited(response: httpx.Response) -> bool:
+        if response.status_code == 429:
+            return True
+        if response.status_code != 400:
+            return False
+        # Linear answers 400 with a RATELIMITED error code
+        try:
+            errors = response.json().get("errors") or []
+        except ValueError:
+            return False
+        return any((e.get("extensions") or {}).get("code") == "RATELIMITED" for e in errors)
+
+    def _retry_delay(self, response: httpx.Response | None, attempt: int) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), LINEAR_MAX_RATE_WAIT)
+                except ValueError:
+                    pass
+            if self._is_rate_limited(response):
+                reset = self.budget.delay()
+                if reset > 0:
+                    return reset
+        return LINEAR_RETRY_BASE * 2**attempt * random.uniform(0.8, 1.2)
 
     async def query(self, query: str, variables: dict[str, Any] | None = None) -> dict[str, Any]:
-        """Execute GraphQL query."""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            data = {"query": query, "variables": variables or {}}
-            response = await client.post(self.config.base_url, headers=self.headers, json=data)
-            response.raise_for_status()
-            return response.json()
+        """Execute GraphQL query.
+
+        Waits when the rate budget is nearly spent and retries rate-limited,
+        5xx and connection failures up to ``LINEAR_MAX_RETRIES`` times.
+        """
+        data = {"query": query, "variables": variables or {}}
+        for attempt in range(LINEAR_MAX_RETRIES + 1):
+            await self.budget.wait()
+            response: httpx.Response | None = None
+            try:
+                response = await self.client.post(self.config.base_url, json=data)
+            except httpx.TransportError as e:
+                if attempt == LINEAR_MAX_RETRIES:
+                    raise
+                logger.warning(f"Linear request failed (attempt {attempt + 1}): {e}")
+            else:
+                self.budget.update(response.headers)
+                rate_limited = self._is_rate_limited(response)
+                if not rate_limited and response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                if attempt == LINEAR_MAX_RETRIES:
+                    if rate_limited:
+                        raise LinearRateLimitError("Linear API rate limit exceeded")
+                    response.raise_for_status()
+                logger.warning(
+                    f"Linear API returned {response.status_code} (attempt {attempt + 1}), retrying"
+                )
+            await asyncio.sleep(self._retry_delay(response, attempt))
+        raise RuntimeError("unreachable")
 
     # OPTIMIZED: Teams Management
     async def get_teams(self) -> list[dict[str, Any]]:
-        """Get all teams."""
+        """Get all teams (cached)."""
+        return await self.cache.get("teams", None, self._fetch_teams)
+
+    async def _fetch_teams(self) -> list[dict[str, Any]]:
         query = """
         query GetTeams {
             teams {
@@ -136,7 +331,36 @@ class LinearClientOptimized:
         project_id: str | None = None,
         limit: int = 50,
     ) -> list[dict[str, Any]]:
-        """Get Linear issues with advanced filtering."""
+        """Get up to ``limit`` Linear issues with advanced filtering."""
+        issues: list[dict[str, Any]] = []
+        stream = self.iter_issues(
+            team_id=team_id,
+            state=state,
+            assignee_id=assignee_id,
+            label_ids=label_ids,
+            project_id=project_id,
+            page_size=min(limit, 250),
+        )
+        async with contextlib.aclosing(stream):
+            async for issue in stream:
+                issues.append(issue)
+                if len(issues) >= limit:
+                    break
+        return issues
+
+    async def iter_issues(
+        self,
+        team_id: str | None = None,
+        state: str | None = None,
+        assignee_id: str | None = None,
+        label_ids: list[str] | None = None,
+        project_id: str | None = None,
+        page_size: int = LINEAR_PAGE_SIZE,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream all matching issues, following ``pageInfo.endCursor``.
+
+        The next page is fetched while the current one is consumed.
+        """
         query = """
         query GetIssues(
             $teamId: String,
@@ -144,7 +368,8 @@ class LinearClientOptimized:
             $assigneeId: String,
             $labelIds: [String!],
             $projectId: String,
-            $first: Int
+            $first: Int,
+            $after: String
         ) {
             issues(
                 filter: {
@@ -155,6 +380,7 @@ class LinearClientOptimized:
                     project: {id: {eq: $projectId}}
                 }
                 first: $first
+                after: $after
             ) {
                 nodes {
                     id
@@ -206,7 +432,7 @@ class LinearClientOptimized:
         }
         """
 
-        variables: dict[str, Any] = {"first": limit}
+        variables: dict[str, Any] = {}
         if team_id:
             variables["teamId"] = team_id
         if state:
@@ -218,8 +444,41 @@ class LinearClientOptimized:
         if project_id:
             variables["projectId"] = project_id
 
-        result = await self.query(query, variables)
-        return result.get("data", {}).get("issues", {}).get("nodes", [])
+        pages = self._paginate(query, variables, "issues", page_size)
+        async with contextlib.aclosing(pages):
+            async for issue in pages:
+                yield issue
+
+    async def _paginate(
+        self, query: str, variables: dict[str, Any], connection: str, page_size: int
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the nodes of a paginated connection, prefetching the next page."""
+
+        async def fetch(after: str | None) -> dict[str, Any]:
+            page_vars = {**variables, "first": page_size, "after": after}
+            result = await self.query(query, page_vars)
+            return (result.get("data") or {}).get(connection) or {}
+
+        page = await fetch(None)
+        next_page: asyncio.Task | None = None
+        try:
+            while True:
+                info = page.get("pageInfo") or {}
+                if info.get("hasNextPage") and info.get("endCursor"):
+                    next_page = asyncio.create_task(fetch(info["endCursor"]))
+                for node in page.get("nodes") or []:
+                    yield node
+                if next_page is None:
+                    return
+                page = await next_page
+                next_page = None
+        finally:
+            # Consumer stopped early -> drop the prefetched page and wait for it to
+            # finish, so its error is not left unretrieved
+            if next_page is not None:
+                next_page.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await next_page
 
     async def create_issue(
         self,
@@ -386,7 +645,10 @@ class LinearClientOptimized:
 
     # OPTIMIZED: Labels Management
     async def get_labels(self, team_id: str | None = None) -> list[dict[str, Any]]:
-        """Get labels."""
+        """Get labels (cached)."""
+        return await self.cache.get("labels", team_id, lambda: self._fetch_labels(team_id))
+
+    async def _fetch_labels(self, team_id: str | None = None) -> list[dict[str, Any]]:
         query = """
         query GetLabels($teamId: String) {
             issueLabels(filter: {team: {id: {eq: $teamId}}}) {
@@ -411,7 +673,10 @@ class LinearClientOptimized:
 
     # OPTIMIZED: Users/Assignees
     async def get_users(self, team_id: str | None = None) -> list[dict[str, Any]]:
-        """Get users/assignees."""
+        """Get users/assignees (cached)."""
+        return await self.cache.get("users", team_id, lambda: self._fetch_users(team_id))
+
+    async def _fetch_users(self, team_id: str | None = None) -> list[dict[str, Any]]:
         query = """
         query GetUsers($teamId: String) {
             users(filter: {teams: {id: {eq: $teamId}}}) {
@@ -439,7 +704,10 @@ class LinearClientOptimized:
 
     # OPTIMIZED: States/Workflows
     async def get_states(self, team_id: str | None = None) -> list[dict[str, Any]]:
-        """Get workflow states."""
+        """Get workflow states (cached)."""
+        return await self.cache.get("states", team_id, lambda: self._fetch_states(team_id))
+
+    async def _fetch_states(self, team_id: str | None = None) -> list[dict[str, Any]]:
         query = """
         query GetStates($teamId: String) {
             workflowStates(filter: {team: {id: {eq: $teamId}}}) {
@@ -466,38 +734,116 @@ class LinearClientOptimized:
     async def get_team_analytics(
         self, team_id: str, start_date: str, end_date: str
     ) -> dict[str, Any]:
-        """Get team analytics."""
+        """Get team analytics for issues created between the dates.
+
+        Aggregates over every page of issues as they stream in, so memory
+        stays constant however many issues the team has.
+        """
         query = """
-        query GetTeamAnalytics($teamId: String!, $startDate: DateTime!, $endDate: DateTime!) {
-            team(id: $teamId) {
-                id
-                name
-                issues(filter: {
+        query GetTeamAnalytics(
+            $teamId: String!,
+            $startDate: DateTime!,
+            $endDate: DateTime!,
+            $first: Int,
+            $after: String
+        ) {
+            issues(
+                filter: {
+                    team: {id: {eq: $teamId}}
                     createdAt: {gte: $startDate, lte: $endDate}
-                }) {
-                    nodes {
-                        id
-                        title
-                        state {
-                            name
-                        }
-                        createdAt
-                        completedAt
+                }
+                first: $first
+                after: $after
+            ) {
+                nodes {
+                    id
+                    state {
+                        name
+                        type
                     }
+                    createdAt
+                    completedAt
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
                 }
             }
         }
         """
         variables = {"teamId": team_id, "startDate": start_date, "endDate": end_date}
-        result = await self.query(query, variables)
-        return result.get("data", {}).get("team", {})
+
+        total = completed = 0
+        by_state: dict[str, int] = {}
+        completion_hours = 0.0
+        pages = self._paginate(query, variables, "issues", LINEAR_PAGE_SIZE)
+        async with contextlib.aclosing(pages):
+            async for issue in pages:
+                total += 1
+                state_name = (issue.get("state") or {}).get("name") or "Unknown"
+                by_state[state_name] = by_state.get(state_name, 0) + 1
+                if issue.get("completedAt"):
+                    completed += 1
+                    created = datetime.fromisoformat(issue["createdAt"].replace("Z", "+00:00"))
+                    done = datetime.fromisoformat(issue["completedAt"].replace("Z", "+00:00"))
+                    completion_hours += (done - created).total_seconds() / 3600
+
+        team = next((t for t in await self.get_teams() if t.get("id") == team_id), {})
+        return {
+            "id": team_id,
+            "name": team.get("name"),
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_issues": total,
+            "completed_issues": completed,
+            "open_issues": total - completed,
+            "completion_rate": round(completed / total, 4) if total else 0.0,
+            "avg_completion_hours": round(completion_hours / completed, 2) if completed else None,
+            "issues_by_state": by_state,
+        }
+
+
+_client: LinearClientOptimized | None = None
+# Clients replaced after a key change, kept referenced until they are closed
+_closing: set[asyncio.Task] = set()
 
 
 def get_linear_client_optimized() -> LinearClientOptimized:
-    """Get optimized Linear client from environment variables."""
+    """Get the app-wide optimized Linear client (configured from environment variables).
+
+    When ``LINEAR_API_KEY`` changes, the previous client's connection pool is
+    closed before it is replaced.
+    """
+    global _client
     api_key = os.getenv("LINEAR_API_KEY", "")
     if not api_key:
         raise ValueError("LINEAR_API_KEY not configured")
 
-    config = LinearConfig(api_key=api_key)
-    return LinearClientOptimized(config)
+    if _client is None or _client.config.api_key != api_key:
+        if _client is not None:
+            _close_replaced(_client)
+        _client = LinearClientOptimized(LinearConfig(api_key=api_key))
+    return _client
+
+
+def _close_replaced(client: LinearClientOptimized) -> None:
+    """Close a replaced client on the running loop (or right away outside one)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        try:
+            asyncio.run(client.aclose())
+        except Exception as e:
+            logger.warning(f"Closing replaced Linear client failed: {e}")
+        return
+    task = loop.create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+async def close_linear_client_optimized() -> None:
+    """Close pooled Linear connections (called from the app lifespan)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
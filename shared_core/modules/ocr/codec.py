@@ -0,0 +1,15 @@
+import io
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+def decode_image(b: bytes) -> np.ndarray:
+    img = Image.open(io.BytesIO(b)).convert("RGB")
+    return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+
+
+def encode_jpeg(img: np.ndarray, quality: int = 92) -> bytes:
+    _, enc = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return enc.tobytes()
@@ -0,0 +1,101 @@
+"""Bounded process pool for the CPU-bound OCR stages.
+
+OpenCV blurring and tesseract hold the CPU for seconds per image. Running them
+on the event loop stalls every other request on the uvicorn worker, so they are
+submitted to a process pool here. Each stage reports its queue depth (calls
+waiting for a pool slot), in-flight count and duration to Prometheus.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger("converto.ocr.executor")
+
+T = TypeVar("T")
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_START_METHOD = os.getenv("OCR_START_METHOD", "spawn")
+
+STAGE_QUEUE_DEPTH = Gauge(
+    "ocr_stage_queue_depth", "Calls waiting for an OCR pool slot", ["stage"]
+)
+STAGE_IN_FLIGHT = Gauge("ocr_stage_in_flight", "Calls currently running per stage", ["stage"])
+STAGE_DURATION = Histogram(
+    "ocr_stage_duration_seconds", "Duration of OCR pipeline stages in seconds", ["stage"]
+)
+
+_pool: ProcessPoolExecutor | None = None
+_slots: asyncio.Semaphore | None = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Get the shared OCR process pool (created lazily)."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=OCR_WORKERS,
+            mp_context=multiprocessing.get_context(OCR_START_METHOD),
+        )
+        logger.info(f"OCR process pool started with {OCR_WORKERS} workers")
+    return _pool
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(OCR_WORKERS)
+    return _slots
+
+
+@asynccontextmanager
+async def track_stage(stage: str) -> AsyncIterator[None]:
+    """Record in-flight count and duration for a pipeline stage."""
+    STAGE_IN_FLIGHT.labels(stage=stage).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage=stage).observe(time.perf_counter() - start)
+        STAGE_IN_FLIGHT.labels(stage=stage).dec()
+
+
+async def run_cpu(stage: str, fn: Callable[..., T], *args: Any) -> T:
+    """Run a picklable CPU-bound function in the OCR pool.
+
+    At most ``OCR_WORKERS`` calls are submitted at once; the rest wait here and
+    are counted in ``ocr_stage_queue_depth`` rather than piling up in the pool.
+    """
+    queue_depth = STAGE_QUEUE_DEPTH.labels(stage=stage)
+    queue_depth.inc()
+    try:
+        await _get_slots().acquire()
+    finally:
+        queue_depth.dec()
+
+    try:
+        async with track_stage(stage):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_pool(), fn, *args)
+    finally:
+        _get_slots().release()
+
+
+def shutdown_pool() -> None:
+    """Shut down the OCR process pool (called from the app lifespan)."""
+    global _pool, _slots
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        logger.info("OCR process pool stopped")
+    _pool = None
+    _slots = None
@@ -0,0 +1,173 @@
+"""Normalise uploads before they are sent to a Vision model.
+
+Phone photos arrive as multi-megabyte JPEG/PNG/HEIC files, sometimes rotated
+via EXIF only, and invoices often arrive as PDFs. The Vision API bills and
+uploads by image size, but it downsamples anything larger than its effective
+resolution anyway. This module:
+
+1. renders the first PDF page / decodes HEIC, PNG (alpha flattened on white)
+   and applies the EXIF orientation,
+2. crops to the document (the bright paper area) when it is clearly smaller
+   than the frame,
+3. resizes to the model's effective resolution (fits ``VISION_MAX_SIDE`` and
+   keeps the short side at most ``VISION_SHORT_SIDE``, as the high-detail mode
+   does), and
+4. re-encodes as JPEG.
+
+``normalize_for_vision`` is CPU-bound and picklable, so callers run it in the
+OCR process pool.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import os
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+from .codec import encode_jpeg
+
+try:
+    from pillow_heif import register_heif_opener  # type: ignore
+
+    register_heif_opener()
+    HEIF_AVAILABLE = True
+except ImportError:
+    HEIF_AVAILABLE = False
+
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "2048"))
+VISION_SHORT_SIDE = int(os.getenv("VISION_SHORT_SIDE", "768"))
+VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "85"))
+PDF_RENDER_DPI = int(os.getenv("PDF_RENDER_DPI", "150"))
+DOC_DETECT_SIDE = 640
+DOC_PAD = 0.02
+
+
+@dataclass
+class NormalizedImage:
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    original_bytes: int
+    cropped: bool = False
+
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode()}"
+
+
+def is_pdf(raw: bytes) -> bool:
+    return raw[:5] == b"%PDF-"
+
+
+def _open_pdf(raw: bytes):
+    try:
+        import fitz  # type: ignore  # PyMuPDF
+    except ImportError as e:
+        raise ValueError("PDF uploads require PyMuPDF (pip install pymupdf)") from e
+    return fitz.open(stream=raw, filetype="pdf")
+
+
+def _render_pdf_page(raw: bytes, index: int = 0) -> Image.Image:
+    with _open_pdf(raw) as doc:
+        if doc.page_count == 0:
+            raise ValueError("PDF has no pages")
+        pix = doc[index].get_pixmap(dpi=PDF_RENDER_DPI, alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def pdf_page_count(raw: bytes) -> int:
+    """Number of pages; only the page tree is read, nothing is rendered."""
+    with _open_pdf(raw) as doc:
+        return doc.page_count
+
+
+def render_pdf_page(raw: bytes, index: int) -> bytes:
+    """Render one PDF page to JPEG bytes (picklable, for the OCR pool).
+
+    Multi-page PDFs are rendered page by page when each page is processed, so
+    a long scan never holds every page bitmap in memory at once.
+    """
+    img = cv2.cvtColor(np.array(_render_pdf_page(raw, index)), cv2.COLOR_RGB2BGR)
+    return encode_jpeg(img, 92)
+
+
+def _open_image(raw: bytes) -> Image.Image:
+    if is_pdf(raw):
+        return _render_pdf_page(raw)
+
+    img = Image.open(io.BytesIO(raw))
+    if img.format in ("HEIF", "HEIC") and not HEIF_AVAILABLE:
+        raise ValueError("HEIC uploads require pillow-heif")
+    # Puhelinkuvat: käännä EXIF-orientaation mukaan ennen kaikkea muuta
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _find_document(gray: np.ndarray) -> tuple[int, int, int, int] | None:
+    """Bounding box (x, y, w, h) of the bright paper area, or None to keep the frame."""
+    h, w = gray.shape[:2]
+    scale = min(1.0, DOC_DETECT_SIDE / max(h, w))
+    small = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))))
+    small = cv2.GaussianBlur(small, (5, 5), 0)
+    _, bw = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    bw = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, np.ones((9, 9), np.uint8))
+    contours, _ = cv2.findContours(bw, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    x, y, bw_w, bw_h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    frame = small.shape[0] * small.shape[1]
+    # Liian pieni = todennäköisesti heijastus, lähes koko kuva = ei hyötyä
+    if not 0.15 * frame <= bw_w * bw_h <= 0.85 * frame:
+        return None
+
+    pad_x, pad_y = int(bw_w * DOC_PAD), int(bw_h * DOC_PAD)
+    x0, y0 = max(0, int((x - pad_x) / scale)), max(0, int((y - pad_y) / scale))
+    x1 = min(w, int((x + bw_w + pad_x) / scale))
+    y1 = min(h, int((y + bw_h + pad_y) / scale))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def target_size(width: int, height: int) -> tuple[int, int]:
+    """Size the Vision model would downsample to; never upscales."""
+    scale = min(1.0, VISION_MAX_SIDE / max(width, height))
+    scale = min(scale, VISION_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def normalize_for_vision(raw: bytes, crop: bool = True) -> NormalizedImage:
+    """Orient, crop, resize and JPEG-encode an upload for a Vision model."""
+    img = cv2.cvtColor(np.array(_open_image(raw)), cv2.COLOR_RGB2BGR)
+
+    cropped = False
+    if crop:
+        box = _find_document(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+        if box:
+            x, y, w, h = box
+            img = img[y : y + h, x : x + w]
+            cropped = True
+
+    h, w = img.shape[:2]
+    new_w, new_h = target_size(w, h)
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+
+    data = encode_jpeg(img, VISION_JPEG_QUALITY)
+    return NormalizedImage(
+        data=data,
+        mime_type="image/jpeg",
+        width=new_w,
+        height=new_h,
+        original_bytes=len(raw),
+        cropped=cropped,
+    )
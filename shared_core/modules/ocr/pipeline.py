@@ -0,0 +1,60 @@
+"""Single-decode image pipeline for privacy blur and OCR.
+
+The upload is decoded once and the same arrays flow through face/plate
+detection, blurring, preprocessing and tesseract. The grayscale image used
+for detection is blurred alongside the colour image and reused for OCR, so
+nothing is re-encoded or re-decoded between stages. JPEG bytes are produced
+only when they must leave the pipeline (Vision fallback or persistence).
+"""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from .codec import decode_image, encode_jpeg
+from .privacy import blur_regions, detect_private_regions
+from .service import extract_specs, run_ocr_gray
+
+
+class ImagePipeline:
+    """Holds the decoded image and its grayscale view for one upload."""
+
+    def __init__(self, img: np.ndarray):
+        self.img = img
+        self.gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        self.blurred_regions = 0
+
+    @classmethod
+    def from_bytes(cls, b: bytes) -> ImagePipeline:
+        return cls(decode_image(b))
+
+    def blur_private(self, doc_type: str | None = None) -> ImagePipeline:
+        """Blur faces and licence plates in both the colour and grayscale image."""
+        boxes = detect_private_regions(self.gray, doc_type)
+        blur_regions(self.img, boxes)
+        blur_regions(self.gray, boxes)
+        self.blurred_regions = len(boxes)
+        return self
+
+    def ocr_text(self) -> str:
+        return run_ocr_gray(self.gray)
+
+    def to_jpeg(self, quality: int = 92) -> bytes:
+        return encode_jpeg(self.img, quality)
+
+
+def blur_and_ocr(
+    raw: bytes, encode: bool = True, doc_type: str | None = None
+) -> tuple[str, bytes | None]:
+    """Blur and OCR an upload; return the text and, if requested, the safe JPEG."""
+    pipe = ImagePipeline.from_bytes(raw).blur_private(doc_type)
+    text = pipe.ocr_text()
+    return text, pipe.to_jpeg() if encode else None
+
+
+def scan_power_label(raw: bytes) -> tuple[dict, bytes | None]:
+    """Power-label scan: the safe JPEG is encoded only if Vision fallback is needed."""
+    pipe = ImagePipeline.from_bytes(raw).blur_private()
+    specs = extract_specs(pipe.ocr_text())
+    return specs, None if specs.get("rated_watts") else pipe.to_jpeg()
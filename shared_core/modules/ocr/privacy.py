@@ -1,31 +1,68 @@
+import os
+import threading
+
 import cv2
-import io
 import numpy as np
-from PIL import Image
 
+from .codec import decode_image, encode_jpeg
 
-FACE = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-PLATE = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_russian_plate_number.xml")
 
+FACE_CASCADE = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+PLATE_CASCADE = cv2.data.haarcascades + "haarcascade_russian_plate_number.xml"
 
-def _nd(b: bytes) -> np.ndarray:
-    img = Image.open(io.BytesIO(b)).convert("RGB")
-    return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+# Detection runs on a downscaled copy; boxes are mapped back to full size
+DETECT_MAX_SIDE = int(os.getenv("PRIVACY_DETECT_MAX_SIDE", "1024"))
+# Document types that never contain faces or plates (comma separated)
+SKIP_DOC_TYPES = {
+    t.strip() for t in os.getenv("PRIVACY_SKIP_DOC_TYPES", "invoice").split(",") if t.strip()
+}
 
+# CascadeClassifier is not thread-safe: one pair per thread (and so per pool worker)
+_local = threading.local()
 
-def _to_bytes(img: np.ndarray) -> bytes:
-    _, enc = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), 92])
-    return enc.tobytes()
 
+def _classifiers() -> tuple[cv2.CascadeClassifier, cv2.CascadeClassifier]:
+    if not hasattr(_local, "face"):
+        _local.face = cv2.CascadeClassifier(FACE_CASCADE)
+        _local.plate = cv2.CascadeClassifier(PLATE_CASCADE)
+    return _local.face, _local.plate
 
-def blur_faces_and_plates(b: bytes) -> bytes:
-    img = _nd(b)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    boxes = list(FACE.detectMultiScale(gray, 1.2, 5, minSize=(30, 30))) + list(
-        PLATE.detectMultiScale(gray, 1.1, 5, minSize=(40, 20))
+
+def detect_private_regions(gray: np.ndarray, doc_type: str | None = None) -> list:
+    if doc_type in SKIP_DOC_TYPES:
+        return []
+
+    h, w = gray.shape[:2]
+    scale = min(1.0, DETECT_MAX_SIDE / max(h, w))
+    small = gray
+    if scale < 1.0:
+        small = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    face, plate = _classifiers()
+    face_min = (max(12, int(30 * scale)), max(12, int(30 * scale)))
+    plate_min = (max(16, int(40 * scale)), max(8, int(20 * scale)))
+    boxes = list(face.detectMultiScale(small, 1.2, 5, minSize=face_min)) + list(
+        plate.detectMultiScale(small, 1.1, 5, minSize=plate_min)
     )
+    if scale == 1.0:
+        return boxes
+    return [
+        (int(x / scale), int(y / scale), int(bw / scale) + 1, int(bh / scale) + 1)
+        for x, y, bw, bh in boxes
+    ]
+
+
+def blur_regions(img: np.ndarray, boxes: list) -> np.ndarray:
+    """Blur boxes in place (works for both BGR and grayscale images)."""
     for x, y, w, h in boxes:
         roi = img[y : y + h, x : x + w]
         roi = cv2.GaussianBlur(roi, (51, 51), 30)
         img[y : y + h, x : x + w] = roi
-    return _to_bytes(img)
+    return img
+
+
+def blur_faces_and_plates(b: bytes, doc_type: str | None = None) -> bytes:
+    img = decode_image(b)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    blur_regions(img, detect_private_regions(gray, doc_type))
+    return encode_jpeg(img)
@@ -4,9 +4,10 @@ from datetime import datetime
 import csv
 import io
 
-from .service import run_ocr_bytes, extract_specs, merge
+from .executor import run_cpu, track_stage
+from .pipeline import scan_power_label
+from .service import merge
 from .vision import vision_enrich
-from .privacy import blur_faces_and_plates
 from ..ai_common.insights import recommend_bundle
 from ...utils.storage import sha256
 from ...utils.db import get_session
@@ -28,12 +29,12 @@ async def ocr_power(
     db=Depends(get_session),
 ):
     raw = await file.read()
-    safe = blur_faces_and_plates(raw)
-    ocr_text = run_ocr_bytes(safe)
-    specs = extract_specs(ocr_text)
+    specs, safe = await run_cpu("pipeline", scan_power_label, raw)
+    ocr_text = specs["ocr_raw"]
     vision = None
-    if not specs.get("rated_watts"):
-        vision = vision_enrich(safe)
+    if safe is not None:
+        async with track_stage("vision"):
+            vision = await vision_enrich(safe)
     data = merge(device_hint, specs, vision)
     if not data.get("rated_watts"):
         raise HTTPException(
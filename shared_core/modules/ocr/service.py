@@ -1,23 +1,71 @@
 from typing import Optional
 import re
-import io
 import os
 import cv2
 import numpy as np
-from PIL import Image
 import pytesseract
 
+from .codec import decode_image
+
 
 OCR_LANG = os.getenv("OCR_LANG", "fin+eng")
+# "full": denoise and threshold the whole image (default);
+# "adaptive": bound resolution and crop to the text region before denoising.
+# Stays opt-in until scripts/ocr_preprocess_benchmark.py shows it matches "full"
+OCR_PREPROCESS_MODE = os.getenv("OCR_PREPROCESS_MODE", "full")
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))
+ROI_DETECT_SIDE = 640
+ROI_PAD = 0.03
+
+
+def _downscale(gray: np.ndarray, max_side: int) -> np.ndarray:
+    h, w = gray.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return gray
+    return cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+
+def _find_text_region(gray: np.ndarray) -> Optional[tuple[int, int, int, int]]:
+    """Bounding box (x, y, w, h) of the text-dense area, or None if it is the whole image."""
+    h, w = gray.shape[:2]
+    small = _downscale(gray, ROI_DETECT_SIDE)
+    scale = w / small.shape[1]
+
+    # Text has strong local gradients; close them horizontally into blocks
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    grad = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, kernel)
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 5))
+    closed = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = small.shape[0] * small.shape[1] * 0.001
+    boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) >= min_area]
+    if not boxes:
+        return None
 
+    x0 = min(b[0] for b in boxes)
+    y0 = min(b[1] for b in boxes)
+    x1 = max(b[0] + b[2] for b in boxes)
+    y1 = max(b[1] + b[3] for b in boxes)
+    pad_x, pad_y = int((x1 - x0) * ROI_PAD), int((y1 - y0) * ROI_PAD)
+    x0, y0 = max(0, int((x0 - pad_x) * scale)), max(0, int((y0 - pad_y) * scale))
+    x1, y1 = min(w, int((x1 + pad_x) * scale)), min(h, int((y1 + pad_y) * scale))
 
-def _load_image(b: bytes) -> np.ndarray:
-    img = Image.open(io.BytesIO(b)).convert("RGB")
-    return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+    # Not worth cropping if the text covers (almost) the whole frame
+    if (x1 - x0) * (y1 - y0) > 0.9 * w * h:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
 
 
-def _preprocess(img: np.ndarray) -> np.ndarray:
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+def _preprocess(gray: np.ndarray, mode: Optional[str] = None) -> np.ndarray:
+    if (mode or OCR_PREPROCESS_MODE) == "adaptive":
+        gray = _downscale(gray, OCR_MAX_SIDE)
+        roi = _find_text_region(gray)
+        if roi:
+            x, y, w, h = roi
+            gray = gray[y : y + h, x : x + w]
     gray = cv2.fastNlMeansDenoising(gray, None, 7, 7, 21)
     thr = cv2.adaptiveThreshold(
         gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 35, 11
@@ -25,13 +73,39 @@ def _preprocess(img: np.ndarray) -> np.ndarray:
     return thr
 
 
-def run_ocr_bytes(b: bytes) -> str:
-    img = _load_image(b)
-    proc = _preprocess(img)
+def run_ocr_gray(gray: np.ndarray, mode: Optional[str] = None) -> str:
+    proc = _preprocess(gray, mode)
     cfg = "--oem 1 --psm 6"
     return pytesseract.image_to_string(proc, lang=OCR_LANG, config=cfg)
 
 
+def run_ocr_bytes(b: bytes, mode: Optional[str] = None) -> str:
+    img = decode_image(b)
+    return run_ocr_gray(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), mode)
+
+
+def run_ocr_with_confidence(b: bytes, mode: Optional[str] = None) -> tuple[str, float]:
+    """OCR text plus tesseract's mean word confidence (0-100)."""
+    gray = cv2.cvtColor(decode_image(b), cv2.COLOR_BGR2GRAY)
+    proc = _preprocess(gray, mode)
+    cfg = "--oem 1 --psm 6"
+    data = pytesseract.image_to_data(
+        proc, lang=OCR_LANG, config=cfg, output_type=pytesseract.Output.DICT
+    )
+    lines: dict[tuple[int, int, int], list[str]] = {}
+    confs = []
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        conf = float(data["conf"][i])
+        if conf >= 0:
+            confs.append(conf)
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    return text, (sum(confs) / len(confs) if confs else 0.0)
+
+
 W_REGEX = re.compile(r"(\d{2,5})\s*(kW|KW|W|w|VA|va)")
 V_REGEX = re.compile(r"(\d{2,3})\s*V\b")
 A_REGEX = re.compile(r"(\d{1,3}(?:[.,]\d{1,2})?)\s*A\b", re.I)
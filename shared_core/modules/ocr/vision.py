@@ -1,10 +1,11 @@
 import os
 import base64
 import json
-from openai import OpenAI
+from typing import Optional
+
+from ..ai.clients import ProviderClients, get_provider_clients
 
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o-mini")
 
 PROMPT = (
@@ -14,23 +15,25 @@ PROMPT = (
 )
 
 
-def vision_enrich(img_bytes: bytes) -> dict:
+async def vision_enrich(img_bytes: bytes, clients: Optional[ProviderClients] = None) -> dict:
     b64 = base64.b64encode(img_bytes).decode()
-    r = client.chat.completions.create(
-        model=VISION_MODEL,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": PROMPT},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
-                ],
-            }
-        ],
-        response_format={"type": "json_object"},
-        temperature=0.2,
-    )
+    clients = clients or get_provider_clients()
+    async with clients.limit("openai"):
+        r = await clients.openai().chat.completions.create(
+            model=VISION_MODEL,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": PROMPT},
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
+                    ],
+                }
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.2,
+        )
     try:
         return r.choices[0].message.parsed or {}
     except Exception:
-        return json.loads(r.choices[0].message.content)
\ No newline at end of file
+        return json.loads(r.choices[0].message.content)
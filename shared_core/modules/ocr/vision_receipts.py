@@ -1,12 +1,12 @@
 import os
 import base64
 import json
-from openai import OpenAI
 from typing import Dict, Any, Optional
 import re
 from datetime import datetime
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from ..ai.clients import get_provider_clients
+
 VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o-mini")
 
 # Kuittien tunnistus prompt
@@ -50,7 +50,7 @@ def vision_enrich_receipt(img_bytes: bytes) -> Dict[str, Any]:
     b64 = base64.b64encode(img_bytes).decode()
     
     try:
-        r = client.chat.completions.create(
+        r = get_provider_clients().openai_sync().chat.completions.create(
             model=VISION_MODEL,
             messages=[
                 {
@@ -90,7 +90,7 @@ def vision_enrich_invoice(img_bytes: bytes) -> Dict[str, Any]:
     b64 = base64.b64encode(img_bytes).decode()
     
     try:
-        r = client.chat.completions.create(
+        r = get_provider_clients().openai_sync().chat.completions.create(
             model=VISION_MODEL,
             messages=[
                 {
@@ -216,7 +216,7 @@ def parse_date(date_str: str) -> Optional[str]:
 def vision_enrich(img_bytes: bytes) -> dict:
     """Vanha funktio sähkölaitteiden tunnistukseen"""
     b64 = base64.b64encode(img_bytes).decode()
-    r = client.chat.completions.create(
+    r = get_provider_clients().openai_sync().chat.completions.create(
         model=VISION_MODEL,
         messages=[
             {
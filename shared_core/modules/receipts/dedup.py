@@ -0,0 +1,79 @@
+"""Content-addressed deduplication for receipt scans.
+
+Uploads are keyed on the sha256 of the raw image bytes. A repeat upload of an
+already stored image returns the existing ``Receipt`` without a Vision call, and
+concurrent uploads of the same image share a single in-flight extraction.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from .models import Receipt
+
+logger = logging.getLogger("converto.receipts.dedup")
+
+
+class ReceiptDedup:
+    """Lookup of stored receipts by image hash plus in-flight request sharing."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self.hits = 0
+        self.shared = 0
+
+    @staticmethod
+    def key(tenant_id: str | None, digest: str) -> str:
+        """Dedup key; hashes are scoped per tenant so tenants never see each other's data."""
+        return f"{tenant_id or 'default'}:{digest}"
+
+    def find_existing(
+        self, db: Session, tenant_id: str | None, digest: str, count_hit: bool = True
+    ) -> Receipt | None:
+        """Return the oldest stored receipt for this tenant and image hash, if any."""
+        query = db.query(Receipt).filter(Receipt.sha256 == digest)
+        if tenant_id:
+            query = query.filter(Receipt.tenant_id == tenant_id)
+        else:
+            query = query.filter(Receipt.tenant_id.is_(None))
+        receipt = query.order_by(Receipt.created_at.asc()).first()
+        if receipt is not None and count_hit:
+            self.hits += 1
+            logger.info(f"Receipt dedup hit: {digest[:12]}... -> {receipt.id}")
+        return receipt
+
+    async def run_once(self, key: str, factory: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Run ``factory`` once per key; concurrent callers await the same task.
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True when the result came
+            from another request's in-flight extraction.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            logger.info(f"Receipt dedup joined in-flight extraction: {key[:24]}...")
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task), False
+
+    def _done(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "shared": self.shared, "in_flight": len(self._inflight)}
+
+
+receipt_dedup = ReceiptDedup()
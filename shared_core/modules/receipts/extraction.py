@@ -0,0 +1,122 @@
+"""Receipt extraction and persistence shared by the upload and inbox pipelines.
+
+``extract_receipt`` runs the tiered extractor and categorisation for one image
+and ``add_receipt_rows`` adds the receipt, its items and the audit row to a
+session (the caller commits, so a whole batch can go in one transaction).
+
+``extraction_slot`` is one process-wide limit for batch extraction: the
+``/batch`` upload endpoint and the email inbox share
+``RECEIPT_BATCH_CONCURRENCY`` slots, so a large forwarded email and a zip
+upload cannot together flood the Vision API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from .models import DocumentAudit, Receipt, ReceiptItem
+from .tiered import receipt_extractor
+from .vision_service import categorize_receipt
+
+BATCH_CONCURRENCY = int(os.getenv("RECEIPT_BATCH_CONCURRENCY", "8"))
+
+_slots: asyncio.Semaphore | None = None
+
+
+@asynccontextmanager
+async def extraction_slot() -> AsyncIterator[None]:
+    """Hold one of the shared batch extraction slots."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    async with _slots:
+        yield
+
+
+async def extract_receipt(img_bytes: bytes) -> dict:
+    """Tunnista ja kategorisoi kuitti (ei tietokantaa)."""
+    # Paikallinen OCR ensin, Vision AI vain epävarmoille kentille
+    vision_result = await receipt_extractor.extract(img_bytes)
+
+    if vision_result.get("error"):
+        raise HTTPException(
+            status_code=422, detail=f"Vision AI processing failed: {vision_result['error']}"
+        )
+
+    # Kategorisoi automaattisesti
+    categorized_result = categorize_receipt(vision_result)
+
+    # Laske netto summa jos puuttuu
+    if (
+        not categorized_result.get("net_amount")
+        and categorized_result.get("total_amount")
+        and categorized_result.get("vat_amount")
+    ):
+        categorized_result["net_amount"] = (
+            categorized_result["total_amount"] - categorized_result["vat_amount"]
+        )
+    return categorized_result
+
+
+def add_receipt_rows(
+    db: Session,
+    categorized_result: dict,
+    digest: str,
+    tenant_id: str | None,
+    user_id: str | None,
+) -> Receipt:
+    """Lisää kuitti, tuotteet ja audit-rivi sessioon (commit kutsujalla)."""
+    receipt = Receipt(
+        tenant_id=tenant_id,
+        vendor=categorized_result.get("vendor"),
+        total_amount=categorized_result.get("total_amount"),
+        vat_amount=categorized_result.get("vat_amount"),
+        vat_rate=categorized_result.get("vat_rate"),
+        net_amount=categorized_result.get("net_amount"),
+        receipt_date=categorized_result.get("receipt_date"),
+        invoice_number=categorized_result.get("invoice_number"),
+        payment_method=categorized_result.get("payment_method"),
+        currency=categorized_result.get("currency", "EUR"),
+        items=categorized_result.get("items", []),
+        confidence=categorized_result.get("confidence", 0.0),
+        vision_ai_model=categorized_result.get("vision_ai_model"),
+        processing_time_ms=categorized_result.get("processing_time_ms"),
+        sha256=digest,
+        category=categorized_result.get("category"),
+        subcategory=categorized_result.get("subcategory"),
+        tags=categorized_result.get("tags", []),
+        created_by=user_id,
+    )
+
+    db.add(receipt)
+    db.flush()  # Saada ID
+
+    # Tallenna tuotteet
+    for item_data in categorized_result.get("items", []):
+        item = ReceiptItem(
+            receipt_id=receipt.id,
+            tenant_id=tenant_id,
+            name=item_data.get("name"),
+            quantity=item_data.get("quantity", 1.0),
+            unit_price=item_data.get("unit_price", 0.0),
+            total_price=item_data.get("total_price", 0.0),
+        )
+        db.add(item)
+
+    # Audit log
+    audit = DocumentAudit(
+        document_id=receipt.id,
+        document_type="receipt",
+        tenant_id=tenant_id,
+        event="created",
+        payload={"vision_result": categorized_result},
+        user_id=user_id,
+    )
+    db.add(audit)
+    return receipt
@@ -54,6 +54,7 @@ class Receipt(Base):
     confidence = Column(Float, nullable=False, default=0.0)
     vision_ai_model = Column(String(64), default="gpt-4o-mini")
     processing_time_ms = Column(Integer, nullable=True)
+    sha256 = Column(String(64), nullable=True, index=True)  # Kuvan tiiviste (dedup)
     
     # Kategorisointi
     category = Column(String(64), nullable=True, index=True)
@@ -2,20 +2,40 @@
 
 from __future__ import annotations
 
+import asyncio
+import io
+import json
 import logging
+import os
+import uuid
+import zipfile
+from collections.abc import AsyncIterator
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from ...utils.db import get_session
+from ...utils.db import SessionLocal, get_session
+from ...utils.storage import sha256
 from ..gamify.service import record_event
+from ..ocr.executor import track_stage
 from ..p2e.service import mint as p2e_mint
-from .models import DocumentAudit, Invoice, InvoiceItem, Receipt, ReceiptItem
-from .vision_service import categorize_invoice, categorize_receipt, process_invoice, process_receipt
+from .dedup import receipt_dedup
+from .extraction import add_receipt_rows, extract_receipt, extraction_slot
+from .models import DocumentAudit, Invoice, InvoiceItem, Receipt
+from .vision_service import categorize_invoice, process_invoice
 
 router = APIRouter(prefix="/api/v1/receipts", tags=["receipts"])
 logger = logging.getLogger("converto.receipts")
 
+BATCH_COMMIT_SIZE = int(os.getenv("RECEIPT_BATCH_COMMIT_SIZE", "25"))
+BATCH_MAX_FILES = int(os.getenv("RECEIPT_BATCH_MAX_FILES", "500"))
+# Zip-pommit: rajoita yksittäisen kuvan ja koko erän purettu koko sekä zip-rivien määrä
+BATCH_MAX_FILE_BYTES = int(os.getenv("RECEIPT_BATCH_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("RECEIPT_BATCH_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
+BATCH_MAX_ZIP_ENTRIES = int(os.getenv("RECEIPT_BATCH_MAX_ZIP_ENTRIES", "2000"))
+BATCH_IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif", ".tif", ".tiff")
+
 
 @router.post("/scan")
 async def scan_receipt(
@@ -28,132 +48,360 @@ async def scan_receipt(
     try:
         # Lue kuva
         img_bytes = await file.read()
+        digest = sha256(img_bytes)
 
-        # Käsittele Vision AI:lla
-        vision_result = process_receipt(img_bytes)
-
-        if vision_result.get("error"):
-            raise HTTPException(
-                status_code=422, detail=f"Vision AI processing failed: {vision_result['error']}"
-            )
+        # Sama kuva jo skannattu -> palauta tallennettu kuitti ilman Vision-kutsua
+        existing = receipt_dedup.find_existing(db, tenant_id, digest)
+        if existing is not None:
+            return _receipt_response(existing, duplicate=True)
 
-        # Kategorisoi automaattisesti
-        categorized_result = categorize_receipt(vision_result)
+        async def _extract_and_store() -> Receipt:
+            return await _scan_and_store_receipt(db, img_bytes, digest, tenant_id, user_id)
 
-        # Laske netto summa jos puuttuu
-        if (
-            not categorized_result.get("net_amount")
-            and categorized_result.get("total_amount")
-            and categorized_result.get("vat_amount")
-        ):
-            categorized_result["net_amount"] = (
-                categorized_result["total_amount"] - categorized_result["vat_amount"]
-            )
-
-        # Tallenna tietokantaan
-        receipt = Receipt(
-            tenant_id=tenant_id,
-            vendor=categorized_result.get("vendor"),
-            total_amount=categorized_result.get("total_amount"),
-            vat_amount=categorized_result.get("vat_amount"),
-            vat_rate=categorized_result.get("vat_rate"),
-            net_amount=categorized_result.get("net_amount"),
-            receipt_date=categorized_result.get("receipt_date"),
-            invoice_number=categorized_result.get("invoice_number"),
-            payment_method=categorized_result.get("payment_method"),
-            currency=categorized_result.get("currency", "EUR"),
-            items=categorized_result.get("items", []),
-            confidence=categorized_result.get("confidence", 0.0),
-            vision_ai_model=categorized_result.get("vision_ai_model"),
-            processing_time_ms=categorized_result.get("processing_time_ms"),
-            category=categorized_result.get("category"),
-            subcategory=categorized_result.get("subcategory"),
-            tags=categorized_result.get("tags", []),
-            created_by=user_id,
+        # Samanaikaiset saman kuvan lataukset jakavat yhden käsittelyn
+        receipt, shared = await receipt_dedup.run_once(
+            receipt_dedup.key(tenant_id, digest), _extract_and_store
         )
+        if shared:
+            # Toisen pyynnön sessiossa luotu olio -> lataa omaan sessioon
+            receipt = receipt_dedup.find_existing(db, tenant_id, digest, count_hit=False)
+        return _receipt_response(receipt, duplicate=shared)
 
-        db.add(receipt)
-        db.flush()  # Saada ID
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Receipt processing failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Receipt processing failed: {str(e)}")
 
-        # Tallenna tuotteet
-        for item_data in categorized_result.get("items", []):
-            item = ReceiptItem(
-                receipt_id=receipt.id,
-                tenant_id=tenant_id,
-                name=item_data.get("name"),
-                quantity=item_data.get("quantity", 1.0),
-                unit_price=item_data.get("unit_price", 0.0),
-                total_price=item_data.get("total_price", 0.0),
-            )
-            db.add(item)
 
-        # Audit log
-        audit = DocumentAudit(
-            document_id=receipt.id,
-            document_type="receipt",
-            tenant_id=tenant_id,
-            event="created",
-            payload={"vision_result": categorized_result},
-            user_id=user_id,
+@router.post("/batch")
+async def scan_receipts_batch(
+    files: list[UploadFile] = File(...),
+    tenant_id: str = Query(None),
+    user_id: str = Query(None),
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+):
+    """Skannaa useita kuitteja kerralla (multipart tai zip) ja striimaa tulokset"""
+    uploads = await _read_batch_uploads(files)
+    if not uploads:
+        raise HTTPException(status_code=400, detail="No receipt images in upload")
+    if len(uploads) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413, detail=f"Too many receipts in one batch (max {BATCH_MAX_FILES})"
         )
-        db.add(audit)
 
-        db.commit()
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _encode_events(_run_receipt_batch(uploads, tenant_id, user_id), stream_format),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        # Gamify points
-        try:
-            record_event(
-                db,
-                tenant_id=tenant_id,
-                kind="receipt.scanned",
-                points=10,
-                user_id=user_id,
-                meta={"receipt_id": str(receipt.id)},
-                event_id=f"receipt_{receipt.id}",
+
+async def _read_batch_uploads(files: list[UploadFile]) -> list[tuple[str, bytes]]:
+    """Lue ladatut tiedostot; zip-paketit puretaan kuviksi kokorajoin."""
+    uploads: list[tuple[str, bytes]] = []
+    total = 0
+
+    def _add(name: str, data: bytes) -> None:
+        nonlocal total
+        if len(uploads) >= BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=413, detail=f"Too many receipts in one batch (max {BATCH_MAX_FILES})"
             )
-            # P2E tokens
-            p2e_mint(
-                db,
-                tenant_id or "default",
-                user_id or "user_demo",
-                5,
-                "receipt_scanned",
-                ref_id=str(receipt.id),
+        if len(data) > BATCH_MAX_FILE_BYTES:
+            raise HTTPException(
+                status_code=413, detail=f"{name} exceeds {BATCH_MAX_FILE_BYTES} bytes"
             )
-        except Exception:
-            pass  # Gamify ei pakollinen
+        total += len(data)
+        if total > BATCH_MAX_TOTAL_BYTES:
+            raise HTTPException(
+                status_code=413, detail=f"Batch exceeds {BATCH_MAX_TOTAL_BYTES} bytes"
+            )
+        uploads.append((name, data))
+
+    for upload in files:
+        data = await upload.read()
+        name = upload.filename or f"upload_{len(uploads)}"
+        if not (name.lower().endswith(".zip") or zipfile.is_zipfile(io.BytesIO(data))):
+            _add(name, data)
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                members = archive.infolist()
+                if len(members) > BATCH_MAX_ZIP_ENTRIES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Too many entries in {name} (max {BATCH_MAX_ZIP_ENTRIES})",
+                    )
+                for member in members:
+                    member_name = member.filename
+                    if (
+                        member.is_dir()
+                        or member_name.startswith("__MACOSX/")
+                        or not member_name.lower().endswith(BATCH_IMAGE_SUFFIXES)
+                    ):
+                        continue
+                    if member.file_size > BATCH_MAX_FILE_BYTES:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"{name}/{member_name} exceeds {BATCH_MAX_FILE_BYTES} bytes",
+                        )
+                    # Otsakkeen kokotieto voi valehdella -> lue korkeintaan raja + 1 tavua
+                    with archive.open(member) as handle:
+                        _add(f"{name}/{member_name}", handle.read(BATCH_MAX_FILE_BYTES + 1))
+        except (zipfile.BadZipFile, zipfile.LargeZipFile) as e:
+            raise HTTPException(
+                status_code=400, detail=f"{name} is not a valid zip file: {e}"
+            ) from e
+        except (NotImplementedError, RuntimeError) as e:
+            # Tuntematon pakkaustapa tai salattu paketti
+            raise HTTPException(status_code=400, detail=f"Cannot extract {name}: {e}") from e
+    return uploads
+
+
+async def _run_receipt_batch(
+    uploads: list[tuple[str, bytes]],
+    tenant_id: str | None,
+    user_id: str | None,
+) -> AsyncIterator[dict]:
+    """Käsittele erä rajoitetulla rinnakkaisuudella ja tallenna erissä.
+
+    Jokainen kuva kulkee ``receipt_dedup.run_once``:n kautta, joten erä ja
+    samanaikainen yksittäisskannaus samasta kuvasta jakavat yhden OCR-ajon.
+    Erän oma käsittely pysyy "in-flight" -tilassa kunnes sen rivit on
+    commitoitu, jolloin liittyjä löytää tallennetun kuitin.
+    """
+    batch_id = uuid.uuid4().hex
+    # Oma sessio: pyynnön riippuvuus suljetaan ennen kuin striimi on valmis
+    db = SessionLocal()
+    counts = {"created": 0, "duplicate": 0, "error": 0}
+    tasks: list[asyncio.Task] = []
+    # ("extracted", base, tulos, commit-future) | ("duplicate", base, id) | ("error", base, viesti)
+    results: asyncio.Queue[tuple] = asyncio.Queue()
+    stored: list[asyncio.Future] = []
+    closed = False
+
+    async def _item(base: dict, img_bytes: bytes) -> None:
+        reported = False
+
+        async def _extract_and_commit() -> str:
+            nonlocal reported
+            async with extraction_slot():
+                categorized_result = await extract_receipt(img_bytes)
+            if closed:
+                raise RuntimeError("Batch stream closed")
+            committed = asyncio.get_running_loop().create_future()
+            stored.append(committed)
+            reported = True
+            await results.put(("extracted", base, categorized_result, committed))
+            return await committed
 
-        return {
-            "success": True,
-            "receipt_id": str(receipt.id),
-            "data": {
-                "vendor": receipt.vendor,
-                "total_amount": receipt.total_amount,
-                "vat_amount": receipt.vat_amount,
-                "vat_rate": receipt.vat_rate,
-                "net_amount": receipt.net_amount,
-                "receipt_date": receipt.receipt_date.isoformat() if receipt.receipt_date else None,
-                "invoice_number": receipt.invoice_number,
-                "payment_method": receipt.payment_method,
-                "currency": receipt.currency,
-                "items": receipt.items,
-                "category": receipt.category,
-                "subcategory": receipt.subcategory,
-                "tags": receipt.tags,
-                "confidence": receipt.confidence,
-                "status": receipt.status,
-            },
-            "vision_ai": {
-                "model": receipt.vision_ai_model,
-                "processing_time_ms": receipt.processing_time_ms,
-                "confidence": receipt.confidence,
-            },
-        }
+        try:
+            _, shared = await receipt_dedup.run_once(
+                receipt_dedup.key(tenant_id, base["sha256"]), _extract_and_commit
+            )
+        except HTTPException as e:
+            if not reported:
+                await results.put(("error", base, str(e.detail)))
+            return
+        except Exception as e:
+            if not reported:
+                await results.put(("error", base, str(e)))
+            return
+        if shared:
+            # Toinen pyyntö käsitteli saman kuvan ja on jo commitoinut sen
+            existing = receipt_dedup.find_existing(db, tenant_id, base["sha256"], count_hit=False)
+            await results.put(("duplicate", base, str(existing.id) if existing else None))
 
+    try:
+        yield {"event": "started", "batch_id": batch_id, "total": len(uploads)}
+
+        first_seen: dict[str, str] = {}
+        for index, (filename, img_bytes) in enumerate(uploads):
+            digest = sha256(img_bytes)
+            base = {"event": "item", "index": index, "filename": filename, "sha256": digest}
+            if digest in first_seen:
+                counts["duplicate"] += 1
+                yield {**base, "status": "duplicate", "duplicate_of": first_seen[digest]}
+                continue
+            first_seen[digest] = filename
+            existing = receipt_dedup.find_existing(db, tenant_id, digest)
+            if existing is not None:
+                counts["duplicate"] += 1
+                yield {**base, "status": "duplicate", "receipt_id": str(existing.id)}
+                continue
+            tasks.append(asyncio.create_task(_item(base, img_bytes)))
+
+        pending: list[tuple[dict, asyncio.Future]] = []
+        remaining = len(tasks)
+        while remaining:
+            kind, base, value, *extra = await results.get()
+            if kind == "duplicate":
+                remaining -= 1
+                counts["duplicate"] += 1
+                yield {**base, "status": "duplicate", "receipt_id": value}
+                continue
+            error = value if kind == "error" else None
+            if kind == "extracted":
+                committed = extra[0]
+                try:
+                    with db.begin_nested():
+                        receipt = add_receipt_rows(db, value, base["sha256"], tenant_id, user_id)
+                    item = {
+                        **base,
+                        "status": "created",
+                        "receipt_id": str(receipt.id),
+                        "vendor": value.get("vendor"),
+                        "total_amount": value.get("total_amount"),
+                        "category": value.get("category"),
+                        "confidence": value.get("confidence"),
+                    }
+                    pending.append((item, committed))
+                except Exception as e:
+                    error = f"Saving receipt failed: {e}"
+                    committed.set_exception(RuntimeError(error))
+            if error is not None:
+                remaining -= 1
+                counts["error"] += 1
+                yield {**base, "status": "error", "error": error}
+            if len(pending) >= BATCH_COMMIT_SIZE or (pending and remaining == len(pending)):
+                for item in _commit_receipt_chunk(db, pending, counts):
+                    yield item
+                remaining -= len(pending)
+                pending = []
+
+        if counts["created"]:
+            _award_receipt_points(db, tenant_id, user_id, batch_id=batch_id, count=counts["created"])
+        yield {"event": "summary", "batch_id": batch_id, "total": len(uploads), **counts}
+    finally:
+        closed = True
+        for task in tasks:
+            task.cancel()
+        for committed in stored:
+            if not committed.done():
+                # Liittyneet yksittäisskannaukset saavat virheen eivätkä jää odottamaan
+                committed.set_exception(RuntimeError("Batch stream closed before commit"))
+        db.close()
+
+
+def _commit_receipt_chunk(
+    db: Session, pending: list[tuple[dict, asyncio.Future]], counts: dict
+) -> list[dict]:
+    """Commitoi kertyneet kuitit yhdessä transaktiossa ja vapauta niiden odottajat."""
+    if not pending:
+        return []
+    try:
+        db.commit()
     except Exception as e:
         db.rollback()
-        logger.error(f"Receipt processing failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Receipt processing failed: {str(e)}")
+        logger.error(f"Receipt batch commit failed: {e}", exc_info=True)
+        counts["error"] += len(pending)
+        for _, committed in pending:
+            if not committed.done():
+                committed.set_exception(RuntimeError(f"Database commit failed: {e}"))
+        return [
+            {
+                **{k: item[k] for k in ("event", "index", "filename", "sha256")},
+                "status": "error",
+                "error": f"Database commit failed: {e}",
+            }
+            for item, _ in pending
+        ]
+    counts["created"] += len(pending)
+    for item, committed in pending:
+        if not committed.done():
+            committed.set_result(item["receipt_id"])
+    return [item for item, _ in pending]
+
+
+async def _encode_events(events: AsyncIterator[dict], stream_format: str) -> AsyncIterator[bytes]:
+    """Koodaa tapahtumat NDJSON- tai SSE-muotoon."""
+    async for event in events:
+        payload = json.dumps(event, default=str)
+        if stream_format == "sse":
+            yield f"event: {event['event']}\ndata: {payload}\n\n".encode()
+        else:
+            yield f"{payload}\n".encode()
+
+
+async def _scan_and_store_receipt(
+    db: Session,
+    img_bytes: bytes,
+    digest: str,
+    tenant_id: str | None,
+    user_id: str | None,
+) -> Receipt:
+    """Aja Vision AI, kategorisoi ja tallenna kuitti."""
+    categorized_result = await extract_receipt(img_bytes)
+    receipt = add_receipt_rows(db, categorized_result, digest, tenant_id, user_id)
+    db.commit()
+    _award_receipt_points(db, tenant_id, user_id, receipt_id=str(receipt.id))
+    return receipt
+
+
+def _award_receipt_points(
+    db: Session,
+    tenant_id: str | None,
+    user_id: str | None,
+    receipt_id: str | None = None,
+    batch_id: str | None = None,
+    count: int = 1,
+) -> None:
+    """Gamify-pisteet ja P2E-tokenit skannatuista kuiteista."""
+    ref_id = receipt_id or batch_id
+    meta = {"receipt_id": receipt_id} if receipt_id else {"batch_id": batch_id, "count": count}
+    try:
+        record_event(
+            db,
+            tenant_id=tenant_id,
+            kind="receipt.scanned",
+            points=10 * count,
+            user_id=user_id,
+            meta=meta,
+            event_id=f"receipt_{ref_id}",
+        )
+        # P2E tokens
+        p2e_mint(
+            db,
+            tenant_id or "default",
+            user_id or "user_demo",
+            5 * count,
+            "receipt_scanned",
+            ref_id=ref_id,
+        )
+    except Exception:
+        pass  # Gamify ei pakollinen
+
+
+def _receipt_response(receipt: Receipt, duplicate: bool = False) -> dict:
+    """Muodosta skannausvastaus tallennetusta kuitista."""
+    return {
+        "success": True,
+        "receipt_id": str(receipt.id),
+        "duplicate": duplicate,
+        "data": {
+            "vendor": receipt.vendor,
+            "total_amount": receipt.total_amount,
+            "vat_amount": receipt.vat_amount,
+            "vat_rate": receipt.vat_rate,
+            "net_amount": receipt.net_amount,
+            "receipt_date": receipt.receipt_date.isoformat() if receipt.receipt_date else None,
+            "invoice_number": receipt.invoice_number,
+            "payment_method": receipt.payment_method,
+            "currency": receipt.currency,
+            "items": receipt.items,
+            "category": receipt.category,
+            "subcategory": receipt.subcategory,
+            "tags": receipt.tags,
+            "confidence": receipt.confidence,
+            "status": receipt.status,
+        },
+        "vision_ai": {
+            "model": receipt.vision_ai_model,
+            "processing_time_ms": receipt.processing_time_ms,
+            "confidence": receipt.confidence,
+        },
+    }
 
 
 @router.post("/invoices/scan")
@@ -169,7 +417,8 @@ async def scan_invoice(
         img_bytes = await file.read()
 
         # Käsittele Vision AI:lla
-        vision_result = process_invoice(img_bytes)
+        async with track_stage("vision"):
+            vision_result = await process_invoice(img_bytes)
 
         if vision_result.get("error"):
             raise HTTPException(
@@ -0,0 +1,178 @@
+"""Layout/regex parsing of OCR text from printed receipts.
+
+Each extracted field comes with its own confidence so the tiered extractor
+can decide, field by field, whether a Vision model is needed.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from .vision_service import extract_number, parse_date
+
+AMOUNT = r"(-?\d{1,6}(?:[ .]\d{3})*[.,]\d{2})"
+AMOUNT_RE = re.compile(AMOUNT)
+TOTAL_RE = re.compile(
+    r"\b(yhteens[aä]|summa|total|maksettava|loppusumma|yht\.?)\b.*?" + AMOUNT, re.I
+)
+VAT_LINE_RE = re.compile(r"\b(alv|moms|vat)\b", re.I)
+VAT_RATE_RE = re.compile(r"(\d{1,2}(?:[.,]\d{1,2})?)\s*%")
+DATE_RE = re.compile(r"\b(\d{1,2}[./-]\d{1,2}[./-](?:\d{4}|\d{2}))\b")
+RECEIPT_NO_RE = re.compile(
+    r"\b(?:kuitti(?:\s*nro)?|kuittinumero|receipt\s*(?:no|#)?|tosite)\s*[:#]?\s*([A-Z0-9-]{3,})",
+    re.I,
+)
+ITEM_RE = re.compile(r"^(?P<name>[^\d].{1,60}?)\s+(?:(?P<qty>\d+)\s*[x*]\s*)?" + AMOUNT + r"$")
+SKIP_ITEM_RE = re.compile(
+    r"\b(yhteens|summa|total|alv|moms|vat|kortti|card|k[aä]teinen|cash|vaihtoraha|netto)",
+    re.I,
+)
+CARD_RE = re.compile(r"\b(kortti|card|visa|mastercard|debit|credit|pankkikortti)\b", re.I)
+CASH_RE = re.compile(r"\b(k[aä]teinen|cash)\b", re.I)
+
+# Fields the Receipt model cannot store without
+REQUIRED_FIELDS = ("vendor", "total_amount", "receipt_date")
+# Fields that must be confident before the local result is used as-is
+ESCALATION_FIELDS = REQUIRED_FIELDS + ("vat_amount",)
+AMOUNT_FIELDS = ("total_amount", "vat_amount", "vat_rate", "net_amount")
+
+
+def _amount(raw: str) -> float | None:
+    """'1 234,50', '1.234,50' or '12.50' -> float."""
+    digits = raw.replace(" ", "")
+    whole = digits[:-3].replace(".", "").replace(",", "")
+    try:
+        return float(f"{whole}.{digits[-2:]}")
+    except ValueError:
+        return None
+
+
+def parse_receipt_text(text: str, ocr_confidence: float) -> dict[str, Any]:
+    """Parse OCR text into receipt fields.
+
+    Args:
+        text: OCR text, one receipt line per text line
+        ocr_confidence: tesseract mean word confidence (0-100)
+
+    Returns:
+        Field dict in the same shape as ``process_receipt`` plus
+        ``field_confidence`` mapping each field to 0.0-1.0.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    quality = max(0.0, min(1.0, ocr_confidence / 100.0))
+    conf: dict[str, float] = {}
+    result: dict[str, Any] = {
+        "vendor": None,
+        "total_amount": None,
+        "vat_amount": None,
+        "vat_rate": None,
+        "net_amount": None,
+        "receipt_date": None,
+        "invoice_number": None,
+        "payment_method": None,
+        "currency": "EUR",
+        "items": [],
+    }
+
+    # Myyjä: ensimmäinen pääosin kirjaimista koostuva rivi
+    for index, line in enumerate(lines[:4]):
+        letters = sum(ch.isalpha() for ch in line)
+        if letters >= 3 and letters / len(line) > 0.6:
+            result["vendor"] = line.title() if line.isupper() else line
+            conf["vendor"] = 0.85 if index == 0 and not AMOUNT_RE.search(line) else 0.6
+            break
+
+    # Kokonaissumma: avainsanarivi, muuten suurin summa
+    total_index = None
+    for index, line in enumerate(lines):
+        m = TOTAL_RE.search(line)
+        if m:
+            result["total_amount"] = _amount(m.group(2))
+            conf["total_amount"] = 0.85
+            total_index = index
+            break
+    if result["total_amount"] is None:
+        amounts = [_amount(a) for a in AMOUNT_RE.findall(text)]
+        amounts = [a for a in amounts if a is not None]
+        if amounts:
+            result["total_amount"] = max(amounts)
+            conf["total_amount"] = 0.4
+
+    # ALV: prosentti ja summa ALV-riveiltä
+    for line in lines:
+        if not VAT_LINE_RE.search(line):
+            continue
+        rate = VAT_RATE_RE.search(line)
+        if rate and result["vat_rate"] is None:
+            result["vat_rate"] = extract_number(rate.group(1).replace(",", "."))
+            conf["vat_rate"] = 0.75
+            line = line.replace(rate.group(0), " ")
+        amounts = [_amount(a) for a in AMOUNT_RE.findall(line)]
+        amounts = [a for a in amounts if a is not None and a >= 0]
+        if amounts and result["vat_amount"] is None:
+            # Rivillä usein "ALV 24% netto vero brutto" -> vero on pienin
+            result["vat_amount"] = min(amounts)
+            conf["vat_amount"] = 0.6
+
+    total, vat = result["total_amount"], result["vat_amount"]
+    if total is not None and vat is not None:
+        result["net_amount"] = round(total - vat, 2)
+        conf["net_amount"] = min(conf["total_amount"], conf["vat_amount"])
+        rate = result["vat_rate"]
+        # Johdonmukaisuus: vero = brutto * p / (100 + p)
+        if rate is not None and abs(total * rate / (100 + rate) - vat) <= 0.02:
+            for field in AMOUNT_FIELDS:
+                conf[field] = 0.95
+
+    # Päivämäärä
+    for m in DATE_RE.finditer(text):
+        parsed = parse_date(m.group(1))
+        if parsed:
+            result["receipt_date"] = parsed
+            conf["receipt_date"] = 0.85
+            break
+
+    m = RECEIPT_NO_RE.search(text)
+    if m:
+        result["invoice_number"] = m.group(1)
+        conf["invoice_number"] = 0.7
+
+    if CARD_RE.search(text):
+        result["payment_method"] = "card"
+        conf["payment_method"] = 0.8
+    elif CASH_RE.search(text):
+        result["payment_method"] = "cash"
+        conf["payment_method"] = 0.8
+
+    # Tuoterivit ennen summariviä
+    item_lines = lines[1:total_index] if total_index is not None else lines[1:]
+    for line in item_lines:
+        if SKIP_ITEM_RE.search(line):
+            continue
+        m = ITEM_RE.match(line)
+        if not m:
+            continue
+        price = _amount(m.group(3))
+        if price is None:
+            continue
+        # "NIMI 2 x 2,50" -> kappalehinta 2,50
+        qty = float(m.group("qty") or 1) or 1.0
+        result["items"].append(
+            {
+                "name": m.group("name").strip(),
+                "quantity": qty,
+                "unit_price": price,
+                "total_price": round(price * qty, 2),
+            }
+        )
+    if result["items"]:
+        conf["items"] = 0.6
+
+    # Heikko OCR-laatu laskee kaikkien kenttien luottamusta
+    result["field_confidence"] = {
+        field: round(value * (0.5 + 0.5 * quality), 3) for field, value in conf.items()
+    }
+    required = [result["field_confidence"].get(f, 0.0) for f in REQUIRED_FIELDS]
+    result["confidence"] = round(min(required), 3)
+    return result
@@ -0,0 +1,163 @@
+"""Tiered receipt extraction: local OCR first, Vision models only when needed.
+
+Tier 1 runs tesseract in the OCR process pool and parses the text with
+``text_parser``. If every field in ``ESCALATION_FIELDS`` reaches the local
+confidence threshold, the result is used as-is. Otherwise the receipt is
+escalated to the Vision model. Only the weak fields are taken from the Vision
+answer; confident local fields are kept. If the merged result is still below
+the premium threshold and a premium extractor is registered (the dual-model
+``PremiumOCRProcessor`` in the backend), that is tried last.
+
+If the escalation fails but the local result has every required field, it is
+returned as tier ``local_fallback`` with ``escalation_failed`` and the
+``weak_fields`` that were never verified, so it is not mistaken for a
+confident local read.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from prometheus_client import Counter
+
+from ..ocr.executor import run_cpu, track_stage
+from ..ocr.service import run_ocr_with_confidence
+from .text_parser import ESCALATION_FIELDS, REQUIRED_FIELDS, parse_receipt_text
+from .vision_service import process_receipt, validate_receipt_data
+
+logger = logging.getLogger("converto.receipts.tiered")
+
+LOCAL_OCR_ENABLED = os.getenv("RECEIPT_LOCAL_OCR", "true").lower() in ("true", "1", "yes")
+LOCAL_MIN_CONFIDENCE = float(os.getenv("RECEIPT_LOCAL_MIN_CONFIDENCE", "0.75"))
+PREMIUM_MIN_CONFIDENCE = float(os.getenv("RECEIPT_PREMIUM_MIN_CONFIDENCE", "0.6"))
+
+EXTRACTION_TIER = Counter(
+    "receipt_extraction_tier_total", "Receipts resolved per extraction tier", ["tier"]
+)
+
+Extractor = Callable[[bytes], Awaitable[dict[str, Any]]]
+
+
+class TieredReceiptExtractor:
+    """Local OCR -> Vision -> premium escalation for receipt images."""
+
+    def __init__(
+        self,
+        vision: Extractor = process_receipt,
+        premium: Extractor | None = None,
+        local_enabled: bool = LOCAL_OCR_ENABLED,
+        local_min_confidence: float = LOCAL_MIN_CONFIDENCE,
+        premium_min_confidence: float = PREMIUM_MIN_CONFIDENCE,
+    ):
+        self.vision = vision
+        self.premium = premium
+        self.local_enabled = local_enabled
+        self.local_min_confidence = local_min_confidence
+        self.premium_min_confidence = premium_min_confidence
+
+    async def extract(self, img_bytes: bytes) -> dict[str, Any]:
+        """Extract receipt fields using the cheapest tier that is confident enough."""
+        start_time = time.time()
+
+        local = await self._local(img_bytes) if self.local_enabled else None
+        weak = self._weak_fields(local)
+        if local is not None and not weak:
+            return self._finish(local, "local", [], "tesseract", start_time)
+
+        result, tier, model = local, "local", "tesseract"
+        async with track_stage("vision"):
+            vision = await self.vision(img_bytes)
+        if vision.get("error"):
+            logger.warning(f"Vision escalation failed: {vision['error']}")
+        else:
+            result, tier = self._merge(local, vision), "vision"
+            model = vision.get("vision_ai_model")
+            if local is not None:
+                model = f"tesseract+{model}"
+
+        if self.premium is not None and (
+            result is None or result["confidence"] < self.premium_min_confidence
+        ):
+            premium = await self._premium(img_bytes)
+            if premium is not None:
+                model = "premium" if result is None else f"{model}+premium"
+                result, tier = self._merge(result, premium), "premium"
+
+        if result is None or (
+            tier == "local" and any(result.get(f) is None for f in REQUIRED_FIELDS)
+        ):
+            return vision
+        if tier == "local":
+            # Escalation failed: the weak fields are unverified, not confident
+            result["escalation_failed"] = True
+            result["escalation_error"] = vision.get("error")
+            result["weak_fields"] = weak
+            return self._finish(result, "local_fallback", [], model, start_time)
+        return self._finish(result, tier, weak, model, start_time)
+
+    async def _local(self, img_bytes: bytes) -> dict[str, Any] | None:
+        try:
+            text, ocr_confidence = await run_cpu("ocr", run_ocr_with_confidence, img_bytes)
+        except Exception as e:
+            logger.warning(f"Local OCR failed, escalating: {e}")
+            return None
+        return parse_receipt_text(text, ocr_confidence)
+
+    async def _premium(self, img_bytes: bytes) -> dict[str, Any] | None:
+        try:
+            async with track_stage("premium"):
+                raw = await self.premium(img_bytes)
+        except Exception as e:
+            logger.warning(f"Premium escalation failed: {e}")
+            return None
+        if raw.get("error"):
+            return None
+        raw.setdefault("receipt_date", raw.get("date"))
+        result = validate_receipt_data(dict(raw))
+        result["field_confidence"] = {}
+        return result
+
+    def _weak_fields(self, result: dict[str, Any] | None) -> list[str]:
+        if result is None:
+            return list(ESCALATION_FIELDS)
+        confidence = result.get("field_confidence", {})
+        return [f for f in ESCALATION_FIELDS if confidence.get(f, 0.0) < self.local_min_confidence]
+
+    def _merge(self, base: dict[str, Any] | None, escalated: dict[str, Any]) -> dict[str, Any]:
+        """Keep confident fields from ``base``; take the rest from ``escalated``."""
+        escalated_confidence = float(escalated.get("confidence") or 0.0)
+        merged = dict(base or {})
+        confidence = dict(merged.get("field_confidence", {}))
+        for field, value in escalated.items():
+            if field in ("field_confidence", "confidence") or value in (None, [], ""):
+                continue
+            if confidence.get(field, 0.0) >= self.local_min_confidence:
+                continue
+            merged[field] = value
+            confidence[field] = escalated_confidence
+        merged["field_confidence"] = confidence
+        merged["confidence"] = round(min(confidence.get(f, 0.0) for f in REQUIRED_FIELDS), 3)
+        return merged
+
+    def _finish(
+        self,
+        result: dict[str, Any],
+        tier: str,
+        escalated_fields: list[str],
+        model: str | None,
+        start_time: float,
+    ) -> dict[str, Any]:
+        EXTRACTION_TIER.labels(tier=tier).inc()
+        result.pop("error", None)
+        result["extraction_tier"] = tier
+        result["escalated_fields"] = escalated_fields
+        result["vision_ai_model"] = model
+        result["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        return result
+
+
+receipt_extractor = TieredReceiptExtractor()
@@ -3,14 +3,22 @@
 import os
 import base64
 import json
+import logging
 import time
 from typing import Dict, Any, Optional, List
-from openai import OpenAI
 from datetime import datetime, date
 import re
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from ..ai.clients import ProviderClients, get_provider_clients
+from ..ocr.executor import run_cpu
+from ..ocr.normalize import is_pdf, normalize_for_vision
+
+logger = logging.getLogger("converto.receipts.vision")
+
 VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o-mini")
+# Pienennä, rajaa ja pakkaa kuva ennen lähetystä (oletuksena pois, kunnes
+# scripts/vision_payload_benchmark.py on mitannut koon ja tarkkuuden)
+VISION_NORMALIZE = os.getenv("VISION_NORMALIZE", "false").lower() in ("true", "1", "yes")
 
 # Kuittien tunnistus prompt
 RECEIPT_PROMPT = (
@@ -54,27 +62,47 @@ INVOICE_PROMPT = (
 )
 
 
-def process_receipt(img_bytes: bytes) -> Dict[str, Any]:
+async def prepare_image_url(img_bytes: bytes, normalize: bool = VISION_NORMALIZE) -> str:
+    """Data URL for the Vision API, normalised in the OCR pool when enabled."""
+    if normalize or is_pdf(img_bytes):
+        try:
+            normalized = await run_cpu("normalize", normalize_for_vision, img_bytes)
+            return normalized.data_url()
+        except Exception as e:
+            if is_pdf(img_bytes):
+                raise
+            logger.warning(f"Image normalisation failed, sending original: {e}")
+    mime = "image/png" if img_bytes[:8] == b"\x89PNG\r\n\x1a\n" else "image/jpeg"
+    return f"data:{mime};base64,{base64.b64encode(img_bytes).decode()}"
+
+
+async def process_receipt(
+    img_bytes: bytes,
+    clients: Optional[ProviderClients] = None,
+    normalize: bool = VISION_NORMALIZE,
+) -> Dict[str, Any]:
     """Käsittele kuitti Vision AI:lla"""
     start_time = time.time()
     
     try:
-        b64 = base64.b64encode(img_bytes).decode()
+        image_url = await prepare_image_url(img_bytes, normalize)
+        clients = clients or get_provider_clients()
         
-        response = client.chat.completions.create(
-            model=VISION_MODEL,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": RECEIPT_PROMPT},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
-                    ],
-                }
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.1,
-        )
+        async with clients.limit("openai"):
+            response = await clients.openai().chat.completions.create(
+                model=VISION_MODEL,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": RECEIPT_PROMPT},
+                            {"type": "image_url", "image_url": {"url": image_url}},
+                        ],
+                    }
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.1,
+            )
         
         result = json.loads(response.choices[0].message.content)
         processing_time = int((time.time() - start_time) * 1000)
@@ -105,27 +133,33 @@ def process_receipt(img_bytes: bytes) -> Dict[str, Any]:
         }
 
 
-def process_invoice(img_bytes: bytes) -> Dict[str, Any]:
+async def process_invoice(
+    img_bytes: bytes,
+    clients: Optional[ProviderClients] = None,
+    normalize: bool = VISION_NORMALIZE,
+) -> Dict[str, Any]:
     """Käsittele lasku Vision AI:lla"""
     start_time = time.time()
     
     try:
-        b64 = base64.b64encode(img_bytes).decode()
+        image_url = await prepare_image_url(img_bytes, normalize)
+        clients = clients or get_provider_clients()
         
-        response = client.chat.completions.create(
-            model=VISION_MODEL,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": INVOICE_PROMPT},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
-                    ],
-                }
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.1,
-        )
+        async with clients.limit("openai"):
+            response = await clients.openai().chat.completions.create(
+                model=VISION_MODEL,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": INVOICE_PROMPT},
+                            {"type": "image_url", "image_url": {"url": image_url}},
+                        ],
+                    }
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.1,
+            )
         
         result = json.loads(response.choices[0].message.content)
         processing_time = int((time.time() - start_time) * 1000)
@@ -3,7 +3,9 @@
 Provides:
 - Session management
 - Rate limiting
+- Idempotency keys
 - Queue management
+- Stream work queues (consumer groups)
 - Pub/Sub messaging
 - Advanced caching
 """
@@ -13,6 +15,8 @@ from __future__ import annotations
 import json
 import logging
 import os
+import threading
+import time
 from typing import Any
 
 try:
@@ -207,6 +211,253 @@ class RateLimiter:
             logger.error(f"Rate limit check failed: {e}")
             return True, limit  # Allow on error
 
+    def take_token(self, key: str, rate: float, capacity: int) -> float | None:
+        """Take one token from a token bucket shared by every process.
+
+        Args:
+            key: Bucket key (e.g. "resend")
+            rate: Tokens added per second
+            capacity: Maximum stored tokens (burst)
+
+        Returns:
+            0.0 if a token was taken, else seconds until one is available;
+            None if Redis is unavailable
+        """
+        if not self.enabled or not self.redis:
+            return None
+
+        try:
+            wait = self.redis.eval(_TAKE_TOKEN, 1, f"ratelimit:bucket:{key}", rate, capacity)
+            return float(wait)
+        except Exception as e:
+            logger.error(f"Token bucket check failed: {e}")
+            return None
+
+
+# Token bucket on the Redis clock, so hosts with skewed clocks share it correctly
+_TAKE_TOKEN = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+# Set-or-get in one step: returns the entry of another holder, or nil once claimed
+_CLAIM = """
+local raw = redis.call('GET', KEYS[1])
+if raw and (ARGV[3] == '' or cjson.decode(raw)['owner'] ~= ARGV[3]) then
+    return raw
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return false
+"""
+
+_RELEASE_OWNED = """
+local raw = redis.call('GET', KEYS[1])
+if raw and cjson.decode(raw)['owner'] == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Renew only if the caller still owns the key (or it expired and nobody took it)
+_RENEW_OWNED = """
+local raw = redis.call('GET', KEYS[1])
+if raw and cjson.decode(raw)['owner'] ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Set a cache value only if its version counter is unchanged since the load started
+_SET_IF_VERSION = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[3] then
+    return 0
+end
+redis.call('SETEX', KEYS[1], ARGV[2], ARGV[1])
+return 1
+"""
+
+
+class IdempotencyStore:
+    """Atomic claim/complete/release of idempotency keys.
+
+    ``claim`` is one set-or-get Lua call, so exactly one caller wins a key and
+    concurrent duplicates see the existing entry and can short-circuit. A claim is held
+    for a short lease while the work runs, and ``complete`` stores the outcome
+    for the full TTL. A crashed worker therefore blocks retries only until the
+    lease expires. A claim made with an ``owner`` can be re-claimed by the same
+    owner, is only renewed and released by it, and leases that must not be held
+    twice claim with ``fail_open=False``. Without Redis an in-process store is
+    used.
+    """
+
+    def __init__(self, redis_client: Any | None = None, lease: int = 120):
+        """Initialize idempotency store.
+
+        Args:
+            redis_client: Redis client (auto-connect if None)
+            lease: Seconds a pending claim is held before it can be re-claimed
+        """
+        self.redis = redis_client or get_redis_client()
+        self.enabled = self.redis is not None
+        self.lease = lease
+        self._local: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def claim(
+        self,
+        key: str,
+        lease: int | None = None,
+        owner: str | None = None,
+        fail_open: bool = True,
+    ) -> tuple[bool, dict[str, Any] | None]:
+        """Claim a key before doing the work.
+
+        Args:
+            key: Idempotency key
+            lease: Optional lease override in seconds
+            owner: Optional holder id; a key already held by the same owner is re-claimed
+            fail_open: Grant the claim when Redis fails; False refuses it instead
+
+        Returns:
+            Tuple of (claimed, existing entry if someone else holds the key)
+        """
+        lease = lease or self.lease
+        entry: dict[str, Any] = {"status": "pending", "claimed_at": time.time()}
+        if owner:
+            entry["owner"] = owner
+        redis_key = f"idempotency:{key}"
+
+        if self.enabled and self.redis:
+            try:
+                existing = self.redis.eval(
+                    _CLAIM, 1, redis_key, json.dumps(entry), lease, owner or ""
+                )
+                if existing is None:
+                    return True, None
+                return False, json.loads(existing)
+            except Exception as e:
+                logger.error(f"Idempotency claim failed: {e}")
+                if not fail_open:
+                    return False, None
+                return True, None  # Fail open like the rate limiter
+
+        with self._lock:
+            now = time.time()
+            if len(self._local) > 10000:
+                self._local = {k: v for k, v in self._local.items() if v[0] > now}
+            current = self._local.get(redis_key)
+            if current and current[0] > now and not (owner and current[1].get("owner") == owner):
+                return False, current[1]
+            self._local[redis_key] = (now + lease, entry)
+            return True, None
+
+    def complete(self, key: str, outcome: dict[str, Any], ttl: int) -> bool:
+        """Record the outcome of claimed work for ``ttl`` seconds.
+
+        Args:
+            key: Idempotency key
+            outcome: JSON-serialisable result (e.g. provider message id)
+            ttl: How long duplicates are suppressed
+
+        Returns:
+            True if successful
+        """
+        entry = {"status": "done", "completed_at": time.time(), **outcome}
+        redis_key = f"idempotency:{key}"
+
+        if self.enabled and self.redis:
+            try:
+                self.redis.set(redis_key, json.dumps(entry), ex=ttl)
+                return True
+            except Exception as e:
+                logger.error(f"Idempotency complete failed: {e}")
+                return False
+
+        with self._lock:
+            self._local[redis_key] = (time.time() + ttl, entry)
+            return True
+
+    def renew(self, key: str, owner: str, outcome: dict[str, Any], ttl: int) -> bool:
+        """Extend a lease held by ``owner`` and store ``outcome`` with it.
+
+        A lease that expired and was not taken over is re-acquired. Redis
+        errors count as still held: while Redis is down nobody else can claim
+        a lease taken with ``fail_open=False`` either.
+
+        Args:
+            key: Idempotency key
+            owner: Holder id the lease was claimed with
+            outcome: JSON-serialisable entry data
+            ttl: New lease in seconds
+
+        Returns:
+            False if another owner holds the key
+        """
+        entry = {"status": "pending", "renewed_at": time.time(), **outcome, "owner": owner}
+        redis_key = f"idempotency:{key}"
+
+        if self.enabled and self.redis:
+            try:
+                held = self.redis.eval(_RENEW_OWNED, 1, redis_key, owner, json.dumps(entry), ttl)
+                return bool(held)
+            except Exception as e:
+                logger.error(f"Idempotency renew failed: {e}")
+                return True
+
+        with self._lock:
+            now = time.time()
+            current = self._local.get(redis_key)
+            if current and current[0] > now and current[1].get("owner") != owner:
+                return False
+            self._local[redis_key] = (now + ttl, entry)
+            return True
+
+    def release(self, key: str, owner: str | None = None) -> bool:
+        """Drop a claim after failed work so a retry can claim it again.
+
+        Args:
+            key: Idempotency key
+            owner: Only drop the claim if this owner still holds it
+
+        Returns:
+            True if successful
+        """
+        redis_key = f"idempotency:{key}"
+
+        if self.enabled and self.redis:
+            try:
+                if owner:
+                    # Compare-and-delete: never drop a lease another holder took over
+                    self.redis.eval(_RELEASE_OWNED, 1, redis_key, owner)
+                else:
+                    self.redis.delete(redis_key)
+                return True
+            except Exception as e:
+                logger.error(f"Idempotency release failed: {e}")
+                return False
+
+        with self._lock:
+            current = self._local.get(redis_key)
+            if current and (not owner or current[1].get("owner") == owner):
+                del self._local[redis_key]
+            return True
+
 
 class QueueManager:
     """Queue management using Redis."""
@@ -272,6 +523,224 @@ class QueueManager:
             logger.error(f"Failed to dequeue job: {e}")
             return None
 
+    def reserve(
+        self,
+        queue_name: str,
+        timeout: int = 0,
+        lease_seconds: float | None = None,
+        raise_errors: bool = False,
+    ) -> tuple[str, dict[str, Any]] | None:
+        """Take a job and keep it in the processing list until it is acked.
+
+        Unlike ``dequeue``, a job taken with ``reserve`` survives a crash of the
+        worker: it stays in ``queue:<name>:processing`` until ``ack``. With
+        ``lease_seconds`` the job also gets a lease in ``queue:<name>:leases``
+        and ``requeue_expired`` moves it back once the lease runs out.
+
+        Args:
+            queue_name: Queue name
+            timeout: Blocking timeout in seconds (0 = non-blocking)
+            lease_seconds: How long the caller may hold the job
+            raise_errors: Re-raise Redis errors instead of returning None, so
+                callers can tell an outage from an empty queue
+
+        Returns:
+            Tuple of (raw job payload for ``ack``, job data) or None
+        """
+        if not self.enabled or not self.redis:
+            return None
+
+        try:
+            key = f"queue:{queue_name}"
+            processing = f"{key}:processing"
+
+            if timeout > 0:
+                data = self.redis.brpoplpush(key, processing, timeout=timeout)
+            else:
+                data = self.redis.rpoplpush(key, processing)
+
+            if not data:
+                return None
+            if lease_seconds:
+                self.redis.zadd(f"{key}:leases", {data: time.time() + lease_seconds})
+            return data, json.loads(data)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Failed to reserve job: {e}")
+            return None
+
+    def ack(self, queue_name: str, raw: str) -> bool:
+        """Remove a reserved job from the processing list and drop its lease.
+
+        Args:
+            queue_name: Queue name
+            raw: Raw job payload returned by ``reserve``
+
+        Returns:
+            True if the job was removed
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            pipe = self.redis.pipeline()
+            self._ack_in(pipe, queue_name, raw)
+            removed, _ = pipe.execute()
+            return bool(removed)
+        except Exception as e:
+            logger.error(f"Failed to ack job: {e}")
+            return False
+
+    @staticmethod
+    def _ack_in(pipe: Any, queue_name: str, raw: str) -> None:
+        key = f"queue:{queue_name}"
+        pipe.lrem(f"{key}:processing", 1, raw)
+        pipe.zrem(f"{key}:leases", raw)
+
+    def schedule(
+        self, queue_name: str, job: dict[str, Any], run_at: float, raw: str | None = None
+    ) -> bool:
+        """Add job to the delayed set; ``promote_due`` enqueues it at ``run_at``.
+
+        Args:
+            queue_name: Queue name
+            job: Job data
+            run_at: Unix timestamp when the job becomes due
+            raw: Reserved payload to ack in the same transaction
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            pipe = self.redis.pipeline()
+            pipe.zadd(f"queue:{queue_name}:delayed", {json.dumps(job): run_at})
+            if raw is not None:
+                self._ack_in(pipe, queue_name, raw)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to schedule job: {e}")
+            return False
+
+    def promote_due(self, queue_name: str, now: float, limit: int = 100) -> int:
+        """Move due delayed jobs to the queue.
+
+        Args:
+            queue_name: Queue name
+            now: Current unix timestamp
+            limit: Maximum jobs to move per call
+
+        Returns:
+            Number of jobs moved
+        """
+        if not self.enabled or not self.redis:
+            return 0
+
+        try:
+            key = f"queue:{queue_name}"
+            delayed = f"{key}:delayed"
+            moved = 0
+            for data in self.redis.zrangebyscore(delayed, "-inf", now, start=0, num=limit):
+                # ZREM decides which process owns the job when several promote at once
+                if self.redis.zrem(delayed, data):
+                    self.redis.lpush(key, data)
+                    moved += 1
+            return moved
+        except Exception as e:
+            logger.error(f"Failed to promote delayed jobs: {e}")
+            return 0
+
+    def dead_letter(self, queue_name: str, job: dict[str, Any], raw: str | None = None) -> bool:
+        """Park a job that will not be retried in ``queue:<name>:dead``.
+
+        Args:
+            queue_name: Queue name
+            job: Job data (including the last error)
+            raw: Reserved payload to ack in the same transaction
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            pipe = self.redis.pipeline()
+            pipe.lpush(f"queue:{queue_name}:dead", json.dumps(job))
+            if raw is not None:
+                self._ack_in(pipe, queue_name, raw)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to dead-letter job: {e}")
+            return False
+
+    def requeue_expired(self, queue_name: str, lease_seconds: float, now: float) -> int:
+        """Move reserved jobs whose lease ran out (crashed worker) back to the queue.
+
+        Safe to call from every process on a timer: only jobs with an expired
+        lease are moved, so jobs other workers are still processing stay put.
+        A job found in the processing list without a lease (worker died between
+        reserving and leasing) is given one of ``lease_seconds``.
+
+        Args:
+            queue_name: Queue name
+            lease_seconds: Lease given to processing jobs that have none
+            now: Current unix timestamp
+
+        Returns:
+            Number of jobs moved back
+        """
+        if not self.enabled or not self.redis:
+            return 0
+
+        try:
+            key = f"queue:{queue_name}"
+            processing = f"{key}:processing"
+            leases = f"{key}:leases"
+            in_flight = self.redis.lrange(processing, 0, -1)
+            if in_flight:
+                self.redis.zadd(leases, {raw: now + lease_seconds for raw in in_flight}, nx=True)
+
+            requeued = 0
+            for raw in self.redis.zrangebyscore(leases, "-inf", now):
+                # ZREM decides which process requeues the job when several scan at once
+                if self.redis.zrem(leases, raw) and self.redis.lrem(processing, 1, raw):
+                    self.redis.lpush(key, raw)
+                    requeued += 1
+            return requeued
+        except Exception as e:
+            logger.error(f"Failed to requeue expired jobs: {e}")
+            return 0
+
+    def queue_stats(self, queue_name: str) -> dict[str, int]:
+        """Get queued, processing, delayed and dead job counts.
+
+        Args:
+            queue_name: Queue name
+
+        Returns:
+            Counts per state
+        """
+        if not self.enabled or not self.redis:
+            return {"queued": 0, "processing": 0, "delayed": 0, "dead": 0}
+
+        try:
+            key = f"queue:{queue_name}"
+            return {
+                "queued": self.redis.llen(key),
+                "processing": self.redis.llen(f"{key}:processing"),
+                "delayed": self.redis.zcard(f"{key}:delayed"),
+                "dead": self.redis.llen(f"{key}:dead"),
+            }
+        except Exception as e:
+            logger.error(f"Failed to get queue stats: {e}")
+            return {"queued": 0, "processing": 0, "delayed": 0, "dead": 0}
+
     def queue_length(self, queue_name: str) -> int:
         """Get queue length.
 
@@ -292,6 +761,292 @@ class QueueManager:
             return 0
 
 
+class StreamQueue:
+    """Work queue on Redis streams with consumer groups.
+
+    Entries read by a consumer stay pending until ``ack``. If a consumer dies,
+    its entries become idle and another consumer takes them over with
+    ``claim_stale`` (visibility timeout). A long-running consumer keeps its
+    entries with ``touch``.
+    """
+
+    def __init__(self, redis_client: Any | None = None):
+        """Initialize stream queue.
+
+        Args:
+            redis_client: Redis client (auto-connect if None)
+        """
+        self.redis = redis_client or get_redis_client()
+        self.enabled = self.redis is not None
+
+    @staticmethod
+    def _decode(entries: list[Any]) -> list[tuple[str, dict[str, Any]]]:
+        decoded = []
+        for entry_id, fields in entries or []:
+            if fields and "data" in fields:
+                decoded.append((entry_id, json.loads(fields["data"])))
+        return decoded
+
+    def ensure_group(self, stream: str, group: str) -> bool:
+        """Create the consumer group (and the stream) if missing.
+
+        Args:
+            stream: Stream name
+            group: Consumer group name
+
+        Returns:
+            True if the group exists
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            self.redis.xgroup_create(f"stream:{stream}", group, id="0", mkstream=True)
+            return True
+        except Exception as e:
+            if "BUSYGROUP" in str(e):
+                return True
+            logger.error(f"Failed to create stream group: {e}")
+            return False
+
+    def add(self, stream: str, payload: dict[str, Any], maxlen: int | None = None) -> str | None:
+        """Append an entry.
+
+        Args:
+            stream: Stream name
+            payload: Entry data
+            maxlen: Approximate cap on stream length
+
+        Returns:
+            Entry ID or None
+        """
+        if not self.enabled or not self.redis:
+            return None
+
+        try:
+            return self.redis.xadd(
+                f"stream:{stream}", {"data": json.dumps(payload)}, maxlen=maxlen, approximate=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to add stream entry: {e}")
+            return None
+
+    def read_group(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        count: int = 1,
+        block_ms: int = 1000,
+        raise_errors: bool = False,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Read new entries for a consumer of the group.
+
+        Args:
+            stream: Stream name
+            group: Consumer group name
+            consumer: Consumer name (unique per worker)
+            count: Maximum entries
+            block_ms: Blocking timeout in milliseconds
+            raise_errors: Re-raise Redis errors instead of returning [], so
+                callers can tell an outage from an empty stream
+
+        Returns:
+            List of (entry ID, data)
+        """
+        if not self.enabled or not self.redis:
+            return []
+
+        try:
+            result = self.redis.xreadgroup(
+                group, consumer, {f"stream:{stream}": ">"}, count=count, block=block_ms
+            )
+            return self._decode(result[0][1]) if result else []
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Failed to read stream group: {e}")
+            return []
+
+    def read(
+        self, stream: str, last_id: str = "0", count: int = 100, block_ms: int | None = 1000
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Read entries after ``last_id`` without a consumer group.
+
+        Args:
+            stream: Stream name
+            last_id: Return entries newer than this ID
+            count: Maximum entries
+            block_ms: Blocking timeout in milliseconds (None = don't block)
+
+        Returns:
+            List of (entry ID, data)
+        """
+        if not self.enabled or not self.redis:
+            return []
+
+        try:
+            result = self.redis.xread({f"stream:{stream}": last_id}, count=count, block=block_ms)
+            return self._decode(result[0][1]) if result else []
+        except Exception as e:
+            logger.error(f"Failed to read stream: {e}")
+            return []
+
+    def read_many(
+        self,
+        positions: dict[str, str],
+        count: int = 100,
+        block_ms: int = 1000,
+        raise_errors: bool = False,
+    ) -> list[tuple[str, str, dict[str, Any]]]:
+        """Read several streams in one blocking call, without a consumer group.
+
+        Args:
+            positions: Stream name -> return entries newer than this ID
+            count: Maximum entries per stream
+            block_ms: Blocking timeout in milliseconds
+            raise_errors: Re-raise Redis errors instead of returning []
+
+        Returns:
+            List of (stream name, entry ID, data)
+        """
+        if not self.enabled or not self.redis or not positions:
+            return []
+
+        try:
+            result = self.redis.xread(
+                {f"stream:{stream}": last_id for stream, last_id in positions.items()},
+                count=count,
+                block=block_ms,
+            )
+            return [
+                (key.removeprefix("stream:"), entry_id, data)
+                for key, entries in result or []
+                for entry_id, data in self._decode(entries)
+            ]
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Failed to read streams: {e}")
+            return []
+
+    def claim_stale(
+        self, stream: str, group: str, consumer: str, min_idle_ms: int, count: int = 10
+    ) -> list[tuple[str, dict[str, Any], int]]:
+        """Take over entries another consumer left pending for ``min_idle_ms``.
+
+        Args:
+            stream: Stream name
+            group: Consumer group name
+            consumer: Consumer taking the entries
+            min_idle_ms: Visibility timeout in milliseconds
+            count: Maximum entries
+
+        Returns:
+            List of (entry ID, data, delivery count)
+        """
+        if not self.enabled or not self.redis:
+            return []
+
+        try:
+            key = f"stream:{stream}"
+            result = self.redis.xautoclaim(key, group, consumer, min_idle_ms, "0-0", count=count)
+            claimed = []
+            for entry_id, data in self._decode(result[1]):
+                pending = self.redis.xpending_range(key, group, entry_id, entry_id, 1)
+                deliveries = pending[0]["times_delivered"] if pending else 1
+                claimed.append((entry_id, data, deliveries))
+            return claimed
+        except Exception as e:
+            logger.error(f"Failed to claim stale stream entries: {e}")
+            return []
+
+    def touch(self, stream: str, group: str, consumer: str, entry_ids: list[str]) -> bool:
+        """Reset the idle time of entries this consumer is still working on.
+
+        Args:
+            stream: Stream name
+            group: Consumer group name
+            consumer: Consumer owning the entries
+            entry_ids: Entry IDs
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis or not entry_ids:
+            return False
+
+        try:
+            self.redis.xclaim(f"stream:{stream}", group, consumer, 0, entry_ids, justid=True)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to touch stream entries: {e}")
+            return False
+
+    def ack(self, stream: str, group: str, entry_id: str) -> bool:
+        """Acknowledge and delete a processed entry.
+
+        Args:
+            stream: Stream name
+            group: Consumer group name
+            entry_id: Entry ID
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            key = f"stream:{stream}"
+            pipe = self.redis.pipeline()
+            pipe.xack(key, group, entry_id)
+            pipe.xdel(key, entry_id)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to ack stream entry: {e}")
+            return False
+
+    def delete(self, stream: str) -> bool:
+        """Delete a stream.
+
+        Args:
+            stream: Stream name
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            self.redis.delete(f"stream:{stream}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete stream: {e}")
+            return False
+
+    def expire(self, stream: str, ttl: int) -> bool:
+        """Set a TTL on a stream.
+
+        Args:
+            stream: Stream name
+            ttl: Time to live in seconds
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            return bool(self.redis.expire(f"stream:{stream}", ttl))
+        except Exception as e:
+            logger.error(f"Failed to expire stream: {e}")
+            return False
+
+
 class PubSubManager:
     """Pub/Sub messaging using Redis."""
 
@@ -426,18 +1181,97 @@ class AdvancedCache:
             return 0
 
         try:
-            keys = self.redis.keys(f"cache:{pattern}")
-            if keys:
-                return self.redis.delete(*keys)
-            return 0
+            # SCAN in batches instead of KEYS, which blocks Redis on the whole keyspace
+            deleted = 0
+            batch: list[str] = []
+            for key in self.redis.scan_iter(match=f"cache:{pattern}", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += self.redis.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis.delete(*batch)
+            return deleted
         except Exception as e:
             logger.error(f"Cache delete failed: {e}")
             return 0
 
+    def cache_version(self, key: str) -> str | None:
+        """Current value of a version counter ("0" if never bumped).
+
+        Args:
+            key: Version key
+
+        Returns:
+            Version, or None if Redis is unavailable
+        """
+        if not self.enabled or not self.redis:
+            return None
+
+        try:
+            return self.redis.get(f"cache:{key}") or "0"
+        except Exception as e:
+            logger.error(f"Cache version read failed: {e}")
+            return None
+
+    def cache_bump_version(self, key: str) -> bool:
+        """Increment a version counter so in-flight ``cache_set_if_version`` writes are dropped.
+
+        Args:
+            key: Version key
+
+        Returns:
+            True if successful
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            self.redis.incr(f"cache:{key}")
+            return True
+        except Exception as e:
+            logger.error(f"Cache version bump failed: {e}")
+            return False
+
+    def cache_set_if_version(
+        self, key: str, value: Any, ttl: int, version_key: str, version: str
+    ) -> bool:
+        """Set a cached value only if ``version_key`` still holds ``version``.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: TTL in seconds
+            version_key: Version key read with ``cache_version`` before loading
+            version: Version read then
+
+        Returns:
+            True if the value was stored
+        """
+        if not self.enabled or not self.redis:
+            return False
+
+        try:
+            stored = self.redis.eval(
+                _SET_IF_VERSION,
+                2,
+                f"cache:{key}",
+                f"cache:{version_key}",
+                json.dumps(value),
+                ttl,
+                version,
+            )
+            return bool(stored)
+        except Exception as e:
+            logger.error(f"Cache set failed: {e}")
+            return False
+
 
 # Convenience instances
 session_manager = SessionManager()
 rate_limiter = RateLimiter()
+idempotency_store = IdempotencyStore()
 queue_manager = QueueManager()
+stream_queue = StreamQueue()
 pubsub_manager = PubSubManager()
 advanced_cache = AdvancedCache()